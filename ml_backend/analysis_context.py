@@ -0,0 +1,91 @@
+"""
+Request-scoped analysis context
+Holds the derived forms of one text (processed, lowercase, tokens, script
+counts) so every stage of the analysis reads them instead of recomputing
+"""
+
+import re
+from functools import cached_property
+
+SINHALA_CHAR_REGEX = re.compile(r'[\u0D80-\u0DFF]')
+ENGLISH_CHAR_REGEX = re.compile(r'[a-zA-Z]')
+WORD_REGEX = re.compile(r'\w+')
+
+
+class AnalysisContext:
+    """One text and everything derived from it during a single analysis
+
+    Every derived form is computed on first use and then reused by all
+    later stages of the same request.
+    """
+
+    def __init__(self, text, preprocess):
+        self.text = text
+        self._preprocess = preprocess
+        self._context_windows = {}
+        self._split_cache = {}
+        # Result cache key, fixed when the cache is first consulted
+        self.cache_key = None
+
+    @cached_property
+    def processed_text(self):
+        return self._preprocess(self.text)
+
+    @cached_property
+    def text_lower(self):
+        return self.text.lower()
+
+    @cached_property
+    def tokens(self):
+        """\\w+ tokens of the lowercase text (used for word level matching)"""
+        return WORD_REGEX.findall(self.text_lower)
+
+    @cached_property
+    def words(self):
+        """Whitespace separated words (used for context windows)"""
+        return self.text.split()
+
+    @cached_property
+    def words_lower(self):
+        return [word.lower() for word in self.words]
+
+    @cached_property
+    def sinhala_chars(self):
+        return len(SINHALA_CHAR_REGEX.findall(self.text))
+
+    @cached_property
+    def english_chars(self):
+        return len(ENGLISH_CHAR_REGEX.findall(self.text))
+
+    @cached_property
+    def sinhala_ratio(self):
+        """Sinhala characters over all non-space characters"""
+        total_chars = len(self.text) - self.text.count(' ')
+        return self.sinhala_chars / total_chars if total_chars > 0 else 0.0
+
+    def word_positions(self, target_word):
+        """Indexes of the whitespace words containing target_word"""
+        target_lower = target_word.lower()
+        return [i for i, word in enumerate(self.words_lower) if target_lower in word]
+
+    def context_windows(self, target_word, radius=5):
+        """Windows of radius words before and after each occurrence of target_word"""
+        key = (target_word.lower(), radius)
+        windows = self._context_windows.get(key)
+        if windows is None:
+            words = self.words
+            windows = []
+            for i in self.word_positions(target_word):
+                start = max(0, i - radius)
+                end = min(len(words), i + radius + 1)
+                windows.append(' '.join(words[start:end]))
+            self._context_windows[key] = windows
+        return windows
+
+    def split_on(self, word):
+        """text_lower split on a lowercase word, cached per word"""
+        parts = self._split_cache.get(word)
+        if parts is None:
+            parts = self.text_lower.split(word)
+            self._split_cache[word] = parts
+        return parts
@@ -1,21 +1,38 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, g, has_request_context, request, jsonify, stream_with_context
 from flask_cors import CORS
 import numpy as np
 import pickle
 import re
 import os
-import pandas as pd
-from tensorflow.keras.models import load_model
-from tensorflow.keras.preprocessing.sequence import pad_sequences
+import sys
+import threading
+import time
+import hmac
+import functools
 import json
 from datetime import datetime
 from difflib import SequenceMatcher
 import unicodedata
+from lexicon_store import LexiconStore
+from feedback_store import FeedbackStore
+from metrics import MetricsRegistry, add_process_gauges
+from request_profiler import RequestProfiler, count_call
+from lexicon_index import VariationIndex, FuzzyIndex, TokenMatchMemo, collapse_repetitions, singlish_normalize
+from result_cache import ResultCache
+from analysis_context import AnalysisContext
+from tflite_model import TFLITE_VARIANTS, TFLiteModel, tflite_model_path
+from numpy_lstm import NumpyLSTMModel
+from micro_batcher import MicroBatcher
+from vocab_tokenizer import VocabTokenizer, pad_ragged
+from model_bundle import ModelBundle
+from model_generations import ArtifactWatcher, GenerationManager, ModelGeneration
+from length_buckets import DEFAULT_LENGTH_BUCKETS, group_by_bucket, is_padding_invariant, parse_length_buckets
 
 def convert_numpy_types(obj):
     """Convert NumPy types to Python types for JSON serialization"""
     import numpy as np
-    import tensorflow as tf
+    # Tensors can only exist if TensorFlow was already imported
+    tf = sys.modules.get('tensorflow')
     
     if isinstance(obj, np.integer):
         return int(obj)
@@ -23,7 +40,7 @@ def convert_numpy_types(obj):
         return float(obj)
     elif isinstance(obj, np.ndarray):
         return obj.tolist()
-    elif isinstance(obj, tf.Tensor):
+    elif tf is not None and isinstance(obj, tf.Tensor):
         return float(obj.numpy())
     elif isinstance(obj, dict):
         return {key: convert_numpy_types(value) for key, value in obj.items()}
@@ -32,20 +49,134 @@ def convert_numpy_types(obj):
     else:
         return obj
 
+def _is_missing(value):
+    """pd.isna for a single value, without importing pandas"""
+    if value is None:
+        return True
+    if isinstance(value, str):
+        return False
+    if isinstance(value, (float, np.floating)):
+        return value != value
+    # pd.NA / NaT can only exist if pandas was already imported
+    pd = sys.modules.get('pandas')
+    return pd is not None and np.ndim(value) == 0 and bool(pd.isna(value))
+
 app = Flask(__name__)
 CORS(app)
 
-# Global variables for model and tokenizer
-model = None
-tokenizer = None
-preprocessor = None
+# The model, tokenizer and preprocessor live in the current generation (see
+# active_generation); max_words/max_len are defaults a bundle can override
+generations = GenerationManager()
 max_words = 15000
 max_len = 150
+max_batch_size = 1000
+stream_batch_size = int(os.environ.get('STREAM_BATCH_SIZE', 64))  # texts per /analyze/stream batch
+
+# Length-bucketed padding: 'auto' buckets only models whose predictions do not
+# depend on padding (masked embeddings), 'on' forces it, 'off' always pads to max_len
+length_bucketing = os.environ.get('LENGTH_BUCKETING', 'auto').lower()
+length_buckets = parse_length_buckets(os.environ.get('LENGTH_BUCKETS', DEFAULT_LENGTH_BUCKETS), max_len)
+
+# Concurrent requests share model.predict calls (MICRO_BATCH_WAIT_MS=0 disables)
+micro_batch_size = int(os.environ.get('MICRO_BATCH_SIZE', 64))
+micro_batch_wait_ms = float(os.environ.get('MICRO_BATCH_WAIT_MS', 5))
+
+# Model loading state reported by /health: starting -> loading -> ready (or failed)
+model_state = 'starting'
+model_load_error = None
+
+# Inference backend: 'keras' (.h5), 'numpy' (see export_numpy_weights.py)
+# or 'tflite' (see convert_to_tflite.py)
+inference_backend = os.environ.get('INFERENCE_BACKEND', 'keras').lower()
+tflite_variant = os.environ.get('TFLITE_VARIANT', 'dynamic').lower()
+
+# Versioned artifact bundle (see build_model_bundle.py); MODEL_BUNDLE=off ignores it
+model_bundle_path = os.environ.get('MODEL_BUNDLE')
+
+# Hot reload: POST /admin/reload (needs ADMIN_TOKEN) or polling the artifact
+# files every MODEL_RELOAD_INTERVAL seconds (0 = off)
+admin_token = os.environ.get('ADMIN_TOKEN')
+model_reload_interval = float(os.environ.get('MODEL_RELOAD_INTERVAL', 0))
+reload_lock = threading.Lock()
+last_reload = None
+artifact_watcher = None
+lexicon_watcher = None
+reload_delegate = None  # set by serve.py so prefork workers hand reloads to the master
+
+# Hate words learned from /feedback (append-only file, see lexicon_store.py)
+lexicon_store = LexiconStore('persistent_hate_words.txt')
+
+# Feedback entries and their per-type counts (SQLite, see feedback_store.py);
+# the legacy feedback_data.jsonl log is imported on first use
+feedback_store = FeedbackStore(os.environ.get('FEEDBACK_DB', 'feedback_data.db'))
+legacy_feedback_file = 'feedback_data.jsonl'
+feedback_import_lock = threading.Lock()
+feedback_imported = False
+
+# Cache of /analyze responses keyed on the input text, model and lexicon version
+analysis_cache = ResultCache(
+    max_entries=int(os.environ.get('ANALYSIS_CACHE_SIZE', 10000)),
+    ttl_seconds=float(os.environ.get('ANALYSIS_CACHE_TTL', 3600))
+)
+
+# Pipeline latency histograms, counters and gauges served by /metrics. Stage
+# timings nest: context_scoring includes the preprocess and lstm_predict time
+# of its windows, and detection includes the matching and scoring stages
+metrics = MetricsRegistry()
+add_process_gauges(metrics)
+stage_latency = metrics.histogram('ml_analysis_stage_seconds', 'Time spent in each analysis pipeline stage',
+                                  labels=('stage',))
+request_latency = metrics.histogram('ml_http_request_duration_seconds', 'Request latency by endpoint',
+                                    labels=('endpoint',))
+request_count = metrics.counter('ml_http_requests_total', 'Requests by endpoint and status code',
+                                labels=('endpoint', 'status'))
+cache_lookups = metrics.counter('ml_analysis_cache_lookups_total', 'Analysis result cache lookups', labels=('result',))
+words_scanned = metrics.counter('ml_words_scanned_total', 'Distinct tokens checked by fuzzy matching')
+windows_scored = metrics.counter('ml_context_windows_scored_total', 'Distinct context windows scored by the LSTM')
+model_batch_rows = metrics.histogram('ml_model_batch_rows', 'Rows per model predict call',
+                                     buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024))
+metrics.gauge('ml_model_ready', 'Whether the model has finished loading', callback=lambda: int(model_state == 'ready'))
+metrics.gauge('ml_model_generation', 'Number of the model generation serving requests',
+              callback=lambda: generations.current.number if generations.current is not None else 0)
+metrics.gauge('ml_lexicon_words', 'Hate words in the current lexicon',
+              callback=lambda: len(generations.current.preprocessor.hate_words) if generations.current is not None else 0)
+metrics.gauge('ml_analysis_cache_entries', 'Entries in the analysis result cache',
+              callback=lambda: analysis_cache.stats()['size'])
 
 class SinhalaTextPreprocessor:
     """Enhanced text preprocessor for Sinhala/Singlish text"""
     
-    def __init__(self):
+    # Minimum calculate_similarity score for a fuzzy hate word match
+    fuzzy_threshold = 0.8
+    
+    # Character substitutions (enhanced)
+    OBFUSCATION_SUBSTITUTIONS = {
+        '@': 'a', '3': 'e', '1': 'i', '0': 'o', '$': 's', '7': 't',
+        '4': 'a', '8': 'b', '!': 'i', '5': 's', '2': 'z', '6': 'g',
+        '9': 'g', '+': 't', '*': 'a', '#': 'h'
+    }
+    
+    # Handle common Sinhala/Singlish letter variations
+    SINHALA_VARIATIONS = {
+        'tha': 'ta', 'dha': 'da', 'gha': 'ga', 'bha': 'ba',
+        'kha': 'ka', 'pha': 'pa', 'jha': 'ja', 'sha': 'sa',
+        # Add more Singlish-specific patterns
+        'tt': 't', 'pp': 'p', 'kk': 'k', 'bb': 'b',
+        'aa': 'a', 'ee': 'e', 'ii': 'i', 'oo': 'o', 'uu': 'u'
+    }
+    
+    _ENDING_O_REGEX = re.compile(r'o$')
+    _ENDING_E_REGEX = re.compile(r'e$')
+    _REPETITION_REGEX = re.compile(r'(.)\1{4,}')
+    _SPACED_4_REGEX = re.compile(r'\b(\w)\s+(\w)\s+(\w)\s+(\w)')
+    _SPACED_3_REGEX = re.compile(r'\b(\w)\s+(\w)\s+(\w)')
+    _SPACED_2_REGEX = re.compile(r'\b(\w)\s+(\w)')
+    _NON_SINHALA_REGEX = re.compile(r'[^\u0D80-\u0DFF]')
+    _URL_MENTION_REGEX = re.compile(r'http\S+|www\S+|@\w+')
+    _PUNCTUATION_REGEX = re.compile(r'[^\w\s\u0D80-\u0DFF.,!?]')
+    _WHITESPACE_REGEX = re.compile(r'\s+')
+    
+    def __init__(self, token_cache_size=50000, lexicon_store=None):
         # Extended hate words dictionary
         self.hate_words = [
             # English/Singlish
@@ -77,23 +208,87 @@ class SinhalaTextPreprocessor:
             'where', 'why', 'who', 'this', 'that', 'with', 'have', 'will', 'was', 'were'
         ]
         
+        # O(1) membership for the hate word list (kept in sync by add_hate_word)
+        self.hate_word_set = set(self.hate_words)
+        self._lexicon_lock = threading.Lock()
+        
         # Load persistent hate words from file
-        self.load_persistent_hate_words()
+        self.load_persistent_hate_words(lexicon_store)
+        
+        # Precompile the preprocessing tables once per preprocessor
+        self._compile_preprocessing_tables()
+        
+        # Bumped on every lexicon change so cached results can be invalidated
+        self.lexicon_version = 0
+        
+        # Precompile every hate word variation into a single multi-pattern matcher
+        self.variation_index = VariationIndex(self.hate_words, self.generate_word_variations)
+        
+        # Candidate index so fuzzy matching only scores plausible hate words per token
+        self.fuzzy_index = FuzzyIndex(self.hate_words)
+        # Words fully indexed by fuzzy_index (set after an add completes)
+        self.fuzzy_word_count = len(self.fuzzy_index.hate_words)
+        
+        # Per-token fuzzy match results shared across requests
+        self.token_match_memo = TokenMatchMemo(token_cache_size)
+    
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['_lexicon_lock']
+        return state
     
-    def load_persistent_hate_words(self):
-        """Load hate words from persistent file"""
-        hate_words_file = 'persistent_hate_words.txt'
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lexicon_lock = threading.Lock()
+    
+    def add_hate_word(self, word):
+        """Add a hate word to the lexicon and, incrementally, to its indexes
+        
+        Writers are serialized; detection keeps running on the indexes while a
+        word is added. Nothing is rebuilt or invalidated on this path: the
+        variation index folds in the background and memoized fuzzy matches are
+        extended to the new word when their token is next looked up.
+        """
+        word = word.lower()
+        with self._lexicon_lock:
+            if word in self.hate_word_set:
+                return False
+            self.hate_word_set.add(word)
+            self.hate_words.append(word)
+            self.variation_index.add_word(word)
+            self.fuzzy_index.add_word(word)
+            self.fuzzy_word_count = len(self.fuzzy_index.hate_words)
+            self.lexicon_version += 1
+        return True
+    
+    def apply_bundle_tables(self, lexicon, preprocessing):
+        """Use the preprocessing tables the model was trained with and merge its lexicon"""
+        self.char_mapping = dict(preprocessing['char_mapping'])
+        self.OBFUSCATION_SUBSTITUTIONS = dict(preprocessing['obfuscation_substitutions'])
+        self.SINHALA_VARIATIONS = dict(preprocessing['sinhala_variations'])
+        self.fuzzy_threshold = preprocessing['fuzzy_threshold']
+        self._compile_preprocessing_tables()
+        
+        self.safe_words.extend(word for word in lexicon['safe_words'] if word not in self.safe_words)
+        for word in lexicon['hate_words']:
+            self.add_hate_word(word)
+    
+    def load_persistent_hate_words(self, lexicon_store=None):
+        """Load hate words from persistent file (through lexicon_store if given)"""
         try:
-            if os.path.exists(hate_words_file):
-                with open(hate_words_file, 'r', encoding='utf-8') as f:
-                    persistent_words = [line.strip().lower() for line in f if line.strip()]
-                
+            if lexicon_store is None:
+                lexicon_store = LexiconStore('persistent_hate_words.txt')
+            else:
+                lexicon_store.refresh()  # Only lines appended since the last load are read
+            
+            if len(lexicon_store):
                 # Add persistent words that aren't already in the list
-                for word in persistent_words:
-                    if word not in self.hate_words:
+                for word in lexicon_store.words:
+                    if word not in self.hate_word_set:
+                        self.hate_word_set.add(word)
                         self.hate_words.append(word)
                 
-                print(f"Loaded {len(persistent_words)} persistent hate words")
+                print(f"Loaded {len(lexicon_store)} persistent hate words")
             else:
                 print("No persistent hate words file found")
         except Exception as e:
@@ -107,14 +302,19 @@ class SinhalaTextPreprocessor:
     
     def normalize_sinhala(self, text):
         """Normalize Sinhala characters"""
-        for old, new in self.char_mapping.items():
-            text = text.replace(old, new)
-        return text
+        if self._char_mapping_regex is None:
+            return text
+        return self._char_mapping_regex.sub(lambda m: self.char_mapping[m.group(0)], text)
+    
+    def create_context(self, text):
+        """Request-scoped context so each derived form of text is computed once"""
+        return AnalysisContext(text, self.preprocess_text)
     
     def detect_language(self, text):
         """Detect if text is primarily Sinhala, English, or mixed"""
-        sinhala_chars = len(re.findall(r'[\u0D80-\u0DFF]', text))
-        english_chars = len(re.findall(r'[a-zA-Z]', text))
+        context = text if isinstance(text, AnalysisContext) else self.create_context(text)
+        sinhala_chars = context.sinhala_chars
+        english_chars = context.english_chars
         total_chars = sinhala_chars + english_chars
         
         if total_chars == 0:
@@ -128,42 +328,47 @@ class SinhalaTextPreprocessor:
         else:
             return 'mixed'
     
-    def handle_obfuscation(self, text):
-        """Enhanced obfuscation handling for Sinhala/Singlish variations"""
-        # Character substitutions (enhanced)
-        substitutions = {
-            '@': 'a', '3': 'e', '1': 'i', '0': 'o', '$': 's', '7': 't',
-            '4': 'a', '8': 'b', '!': 'i', '5': 's', '2': 'z', '6': 'g',
-            '9': 'g', '+': 't', '*': 'a', '#': 'h'
-        }
+    def _compile_preprocessing_tables(self):
+        """Build the translate tables and combined regexes used by preprocess_text"""
+        # The conjunct keys cannot overlap or be re-created by a replacement,
+        # so one alternation is equivalent to replacing them one by one
+        if self.char_mapping:
+            self._char_mapping_regex = re.compile(
+                '|'.join(re.escape(old) for old in sorted(self.char_mapping, key=len, reverse=True))
+            )
+        else:
+            self._char_mapping_regex = None
         
-        for sub, original in substitutions.items():
-            text = text.replace(sub, original)
+        self._obfuscation_table = str.maketrans(self.OBFUSCATION_SUBSTITUTIONS)
         
-        # Handle common Sinhala/Singlish letter variations
-        sinhala_variations = {
-            'tha': 'ta', 'dha': 'da', 'gha': 'ga', 'bha': 'ba',
-            'kha': 'ka', 'pha': 'pa', 'jha': 'ja', 'sha': 'sa',
-            # Add more Singlish-specific patterns
-            'tt': 't', 'pp': 'p', 'kk': 'k', 'bb': 'b',
-            'aa': 'a', 'ee': 'e', 'ii': 'i', 'oo': 'o', 'uu': 'u'
-        }
+        # 'Xha' -> 'Xa' replacements never create a new 'ha' match, and each
+        # sequential 'xx' -> 'x' replace halves (rounding up) every run of x
+        aspirated = ''.join(key[0] for key in self.SINHALA_VARIATIONS if len(key) == 3)
+        doubled = ''.join(key[0] for key in self.SINHALA_VARIATIONS if len(key) == 2)
+        self._aspirated_regex = re.compile(f'([{aspirated}])ha')
+        self._doubled_regex = re.compile(rf'([{doubled}])\1+')
+    
+    def handle_obfuscation(self, text):
+        """Enhanced obfuscation handling for Sinhala/Singlish variations"""
+        # Character substitutions (one translate pass)
+        text = text.translate(self._obfuscation_table)
         
-        for variation, normalized in sinhala_variations.items():
-            text = text.replace(variation, normalized)
+        # Sinhala/Singlish letter variations: aspirated pairs, then doubled letters
+        text = self._aspirated_regex.sub(r'\1a', text)
+        text = self._doubled_regex.sub(lambda m: m.group(1) * ((len(m.group(0)) + 1) // 2), text)
         
         # Handle vowel ending variations (common in Singlish)
         # Convert common ending patterns to standard forms
-        text = re.sub(r'o$', 'a', text)  # hutto -> hutta
-        text = re.sub(r'e$', 'a', text)  # pakke -> pakka (then -> paka)
+        text = self._ENDING_O_REGEX.sub('a', text)  # hutto -> hutta
+        text = self._ENDING_E_REGEX.sub('a', text)  # pakke -> pakka (then -> paka)
         
         # Remove excessive repetition but preserve some patterns
-        text = re.sub(r'(.)\1{4,}', r'\1\1\1', text)  # Keep up to 3 repetitions
+        text = self._REPETITION_REGEX.sub(r'\1\1\1', text)  # Keep up to 3 repetitions
         
         # Handle spaced letters (h a t e -> hate)
-        text = re.sub(r'\b(\w)\s+(\w)\s+(\w)\s+(\w)', r'\1\2\3\4', text)
-        text = re.sub(r'\b(\w)\s+(\w)\s+(\w)', r'\1\2\3', text)
-        text = re.sub(r'\b(\w)\s+(\w)', r'\1\2', text)
+        text = self._SPACED_4_REGEX.sub(r'\1\2\3\4', text)
+        text = self._SPACED_3_REGEX.sub(r'\1\2\3', text)
+        text = self._SPACED_2_REGEX.sub(r'\1\2', text)
         
         # Handle mixed case obfuscation (HuTTa -> hutta)
         text = text.lower()
@@ -175,13 +380,20 @@ class SinhalaTextPreprocessor:
     
     def preprocess_text(self, text):
         """Comprehensive text preprocessing"""
-        if pd.isna(text) or text is None:
+        if _is_missing(text):
             return ""
         
-        text = str(text)
+        with stage_latency.time('preprocess'):
+            return self._preprocess_text(str(text))
+    
+    def _preprocess_text(self, text):
         
-        # Normalize case but preserve Sinhala
-        english_part = re.sub(r'[^\u0D80-\u0DFF]', lambda m: m.group(0).lower(), text)
+        # Normalize case but preserve Sinhala (Sinhala has no case, so lower()
+        # only differs from per-character lowering by the final sigma rule)
+        if 'Σ' in text:
+            english_part = self._NON_SINHALA_REGEX.sub(lambda m: m.group(0).lower(), text)
+        else:
+            english_part = text.lower()
         
         # Normalize Sinhala characters
         text = self.normalize_sinhala(english_part)
@@ -190,16 +402,23 @@ class SinhalaTextPreprocessor:
         text = self.handle_obfuscation(text)
         
         # Remove URLs, emails, mentions
-        text = re.sub(r'http\S+|www\S+|@\w+', '', text)
+        text = self._URL_MENTION_REGEX.sub('', text)
         
         # Remove excessive punctuation but keep some context
-        text = re.sub(r'[^\w\s\u0D80-\u0DFF.,!?]', ' ', text)
+        text = self._PUNCTUATION_REGEX.sub(' ', text)
         
         # Remove extra whitespace
-        text = re.sub(r'\s+', ' ', text).strip()
+        text = self._WHITESPACE_REGEX.sub(' ', text).strip()
         
         return text
     
+    def preprocess_batch(self, texts):
+        """Preprocess a list or pandas Series of texts (a Series keeps its index)"""
+        pd = sys.modules.get('pandas')
+        if pd is not None and isinstance(texts, pd.Series):
+            return texts.map(self.preprocess_text)
+        return [self.preprocess_text(text) for text in texts]
+    
     def calculate_similarity(self, word1, word2):
         """Enhanced similarity calculation for Singlish word variations"""
         # Direct match
@@ -238,22 +457,11 @@ class SinhalaTextPreprocessor:
                 similarity = max(similarity, 0.95)
             
             # Also try removing all repetitions for very similar words
-            clean1 = re.sub(r'(.)\1+', r'\1', word1)
-            clean2 = re.sub(r'(.)\1+', r'\1', word2)
-            if clean1 == clean2:
+            if collapse_repetitions(word1) == collapse_repetitions(word2):
                 similarity = max(similarity, 0.90)
         
         # Pattern 3: Common Singlish character substitutions
-        def apply_singlish_normalizations(word):
-            # Common vowel variations in Singlish
-            variations = word
-            variations = variations.replace('a', 'o')  # a->o variations
-            variations = re.sub(r'o$', 'a', variations)  # ending o->a
-            variations = re.sub(r'e$', 'a', variations)  # ending e->a
-            return variations
-        
-        # Check with character substitutions
-        if apply_singlish_normalizations(word1) == word2 or apply_singlish_normalizations(word2) == word1:
+        if singlish_normalize(word1) == word2 or singlish_normalize(word2) == word1:
             similarity = max(similarity, 0.85)
         
         # Pattern 4: Substring containment (for longer variations)
@@ -354,86 +562,81 @@ class SinhalaTextPreprocessor:
                 if word[i].isalpha() and word[i] not in 'aeiou':
                     variations.append(word[:i] + word[i] + word[i:])
         
-        # Pattern 6: Remove duplicates and return
-        unique_variations = list(set(variations))
+        # Pattern 6: Remove duplicates (keeping generation order so the cut below is deterministic)
+        unique_variations = list(dict.fromkeys(variations))
         
         # Limit to reasonable number to avoid explosion
         return unique_variations[:50] if len(unique_variations) > 50 else unique_variations
     
-    def detect_hate_words(self, text):
-        """Enhanced hate word detection with word variations and LSTM intelligence"""
-        text_lower = text.lower()
+    def detect_hate_words(self, text, window_confidences=None, context=None):
+        """Enhanced hate word detection with word variations and LSTM intelligence
+        
+        window_confidences optionally maps context windows to LSTM scores
+        already computed for a whole batch (see detect_hate_words_batch);
+        context is the request's AnalysisContext for text, if one exists.
+        """
+        with stage_latency.time('detection'):
+            return self._detect_hate_words(text, window_confidences, context)
+    
+    def _detect_hate_words(self, text, window_confidences, context):
+        if context is None:
+            context = self.create_context(text)
         found_words = []
         found_info = []
         
-        # Split text into words for individual word checking
-        words_in_text = re.findall(r'\w+', text_lower)
+        # Words in the text for individual word checking
+        words_in_text = context.tokens
         
-        # Step 1: Check for exact matches and word variations
-        for hate_word in self.hate_words:
-            hate_word_lower = hate_word.lower()
-            
-            # Check for exact matches first
-            if hate_word_lower in text_lower:
-                if self._validate_hate_word_context(hate_word, text):
-                    if hate_word not in found_words:
-                        found_words.append(hate_word)
-                        found_info.append({
-                            'word': hate_word,
-                            'matched_text': hate_word_lower,
-                            'match_type': 'exact',
-                            'similarity': 1.0,
-                            'context_validated': True,
-                            'original_word': hate_word,
-                            'detected_variation': hate_word_lower
-                        })
-            
-            # Generate variations of this hate word
-            variations = self.generate_word_variations(hate_word_lower)
+        # Step 1: Check for exact matches and word variations in a single pass
+        with stage_latency.time('variation_matching'):
+            variation_matches = self.variation_index.match(context.text_lower)
+        for hate_word, variation, is_exact in variation_matches:
+            # Additional context check: is this word actually hateful in this context?
+            if hate_word in found_words or not self._validate_hate_word_context(hate_word, context):
+                continue
             
-            # Check for variations using similarity matching
-            for variation in variations:
-                if variation in text_lower:
-                    # Additional context check: is this word actually hateful in this context?
-                    if self._validate_hate_word_context(hate_word, text):
-                        if hate_word not in found_words:
-                            found_words.append(hate_word)
-                            found_info.append({
-                                'word': hate_word,
-                                'matched_text': variation,
-                                'match_type': 'variation',
-                                'similarity': 0.9,
-                                'context_validated': True,
-                                'original_word': hate_word,
-                                'detected_variation': variation
-                            })
+            found_words.append(hate_word)
+            found_info.append({
+                'word': hate_word,
+                'matched_text': variation,
+                'match_type': 'exact' if is_exact else 'variation',
+                'similarity': 1.0 if is_exact else 0.9,
+                'context_validated': True,
+                'original_word': hate_word,
+                'detected_variation': variation
+            })
         
         # Step 1.5: Use similarity-based fuzzy matching for words not caught by variations
-        for hate_word in self.hate_words:
-            hate_word_lower = hate_word.lower()
+        # The first token (in text order) matching a hate word wins
+        fuzzy_matches = {}
+        unique_words = dict.fromkeys(words_in_text)
+        with stage_latency.time('fuzzy_matching'):
+            for word_in_text in unique_words:
+                for word_index, similarity in self._fuzzy_token_matches(word_in_text):
+                    if word_index not in fuzzy_matches:
+                        fuzzy_matches[word_index] = (word_in_text, similarity)
+        words_scanned.inc(amount=len(unique_words))
+        
+        for word_index in sorted(fuzzy_matches):
+            hate_word = self.fuzzy_index.hate_words[word_index]
+            word_in_text, similarity = fuzzy_matches[word_index]
             
-            # Check each word in the text against this hate word
-            for word_in_text in words_in_text:
-                if word_in_text != hate_word_lower:  # Skip exact matches already found
-                    similarity = self.calculate_similarity(hate_word_lower, word_in_text)
-                    
-                    # If similarity is high enough and word not already found
-                    if similarity >= 0.8 and hate_word not in found_words:
-                        if self._validate_hate_word_context(hate_word, text):
-                            found_words.append(hate_word)
-                            found_info.append({
-                                'word': hate_word,
-                                'matched_text': word_in_text,
-                                'match_type': 'fuzzy',
-                                'similarity': similarity,
-                                'context_validated': True,
-                                'original_word': hate_word,
-                                'detected_variation': word_in_text
-                            })
+            # If similarity is high enough and word not already found
+            if hate_word not in found_words and self._validate_hate_word_context(hate_word, context):
+                found_words.append(hate_word)
+                found_info.append({
+                    'word': hate_word,
+                    'matched_text': word_in_text,
+                    'match_type': 'fuzzy',
+                    'similarity': similarity,
+                    'context_validated': True,
+                    'original_word': hate_word,
+                    'detected_variation': word_in_text
+                })
         
         # Step 2: Use LSTM model to understand context and identify suspicious words
         # This is more intelligent than just dictionary lookup
-        suspicious_words = self._identify_suspicious_words_with_lstm(text, words_in_text)
+        suspicious_words = self._identify_suspicious_words_with_lstm(context, window_confidences)
         
         # Step 3: Apply intelligent filtering based on context
         for word_info in suspicious_words:
@@ -442,7 +645,7 @@ class SinhalaTextPreprocessor:
             context_score = word_info['context_score']
             
             # Only include words that pass intelligent filtering and aren't already found
-            if self._is_word_hateful_in_context(word, text, confidence, context_score) and word not in found_words:
+            if self._is_word_hateful_in_context(word, context.text, confidence, context_score) and word not in found_words:
                 found_words.append(word)
                 found_info.append({
                     'word': word,
@@ -457,37 +660,100 @@ class SinhalaTextPreprocessor:
         self.last_detection_info = found_info
         return found_words
     
-    def _identify_suspicious_words_with_lstm(self, text, words_in_text):
+    def _fuzzy_token_matches(self, token):
+        """Hate words (lexicon index, similarity) a token fuzzily matches, memoized across requests
+        
+        A memoized result computed before words were added is extended with
+        the new words only.
+        """
+        word_count = self.fuzzy_word_count
+        entry = self.token_match_memo.get(token, word_count)
+        if entry is not None and entry[1] >= word_count:
+            return entry[0]
+        known, first_new = entry if entry is not None else ((), 0)
+        
+        # The fuzzy index narrows the token down to hate words that can reach the threshold
+        matches = list(known)
+        for word_index in sorted(self.fuzzy_index.candidates(token)):
+            if not first_new <= word_index < word_count:
+                continue
+            hate_word_lower = self.fuzzy_index.hate_words[word_index].lower()
+            if token == hate_word_lower:  # Skip exact matches already found
+                continue
+            similarity = self.calculate_similarity(hate_word_lower, token)
+            if similarity >= self.fuzzy_threshold:
+                matches.append((word_index, similarity))
+        
+        matches = tuple(matches)
+        self.token_match_memo.put(token, matches, word_count)
+        return matches
+    
+    def detect_hate_words_batch(self, texts, contexts=None):
+        """Detect hate words in many texts, scoring all LSTM context windows in one batch
+        
+        Returns a list of (hate_words, detection_info) pairs in input order.
+        """
+        if contexts is None:
+            contexts = [self.create_context(text) for text in texts]
+        
+        all_windows = []
+        for context in contexts:
+            for _, context_windows in self._collect_context_windows(context):
+                all_windows.extend(context_windows)
+        window_confidences = self._score_context_windows(all_windows)
+        
+        results = []
+        for text, context in zip(texts, contexts):
+            hate_words = self.detect_hate_words(text, window_confidences, context)
+            results.append((hate_words, self.last_detection_info))
+        return results
+    
+    def _collect_context_windows(self, context):
+        """Create context windows around every word worth checking with the LSTM"""
+        candidates = []
+        for word in context.tokens:
+            if len(word) < 3 or word.lower() in self.safe_words:
+                    continue
+            # Window of 5 words before and after each occurrence
+            candidates.append((word, context.context_windows(word)))
+        return candidates
+    
+    def _score_context_windows(self, context_windows):
+        """Score all distinct context windows with one batched LSTM call"""
+        unique_windows = list(dict.fromkeys(context_windows))
+        window_confidences = {}
+        if unique_windows:
+            with stage_latency.time('context_scoring'):
+                lstm_results = predict_hate_speech_batch(unique_windows)
+            windows_scored.inc(amount=len(unique_windows))
+            for context, lstm_result in zip(unique_windows, lstm_results):
+                window_confidences[context] = lstm_result['probabilities']['OFF']
+        return window_confidences
+    
+    def _identify_suspicious_words_with_lstm(self, context, window_confidences=None):
         """Use LSTM model understanding to identify suspicious words"""
         suspicious_words = []
         
+        candidates = self._collect_context_windows(context)
+        if window_confidences is None:
+            window_confidences = self._score_context_windows(
+                window for _, context_windows in candidates for window in context_windows
+            )
+        
         # Analyze each word in context using LSTM model
-        for word in words_in_text:
-            if len(word) < 3 or word.lower() in self.safe_words:
-                    continue
-                
-            # Create context windows around the word
-            context_windows = self._create_context_windows(text, word)
-            
-            # Use LSTM to analyze each context window
+        for word, context_windows in candidates:
             max_confidence = 0.0
             best_context = ""
             
-            for context in context_windows:
-                try:
-                    # Use the LSTM model to analyze this context
-                    lstm_result = predict_hate_speech(context)
-                    confidence = lstm_result['probabilities']['OFF']
-                    
-                    if confidence > max_confidence:
-                        max_confidence = confidence
-                        best_context = context
-                except:
-                    continue
+            for window in context_windows:
+                confidence = window_confidences[window]
+                if confidence > max_confidence:
+                    max_confidence = confidence
+                    best_context = window
             
             # If LSTM identifies this word as suspicious in context
             if max_confidence > 0.6:  # Threshold for suspicious words
-                context_score = self._calculate_context_score(word, text)
+                context_score = self._calculate_context_score(word, context)
                 
                 suspicious_words.append({
                     'word': word,
@@ -499,30 +765,16 @@ class SinhalaTextPreprocessor:
         
         return suspicious_words
     
-    def _create_context_windows(self, text, target_word):
-        """Create context windows around a target word for LSTM analysis"""
-        windows = []
-        words = text.split()
-        
-        for i, word in enumerate(words):
-            if target_word.lower() in word.lower():
-                # Create window of 5 words before and after
-                start = max(0, i - 5)
-                end = min(len(words), i + 6)
-                context = ' '.join(words[start:end])
-                windows.append(context)
-        
-        return windows
-    
-    def _calculate_context_score(self, word, text):
+    def _calculate_context_score(self, word, context):
         """Calculate how hateful a word is in its context"""
         # Analyze surrounding words and patterns
         score = 0.0
         
         # Check for aggressive language patterns
         aggressive_patterns = ['you', 'your', 'are', 'is', 'was', 'will', 'should', 'must']
-        words_before = text.lower().split(word.lower())[0].split()[-3:]  # Last 3 words before
-        words_after = text.lower().split(word.lower())[-1].split()[:3]   # First 3 words after
+        parts = context.split_on(word.lower())
+        words_before = parts[0].split()[-3:]  # Last 3 words before
+        words_after = parts[-1].split()[:3]   # First 3 words after
         
         # Score based on surrounding aggressive language
         for pattern in aggressive_patterns:
@@ -530,7 +782,8 @@ class SinhalaTextPreprocessor:
                 score += 0.2
         
         # Check for repetition (common in hate speech)
-        if text.lower().count(word.lower()) > 1:
+        occurrences = len(parts) - 1
+        if occurrences > 1:
             score += 0.3
         
         # Check for capitalization (common in aggressive text)
@@ -547,224 +800,894 @@ class SinhalaTextPreprocessor:
         # High threshold to avoid false positives
         return combined_score > 0.75
     
-    def _validate_hate_word_context(self, hate_word, text):
+    def _validate_hate_word_context(self, hate_word, context):
         """Validate if a known hate word is actually hateful in this context"""
         # Check if the word is being used in a non-hateful context
         # For example, "I'm not a pakaya" should not be flagged
         
         # Look for negation patterns
         negation_words = ['not', 'no', 'never', 'isnt', 'arent', 'wasnt', 'werent']
-        words_before = text.lower().split(hate_word.lower())[0].split()[-2:]
+        words_before = context.split_on(hate_word.lower())[0].split()[-2:]
         
         for neg_word in negation_words:
             if neg_word in words_before:
                 return False  # Likely not hateful due to negation
         
         # Check for quotation marks (might be discussing the word)
-        if f'"{hate_word}"' in text or f"'{hate_word}'" in text:
+        if f'"{hate_word}"' in context.text or f"'{hate_word}'" in context.text:
             return False
         
         return True
 
-def load_lstm_model():
-    """Load the enhanced LSTM model and tokenizer"""
-    global model, tokenizer, preprocessor
+def find_model_bundle():
+    """Path of the model bundle (MODEL_BUNDLE or the default locations), if there is one"""
+    if model_bundle_path:
+        return None if model_bundle_path.lower() == 'off' else model_bundle_path
+    bundle_paths = [
+        'models/singlish_model.bundle',
+        'ml_backend/models/singlish_model.bundle',
+        '../ml_backend/models/singlish_model.bundle'
+    ]
+    return next((path for path in bundle_paths if os.path.exists(path)), None)
+
+def find_model_file():
+    """Path of the model file for inference_backend (the default locations), if there is one"""
+    # Try different possible paths for model files
+    possible_paths = [
+        'models/singlish_lstm_model.h5',
+        'ml_backend/models/singlish_lstm_model.h5',
+        '../ml_backend/models/singlish_lstm_model.h5'
+    ]
+    if inference_backend == 'numpy':
+        possible_paths = [path.replace('singlish_lstm_model.h5', 'singlish_lstm_weights.npz') for path in possible_paths]
+    elif inference_backend == 'tflite':
+        if tflite_variant not in TFLITE_VARIANTS:
+            print(f"Unknown TFLITE_VARIANT '{tflite_variant}', expected one of {TFLITE_VARIANTS}")
+            return None
+        possible_paths = [tflite_model_path(os.path.dirname(path), tflite_variant) for path in possible_paths]
+    
+    return next((path for path in possible_paths if os.path.exists(path)), None)
+
+def _load_model_file(bundle=None):
+    """(model, model_version) for inference_backend, or None if there is no model file"""
+    # The bundle carries the weights for the NumPy and Keras backends
+    if bundle is not None and inference_backend in ('numpy', 'keras'):
+        loaded = bundle.numpy_model() if inference_backend == 'numpy' else bundle.keras_model()
+        print(f"Enhanced LSTM model ({inference_backend}) loaded from bundle {bundle.version}")
+        return loaded, bundle.version
+    
+    model_path = find_model_file()
+    if not model_path:
+        print(f"Enhanced model file for the {inference_backend} backend not found")
+        return None
+    
+    if inference_backend == 'numpy':
+        loaded = NumpyLSTMModel(model_path)
+    elif inference_backend == 'tflite':
+        loaded = TFLiteModel(model_path)
+    else:
+        from tensorflow.keras.models import load_model
+        loaded = load_model(model_path)
+    print(f"Enhanced LSTM model ({inference_backend}) loaded from {model_path}")
+    return loaded, f"{os.path.basename(model_path)}@{int(os.path.getmtime(model_path))}"
+
+def load_inference_model():
+    """Load the model file for inference_backend into the current generation
     
+    Used by prefork workers whose generation was built without the model.
+    """
+    generation = generations.current
     try:
-        # Try different possible paths for model files
-        possible_paths = [
-            'models/singlish_lstm_model.h5',
-            'ml_backend/models/singlish_lstm_model.h5',
-            '../ml_backend/models/singlish_lstm_model.h5'
-        ]
-        
-        model_path = None
-        for path in possible_paths:
-            if os.path.exists(path):
-                model_path = path
-                break
-        
-        if model_path:
-            model = load_model(model_path)
-            print(f"Enhanced LSTM model loaded from {model_path}")
-        else:
-            print(f"Enhanced model file not found. Tried: {possible_paths}")
-            return False
+        loaded = _load_model_file(generation.bundle)
+    except Exception as e:
+        print(f"Error loading model: {e}")
+        return False
+    if loaded is None:
+        return False
+    generation.model, generation.model_version = loaded
+    return True
+
+def _load_tokenizer(bundle, preprocessor, max_words):
+    """Serving tokenizer: bundle, vocabulary file, pickled Keras tokenizer or a fallback"""
+    if bundle is not None:
+        print(f"LSTM vocabulary loaded from bundle {bundle.version}")
+        return bundle.tokenizer()
+    
+    # Compact vocabulary exported by export_tokenizer.py (no pickle/TensorFlow needed)
+    vocab_paths = [
+        'models/singlish_vocab.npz',
+        'ml_backend/models/singlish_vocab.npz',
+        '../ml_backend/models/singlish_vocab.npz'
+    ]
+    vocab_path = next((path for path in vocab_paths if os.path.exists(path)), None)
+    if vocab_path:
+        print(f"LSTM vocabulary loaded from {vocab_path}")
+        return VocabTokenizer(vocab_path)
+    
+    # Otherwise load the pickled LSTM tokenizer (try multiple possible names)
+    tokenizer_paths = [
+        'models/singlish_tokenizer.pkl',
+        'models/lstm_tokenizer.pkl',
+        'ml_backend/models/singlish_tokenizer.pkl',
+        'ml_backend/models/lstm_tokenizer.pkl',
+        '../ml_backend/models/singlish_tokenizer.pkl',
+        '../ml_backend/models/lstm_tokenizer.pkl'
+    ]
+    tokenizer_path = next((path for path in tokenizer_paths if os.path.exists(path)), None)
+    if tokenizer_path:
+        with open(tokenizer_path, 'rb') as f:
+            tokenizer = pickle.load(f)
+        print(f"LSTM tokenizer loaded from {tokenizer_path} (run export_tokenizer.py to load it without pickle)")
+        return VocabTokenizer.from_keras(tokenizer)
+    
+    print(f"LSTM tokenizer file not found. Tried: {tokenizer_paths}")
+    print("Creating a basic tokenizer as fallback...")
+    
+    # Create a basic tokenizer with common parameters
+    from tensorflow.keras.preprocessing.text import Tokenizer
+    tokenizer = Tokenizer(num_words=max_words, oov_token='<OOV>')
+    
+    # If we have training data, fit the tokenizer
+    try:
+        # Try to load some sample data to fit the tokenizer
+        import pandas as pd
+        sample_texts = []
+        for data_file in ['../DataSets/test.csv', '../DataSets/only_hate.csv']:
+            if os.path.exists(data_file):
+                df = pd.read_csv(data_file)
+                if 'text' in df.columns:
+                    sample_texts.extend(df['text'].astype(str).tolist())
+                elif 'Text' in df.columns:
+                    sample_texts.extend(df['Text'].astype(str).tolist())
+        
+        if sample_texts:
+            # Preprocess sample texts
+            processed_texts = [preprocessor.preprocess_text(text) for text in sample_texts[:1000]]  # Use first 1000
+            tokenizer.fit_on_texts(processed_texts)
+            print(f"✅ Created tokenizer from {len(sample_texts)} sample texts")
             
-        # Load LSTM tokenizer (try multiple possible names)
-        tokenizer_paths = [
-            'models/singlish_tokenizer.pkl',
-            'models/lstm_tokenizer.pkl',
-            'ml_backend/models/singlish_tokenizer.pkl',
-            'ml_backend/models/lstm_tokenizer.pkl',
-            '../ml_backend/models/singlish_tokenizer.pkl',
-            '../ml_backend/models/lstm_tokenizer.pkl'
-        ]
-        
-        tokenizer_path = None
-        for path in tokenizer_paths:
-            if os.path.exists(path):
-                tokenizer_path = path
-                break
-                
-        if tokenizer_path:
-            with open(tokenizer_path, 'rb') as f:
-                tokenizer = pickle.load(f)
-            print(f"LSTM tokenizer loaded from {tokenizer_path}")
+            # Save the created tokenizer for future use
+            with open('models/singlish_tokenizer.pkl', 'wb') as f:
+                pickle.dump(tokenizer, f)
+            print("✅ Saved created tokenizer to models/singlish_tokenizer.pkl")
         else:
-            print(f"LSTM tokenizer file not found. Tried: {tokenizer_paths}")
-            print("Creating a basic tokenizer as fallback...")
+            print("⚠️  No training data found, creating basic vocabulary tokenizer")
+            # Create a basic vocabulary from hate words and common Singlish terms
+            basic_vocab = [
+                'hutta', 'hutto', 'hutttta', 'paka', 'pako', 'pakaa', 'balla', 'ballo',
+                'modaya', 'modo', 'haraka', 'harako', 'pissu', 'gon', 'kata', 'sepak',
+                'you', 'are', 'such', 'a', 'bad', 'person', 'this', 'is', 'not', 'good',
+                'hate', 'speech', 'offensive', 'content', 'safe', 'normal', 'text'
+            ]
+            tokenizer.fit_on_texts(basic_vocab)
+            print(f"✅ Created basic tokenizer with {len(basic_vocab)} vocabulary terms")
             
-            # Create a basic tokenizer with common parameters
-            from tensorflow.keras.preprocessing.text import Tokenizer
-            tokenizer = Tokenizer(num_words=max_words, oov_token='<OOV>')
-            
-            # If we have training data, fit the tokenizer
-            try:
-                # Try to load some sample data to fit the tokenizer
-                sample_texts = []
-                for data_file in ['../DataSets/test.csv', '../DataSets/only_hate.csv']:
-                    if os.path.exists(data_file):
-                        df = pd.read_csv(data_file)
-                        if 'text' in df.columns:
-                            sample_texts.extend(df['text'].astype(str).tolist())
-                        elif 'Text' in df.columns:
-                            sample_texts.extend(df['Text'].astype(str).tolist())
-                
-                if sample_texts:
-                    # Preprocess sample texts
-                    processed_texts = [preprocessor.preprocess_text(text) for text in sample_texts[:1000]]  # Use first 1000
-                    tokenizer.fit_on_texts(processed_texts)
-                    print(f"✅ Created tokenizer from {len(sample_texts)} sample texts")
-                    
-                    # Save the created tokenizer for future use
-                    with open('models/singlish_tokenizer.pkl', 'wb') as f:
-                        pickle.dump(tokenizer, f)
-                    print("✅ Saved created tokenizer to models/singlish_tokenizer.pkl")
-                else:
-                    print("⚠️  No training data found, creating basic vocabulary tokenizer")
-                    # Create a basic vocabulary from hate words and common Singlish terms
-                    basic_vocab = [
-                        'hutta', 'hutto', 'hutttta', 'paka', 'pako', 'pakaa', 'balla', 'ballo',
-                        'modaya', 'modo', 'haraka', 'harako', 'pissu', 'gon', 'kata', 'sepak',
-                        'you', 'are', 'such', 'a', 'bad', 'person', 'this', 'is', 'not', 'good',
-                        'hate', 'speech', 'offensive', 'content', 'safe', 'normal', 'text'
-                    ]
-                    tokenizer.fit_on_texts(basic_vocab)
-                    print(f"✅ Created basic tokenizer with {len(basic_vocab)} vocabulary terms")
-                    
-            except Exception as e:
-                print(f"⚠️  Could not create tokenizer from data: {e}")
-                print("Creating minimal vocabulary tokenizer...")
-                # Last resort: create with absolute minimal vocab
-                basic_vocab = ['hutta', 'paka', 'balla', 'you', 'are', 'bad', 'good']
-                tokenizer.fit_on_texts(basic_vocab)
-                print("Using minimal tokenizer with basic vocabulary")
-            
-        # Always use fresh preprocessor with latest enhancements
-        preprocessor = SinhalaTextPreprocessor()
-        print(f"Fresh enhanced preprocessor created with fuzzy matching capabilities")
-            
-        return True
+    except Exception as e:
+        print(f"⚠️  Could not create tokenizer from data: {e}")
+        print("Creating minimal vocabulary tokenizer...")
+        # Last resort: create with absolute minimal vocab
+        basic_vocab = ['hutta', 'paka', 'balla', 'you', 'are', 'bad', 'good']
+        tokenizer.fit_on_texts(basic_vocab)
+        print("Using minimal tokenizer with basic vocabulary")
+    
+    return VocabTokenizer.from_keras(tokenizer)
+
+def build_generation(include_model=True):
+    """Load the model, tokenizer and preprocessor into a new (not yet current) generation
+    
+    Nothing shared is touched, so this runs while the current generation keeps
+    serving. Raises if an artifact cannot be loaded.
+    """
+    # One step when there is a bundle: weights, vocabulary, lexicon and tables
+    bundle = None
+    generation_max_words, generation_max_len, generation_buckets = max_words, max_len, length_buckets
+    bundle_path = find_model_bundle()
+    if bundle_path:
+        bundle = ModelBundle(bundle_path)
+        generation_max_words = bundle.metadata.get('max_words', max_words)
+        generation_max_len = bundle.metadata.get('max_len', max_len)
+        generation_buckets = parse_length_buckets(os.environ.get('LENGTH_BUCKETS', DEFAULT_LENGTH_BUCKETS), generation_max_len)
+        print(f"Model bundle {bundle.version} loaded from {bundle_path}")
+    
+    generation = ModelGeneration(generations.next_number(), bundle=bundle, max_words=generation_max_words,
+                                 max_len=generation_max_len, length_buckets=generation_buckets)
+    if include_model:
+        loaded = _load_model_file(bundle)
+        if loaded is None:
+            raise FileNotFoundError('Failed to load model. Please ensure model files exist.')
+        generation.model, generation.model_version = loaded
+    
+    # Always use fresh preprocessor with latest enhancements
+    generation.preprocessor = SinhalaTextPreprocessor(lexicon_store=lexicon_store)
+    if bundle is not None:
+        generation.preprocessor.apply_bundle_tables(bundle.sections['lexicon'], bundle.sections['preprocessing'])
+    print(f"Fresh enhanced preprocessor created with fuzzy matching capabilities")
+    
+    generation.tokenizer = _load_tokenizer(bundle, generation.preprocessor, generation_max_words)
+    
+    # Concurrent requests of this generation share its model.predict calls
+    def predict_rows(x):
+        model_batch_rows.observe(len(x))
+        return generation.model.predict(x, verbose=0)
+    
+    generation.batcher = MicroBatcher(predict_rows, max_batch_size=micro_batch_size, max_wait_ms=micro_batch_wait_ms)
+    return generation
+
+def validate_generation(generation):
+    """Smoke-test a new generation before it takes traffic"""
+    if generation.model is None:
+        return
+    sample = generation.preprocessor.preprocess_text('hutto mokda karanne')
+    output = np.asarray(generation.model.predict(generation.tokenizer.encode_batch([sample], generation.max_len), verbose=0))
+    if output.shape != (1, 1) or not np.all(np.isfinite(output)):
+        raise ValueError(f"Model smoke test failed: output {output.tolist()}")
+
+def load_lstm_model(include_model=True):
+    """Load the model, tokenizer and preprocessor, tracking model_state for /health
+    
+    include_model=False loads everything but the model file (see load_inference_model).
+    """
+    global model_state, model_load_error
+    
+    model_state = 'loading'
+    try:
+        generation = build_generation(include_model)
     except Exception as e:
         print(f"Error loading model: {e}")
+        model_load_error = 'Failed to load model. Please ensure model files exist.'
+        model_state = 'failed'
         return False
+    
+    generations.install(generation)
+    model_load_error = None
+    model_state = 'ready'
+    return True
+
+def reload_model(reason='admin', include_model=True):
+    """Build and validate a new generation off the request path, then swap it in
+    
+    Requests already running finish on the generation they started with. If
+    anything fails the current generation keeps serving. Returns the reload
+    record (also kept in last_reload for GET /admin/reload).
+    """
+    global last_reload, model_state, model_load_error
+    
+    if not reload_lock.acquire(blocking=False):
+        return {'status': 'in_progress', 'reason': reason}
+    try:
+        started = time.time()
+        record = {'reason': reason, 'started': datetime.fromtimestamp(started).isoformat()}
+        try:
+            generation = build_generation(include_model)
+            validate_generation(generation)
+        except Exception as e:
+            print(f"❌ Reload ({reason}) failed, keeping generation "
+                  f"{generations.current.number if generations.current else None}: {e}")
+            record.update({'status': 'rolled_back', 'error': str(e)})
+        else:
+            previous = generations.install(generation)
+            model_load_error = None
+            model_state = 'ready'
+            print(f"✅ Reloaded ({reason}): generation {generation.number} replaces "
+                  f"{previous.number if previous else None}")
+            record.update({'status': 'ok', 'generation': generation.number,
+                           'previous_generation': previous.number if previous else None})
+        record['duration_seconds'] = round(time.time() - started, 3)
+        last_reload = record
+        return record
+    finally:
+        reload_lock.release()
+
+def artifact_paths():
+    """Files whose change needs a reload: bundle, model file and vocabulary
+    
+    Learned hate words are appended to the lexicon file on every missed_hate
+    feedback; those are picked up by refresh_lexicon() instead.
+    """
+    candidates = [find_model_bundle(), find_model_file()]
+    for directory in ['models', 'ml_backend/models', '../ml_backend/models']:
+        candidates.append(os.path.join(directory, 'singlish_vocab.npz'))
+    return [path for path in candidates if path]
+
+def refresh_lexicon():
+    """Add hate words other processes appended to the lexicon file (no reload)"""
+    new_words = lexicon_store.refresh()
+    generation = generations.current
+    if not new_words or generation is None or generation.preprocessor is None:
+        return []
+    added = [word for word in new_words if generation.preprocessor.add_hate_word(word)]
+    if added:
+        print(f"Added {len(added)} hate words learned by other processes")
+    return added
+
+def start_artifact_watcher(include_model=True):
+    """Reload whenever an artifact file changes (MODEL_RELOAD_INTERVAL > 0)"""
+    global artifact_watcher
+    
+    if model_reload_interval <= 0 or artifact_watcher is not None:
+        return None
+    artifact_watcher = ArtifactWatcher(artifact_paths, lambda: reload_model('artifacts changed', include_model),
+                                       interval=model_reload_interval)
+    artifact_watcher.start()
+    print(f"Watching model artifacts every {model_reload_interval:g}s")
+    return artifact_watcher
+
+def start_lexicon_watcher():
+    """Keep the lexicon in step with words other processes learn (MODEL_RELOAD_INTERVAL > 0)
+    
+    Each prefork worker runs its own, since they do not share memory.
+    """
+    global lexicon_watcher
+    
+    if model_reload_interval <= 0 or lexicon_watcher is not None:
+        return None
+    # refresh() skips our own appends and add() leaves the other processes' lines to it,
+    # so /feedback never marks the file current
+    lexicon_watcher = ArtifactWatcher(lambda: [lexicon_store.path], refresh_lexicon, interval=model_reload_interval)
+    lexicon_watcher.start()
+    refresh_lexicon()  # Words appended since this process loaded the lexicon
+    return lexicon_watcher
+
+def start_model_loading():
+    """Load the model on a background thread so the server accepts connections immediately"""
+    def load():
+        if load_lstm_model():
+            print("System ready!")
+            start_artifact_watcher()
+            start_lexicon_watcher()
+        else:
+            print(model_load_error)
+    
+    thread = threading.Thread(target=load, name='model-loader', daemon=True)
+    thread.start()
+    return thread
 
 
 
-def predict_hate_speech(text):
+def _empty_prediction(error):
+    """Prediction returned when a text cannot be scored"""
+    return {
+        'prediction': 'NOT',
+        'confidence': 0.0,
+        'probabilities': {'NOT': 1.0, 'OFF': 0.0},
+        'debug_info': {'error': error}
+    }
+
+def predict_hate_speech(text, processed_text=None):
     """Predict hate speech using enhanced LSTM model"""
+    return predict_hate_speech_batch([text], None if processed_text is None else [processed_text])[0]
+
+def active_generation():
+    """Generation pinned by the current request (the current one outside requests)"""
+    if has_request_context() and g.get('generation') is not None:
+        return g.generation
+    return generations.current
+
+def length_bucketing_active(generation=None):
+    """Whether rows are padded to their length bucket instead of max_len"""
+    generation = generation or active_generation()
+    model = generation.model if generation is not None else None
+    if model is None or length_bucketing == 'off' or isinstance(model, TFLiteModel):
+        return False
+    return length_bucketing == 'on' or is_padding_invariant(model)
+
+def _predict_profiled(generation, arrays):
+    """Model outputs for each array, called directly on the request thread
+    
+    A profiled request skips the micro-batcher, whose thread cProfile does not
+    see, and counts every forward pass it makes.
+    """
+    outputs = []
+    for x in arrays:
+        count_call('model_predict')
+        outputs.append(generation.batcher.predict_fn(x))
+    return outputs
+
+def predict_hate_speech_batch(texts, processed_texts=None):
+    """Predict hate speech for a list of texts with a single batched LSTM call
+    
+    processed_texts can carry preprocess_text output the caller already has.
+    """
+    results = [None] * len(texts)
+    
     try:
-        # Use enhanced preprocessor
-        processed_text = preprocessor.preprocess_text(text)
-        
-        if not processed_text:
-            return {
-                'prediction': 'NOT',
-                'confidence': 0.0,
-                'probabilities': {'NOT': 1.0, 'OFF': 0.0},
-                'debug_info': {'error': 'Empty processed text'}
-            }
+        generation = active_generation()
+        if generation is None:
+            raise RuntimeError('Model is not loaded')
+        preprocessor, tokenizer = generation.preprocessor, generation.tokenizer
         
-        # Debug info
-        debug_info = {
-            'original_text': text,
-            'processed_text': processed_text,
-            'text_changed': text != processed_text
-        }
+        # Use enhanced preprocessor
+        if processed_texts is None:
+            processed_texts = preprocessor.preprocess_batch(texts)
         
-        # Tokenize and pad
-        sequences = tokenizer.texts_to_sequences([processed_text])
-        padded_sequences = pad_sequences(sequences, maxlen=max_len, padding='post', truncating='post')
-        
-        # Debug tokenization
-        debug_info['sequence_length'] = len(sequences[0]) if sequences[0] else 0
-        debug_info['padded_shape'] = padded_sequences.shape
-        debug_info['non_zero_tokens'] = int(np.count_nonzero(padded_sequences))
-        
-        # Check if the text actually tokenized to something meaningful
-        if debug_info['non_zero_tokens'] == 0:
-            print(f"Warning: Text '{text}' tokenized to all zeros")
-            debug_info['warning'] = 'Text tokenized to all zeros'
-        
-        # Add more detailed tokenization debug info
-        debug_info['sequence_preview'] = sequences[0][:10] if sequences[0] else []
-        debug_info['padded_preview'] = padded_sequences[0][:10].tolist()
-        debug_info['vocab_size'] = len(tokenizer.word_index) if hasattr(tokenizer, 'word_index') else 0
-        
-        # Predict (binary classification with sigmoid)
-        predictions = model.predict(padded_sequences, verbose=0)
-        prediction_proba = float(predictions[0][0])  # Convert to Python float
-        
-        # Debug model output
-        debug_info['raw_prediction'] = prediction_proba
-        debug_info['model_shape_output'] = predictions.shape
-        
-        # Get prediction and confidence
-        prediction = 'OFF' if prediction_proba > 0.5 else 'NOT'
-        confidence = float(max(prediction_proba, 1 - prediction_proba))
-        
-        # Create probabilities dict
-        probabilities = {
-            'NOT': float(1 - prediction_proba),
-            'OFF': float(prediction_proba)
-        }
+        batch_indices = []
+        for i, processed_text in enumerate(processed_texts):
+            if processed_text:
+                batch_indices.append(i)
+            else:
+                results[i] = _empty_prediction('Empty processed text')
+        
+        if not batch_indices:
+            return results
+        
+        # Tokenize the whole batch at once into flat ids + row offsets
+        token_ids, offsets = tokenizer.encode_ragged([processed_texts[i] for i in batch_indices])
+        lengths = np.diff(offsets)
+        profiled = has_request_context() and g.get('profiling')
+        if length_bucketing_active(generation):
+            # Each row padded only to its length bucket, one model call per bucket
+            groups = group_by_bucket(lengths, generation.length_buckets)
+            padded_groups = [
+                pad_ragged(token_ids, offsets, bound, padding='post', truncating='post', rows=rows)
+                for bound, rows in groups
+            ]
+            predictions = np.zeros((len(batch_indices), 1), dtype=np.float32)
+            padded_rows = [None] * len(batch_indices)
+            with stage_latency.time('lstm_predict'):
+                if profiled:
+                    outputs = _predict_profiled(generation, padded_groups)
+                else:
+                    outputs = generation.batcher.predict_many(padded_groups)
+            for (_, rows), padded, output in zip(groups, padded_groups, outputs):
+                predictions[rows] = output
+                for k, row in enumerate(rows):
+                    padded_rows[row] = padded[k:k + 1]
+        else:
+            padded_sequences = pad_ragged(token_ids, offsets, generation.max_len, padding='post', truncating='post')
+            
+            # Predict (binary classification with sigmoid) in one forward pass,
+            # shared with whatever other requests are waiting on the model
+            with stage_latency.time('lstm_predict'):
+                if profiled:
+                    predictions = _predict_profiled(generation, [padded_sequences])[0]
+                else:
+                    predictions = generation.batcher.predict(padded_sequences)
+            padded_rows = [padded_sequences[row:row + 1] for row in range(len(batch_indices))]
+        vocab_size = tokenizer.vocab_size
+        
+        for row, i in enumerate(batch_indices):
+            text = texts[i]
+            sequence = token_ids[offsets[row]:offsets[row + 1]]
+            padded_row = padded_rows[row]
+            
+            # Debug info
+            debug_info = {
+                'original_text': text,
+                'processed_text': processed_texts[i],
+                'text_changed': text != processed_texts[i]
+            }
+            
+            # Debug tokenization
+            debug_info['sequence_length'] = len(sequence)
+            debug_info['padded_shape'] = padded_row.shape
+            debug_info['non_zero_tokens'] = int(np.count_nonzero(padded_row))
+            
+            # Check if the text actually tokenized to something meaningful
+            if debug_info['non_zero_tokens'] == 0:
+                print(f"Warning: Text '{text}' tokenized to all zeros")
+                debug_info['warning'] = 'Text tokenized to all zeros'
+            
+            # Add more detailed tokenization debug info
+            debug_info['sequence_preview'] = sequence[:10].tolist()
+            debug_info['padded_preview'] = padded_row[0][:10].tolist()
+            debug_info['vocab_size'] = vocab_size
+            
+            prediction_proba = float(predictions[row][0])  # Convert to Python float
+            
+            # Debug model output
+            debug_info['raw_prediction'] = prediction_proba
+            debug_info['model_shape_output'] = predictions[row:row + 1].shape
+            
+            # Get prediction and confidence
+            prediction = 'OFF' if prediction_proba > 0.5 else 'NOT'
+            confidence = float(max(prediction_proba, 1 - prediction_proba))
+            
+            # Create probabilities dict
+            probabilities = {
+                'NOT': float(1 - prediction_proba),
+                'OFF': float(prediction_proba)
+            }
+            
+            results[i] = {
+                'prediction': prediction,
+                'confidence': confidence,
+                'probabilities': probabilities,
+                'debug_info': debug_info
+            }
         
-        return {
-            'prediction': prediction,
-            'confidence': confidence,
-            'probabilities': probabilities,
-            'debug_info': debug_info
-        }
+        return results
         
     except Exception as e:
         print(f"Error in prediction: {e}")
         import traceback
         traceback.print_exc()
-        return {
-            'prediction': 'NOT',
-            'confidence': 0.0,
-            'probabilities': {'NOT': 1.0, 'OFF': 0.0},
-            'debug_info': {'error': str(e)}
-        }
+        return [result if result is not None else _empty_prediction(str(e)) for result in results]
+
+# Endpoints that need the model, tokenizer and preprocessor
+MODEL_ENDPOINTS = {'analyze_text', 'analyze_batch', 'analyze_stream', 'submit_feedback', 'test_fuzzy_matching'}
+
+@app.before_request
+def require_ready_model():
+    """Reject model requests with 503 until background loading has finished"""
+    g.request_started = time.perf_counter()
+    if request.endpoint in MODEL_ENDPOINTS and model_state != 'ready':
+        response = jsonify({'error': 'Model is not ready', 'state': model_state})
+        response.status_code = 503
+        response.headers['Retry-After'] = '5'
+        return response
+    # Pin the generation for the whole request, so a reload cannot swap the
+    # model, tokenizer or preprocessor out from under it
+    g.generation = generations.acquire()
+
+@app.after_request
+def record_request_metrics(response):
+    """Latency (until the response is ready, for streams the first byte) and status per endpoint"""
+    started = g.get('request_started')
+    if started is not None:
+        endpoint = request.endpoint or 'unmatched'
+        request_latency.observe(time.perf_counter() - started, endpoint)
+        request_count.inc(endpoint, str(response.status_code))
+    return response
+
+@app.teardown_request
+def release_generation(exc=None):
+    """Let a replaced generation be freed once its last request is done"""
+    generation = g.pop('generation', None)
+    if generation is not None:
+        generations.release(generation)
 
 @app.route('/health', methods=['GET'])
 def health_check():
-    """Health check endpoint"""
-    if model is not None and tokenizer is not None:
+    """Health check endpoint (503 until the model is ready)"""
+    generation = active_generation()
+    if model_state == 'ready' and generation is not None and generation.model is not None and generation.tokenizer is not None:
         return jsonify({
             'status': 'healthy',
+            'state': model_state,
             'model': 'LSTM',
-            'loaded': True
+            'loaded': True,
+            'generation': generation.number
         })
     else:
         return jsonify({
             'status': 'unhealthy',
+            'state': model_state,
             'model': 'LSTM',
-            'loaded': False
-        })
+            'loaded': False,
+            'error': model_load_error
+        }), 503
+
+def _analysis_cache_key(text):
+    """Cache key: the (stripped) input text plus the generation, model and lexicon it was analyzed with
+    
+    Not the preprocessed text: hate word detection, language detection and the
+    obfuscation boost read the original, so texts that preprocess the same way
+    can still get different results.
+    """
+    generation = active_generation()
+    return (generation.number, generation.model_version, generation.preprocessor.lexicon_version, text)
+
+def get_cached_analysis(context):
+    """Look up a cached analysis of the same text
+    
+    The key is kept on the context, so the result is stored under the lexicon
+    version it was computed with even if a word is added meanwhile.
+    """
+    context.cache_key = _analysis_cache_key(context.text)
+    if has_request_context() and g.get('profiling'):
+        return None  # A profiled request always runs the full pipeline
+    response = analysis_cache.get(context.cache_key)
+    cache_lookups.inc('miss' if response is None else 'hit')
+    return response
+
+def build_analysis_response(context, lstm_result, hate_words, detection_info):
+    """Fuse the LSTM prediction and hate word detection into the /analyze response"""
+    with stage_latency.time('score_fusion'):
+        return _fuse_analysis(context, lstm_result, hate_words, detection_info)
+
+def _fuse_analysis(context, lstm_result, hate_words, detection_info):
+    text = context.text
+    language = active_generation().preprocessor.detect_language(context)
+    processed_text = context.processed_text
+    
+    # Get LSTM contribution (confidence from LSTM model)
+    lstm_contribution = float(lstm_result['probabilities']['OFF'])
+    
+    # Analyze what the LSTM model actually learned from this text
+    # This is more intelligent than just word matching
+    lstm_analysis = {
+        'model_confidence': lstm_contribution,
+        'prediction': lstm_result['prediction'],
+        'learned_patterns': 'The LSTM model has learned to recognize hate speech patterns from training data, including context, word combinations, and linguistic patterns that may not be captured by simple word lists.',
+        'context_understanding': 'Unlike word lists, the LSTM can understand context, sarcasm, and complex linguistic patterns.',
+        'training_based': 'This prediction is based on the model\'s training on thousands of labeled examples, not just dictionary matching.'
+    }
+    
+    # Calculate Sinhala ratio
+    sinhala_ratio = float(context.sinhala_ratio)
+    
+    # INTELLIGENT HATE SPEECH SCORING SYSTEM
+    # Primary: LSTM Model Intelligence
+    # Secondary: Context-aware word analysis
+    
+    # Step 1: Let LSTM be the primary decision maker
+    # The LSTM model has learned patterns from training data
+    # It can identify hate speech even without exact word matches
+    
+    # Step 2: Use word detection only as supporting evidence
+    # Not as the primary classifier
+    fuzzy_confidence = 0.0
+    high_confidence_words = []
+    
+    if hate_words and detection_info:
+        # Only use word detection if LSTM is uncertain
+        # If LSTM is very confident (>80%), trust it more than word lists
+        if lstm_contribution < 0.8:
+            # Calculate weighted fuzzy confidence as supporting evidence
+            total_similarity = 0.0
+            valid_matches = 0
+            
+            for info in detection_info:
+                similarity = info.get('similarity', 0.0)
+                match_type = info.get('match_type', 'unknown')
+                
+                # Weight by match type and similarity
+                if match_type == 'exact':
+                    weight = 1.0
+                elif match_type == 'variation':
+                    weight = 0.9
+                elif match_type == 'fuzzy' and similarity >= 0.85:
+                    weight = similarity
+                else:
+                    weight = 0.0  # Low confidence matches
+                
+                if weight > 0:
+                    total_similarity += weight
+                    valid_matches += 1
+                    
+                    # Track high-confidence hate words for reporting
+                    if weight >= 0.85:
+                        high_confidence_words.append({
+                            'word': info.get('word', ''),
+                            'matched_text': info.get('matched_text', ''),
+                            'confidence': weight,
+                            'type': match_type
+                        })
+            
+            # Calculate fuzzy confidence percentage
+            if valid_matches > 0:
+                fuzzy_confidence = min(total_similarity / valid_matches, 1.0)
+            else:
+                fuzzy_confidence = 0.3  # Low weight when LSTM is confident
+        else:
+            # LSTM is very confident, use word detection only for explanation
+            # Don't let it override LSTM's decision
+            fuzzy_confidence = 0.3  # Low weight when LSTM is confident
+    
+    # Step 2: LSTM-First Intelligent Scoring
+    # The LSTM model is the primary intelligence - it has learned from data
+    # Word detection is only supporting evidence
+    
+    final_hate_percentage = 0.0
+    
+    # Case 1: LSTM is very confident (>80%) - Trust the model
+    if lstm_contribution >= 0.8:
+        final_hate_percentage = lstm_contribution * 0.9  # 90% weight to LSTM
+        if fuzzy_confidence > 0.5:
+            final_hate_percentage += fuzzy_confidence * 0.1  # 10% supporting evidence
+        confidence_level = "High (LSTM Intelligence)"
+        
+    # Case 2: LSTM is moderately confident (50-80%) - Use both
+    elif lstm_contribution >= 0.5:
+        final_hate_percentage = lstm_contribution * 0.7  # 70% weight to LSTM
+        if fuzzy_confidence > 0.3:
+            final_hate_percentage += fuzzy_confidence * 0.3  # 30% supporting evidence
+        confidence_level = "Medium-High (LSTM + Context)"
+        
+    # Case 3: LSTM is uncertain (<50%) - Rely more on word patterns
+    elif lstm_contribution < 0.5:
+        if fuzzy_confidence >= 0.7:
+            final_hate_percentage = (lstm_contribution * 0.3) + (fuzzy_confidence * 0.7)
+            confidence_level = "Medium (Pattern Detection)"
+        else:
+            final_hate_percentage = lstm_contribution * 0.8  # Still trust LSTM more
+            confidence_level = "Low (LSTM Uncertain)"
+        final_hate_percentage = (lstm_contribution * 0.5) + (fuzzy_confidence * 0.5)
+        confidence_level = "Medium"
+        
+    # Case 5: Both low (likely safe)
+    else:
+        final_hate_percentage = max(lstm_contribution, fuzzy_confidence * 0.6)
+        confidence_level = "Low"
+    
+    # Step 3: Apply contextual adjustments
+    # Boost for multiple high-confidence hate words
+    if len(high_confidence_words) > 1:
+        final_hate_percentage = min(final_hate_percentage + 0.15, 1.0)
+    
+    # Boost for Sinhala content with hate words
+    if hate_words and sinhala_ratio > 0.5:
+        final_hate_percentage = min(final_hate_percentage + 0.05, 1.0)
+    
+    # Additional boost for text that needed processing (indicates obfuscation)
+    if processed_text != context.text_lower.strip():
+        final_hate_percentage = min(final_hate_percentage + 0.03, 1.0)
+    
+    # Convert to percentage
+    hate_score = float(final_hate_percentage)
+    
+    # Store analysis results for clear reporting
+    analysis_summary = {
+        'lstm_score': lstm_contribution * 100,
+        'fuzzy_confidence': fuzzy_confidence * 100,
+        'final_hate_percentage': hate_score * 100,
+        'confidence_level': confidence_level,
+        'high_confidence_hate_words': high_confidence_words,
+        'total_hate_words_detected': len(hate_words),
+        'analysis_method': 'Unified LSTM + Fuzzy Matching'
+    }
+    
+    # Prepare response with clear, unified results
+    response = {
+        'prediction': lstm_result['prediction'],
+        'confidence': lstm_result['confidence'],
+        'probabilities': lstm_result['probabilities'],
+        
+        # NEW: Clear summary for end users
+        'summary': {
+            'final_hate_percentage': round(analysis_summary['final_hate_percentage'], 1),
+            'confidence_level': analysis_summary['confidence_level'],
+            'probable_hate_words': [hw['word'] for hw in analysis_summary['high_confidence_hate_words']],
+            'detection_method': 'LSTM-First Intelligent Analysis',
+            'is_hate_speech': analysis_summary['final_hate_percentage'] > 50,
+            'recommendation': 'BLOCK' if analysis_summary['final_hate_percentage'] > 70 else 'REVIEW' if analysis_summary['final_hate_percentage'] > 30 else 'ALLOW',
+            'primary_reason': 'LSTM Model Intelligence' if lstm_contribution > 0.7 else 'Pattern Detection' if fuzzy_confidence > 0.5 else 'Combined Analysis'
+        },
+        
+        # Detailed analysis for debugging/advanced users
+        'analysis': {
+            'hate_score': hate_score,
+            'hate_words_found': hate_words,
+            'hate_word_count': len(hate_words),
+            'sinhala_ratio': sinhala_ratio,
+            'language_detected': language,
+            'lstm_contribution': lstm_contribution,
+            'processed_text': processed_text,
+            'detection_details': detection_info,
+            'fuzzy_matching_enabled': True,
+            'lstm_intelligence': lstm_analysis,  # Add LSTM intelligence analysis
+            
+            # Enhanced breakdown with new unified scoring
+            'unified_analysis': analysis_summary,
+            'models_used': {
+                'lstm': True,
+                'mbert': False,
+                'academic_preprocessing': True,
+                'fuzzy_word_matching': True,
+                'word_variation_generation': True,
+                'enhanced_singlish_detection': True,
+                'unified_scoring': True
+            },
+            'detection_breakdown': {
+                'exact_matches': sum(1 for info in detection_info if info.get('match_type') == 'exact'),
+                'fuzzy_matches': sum(1 for info in detection_info if info.get('match_type') == 'fuzzy'),
+                'variation_matches': sum(1 for info in detection_info if info.get('match_type') == 'variation'),
+                'high_confidence_matches': len(analysis_summary['high_confidence_hate_words'])
+            }
+        },
+        'debug_info': lstm_result.get('debug_info', {})
+    }
+    
+    # Convert any NumPy types to Python types for JSON serialization
+    response = convert_numpy_types(response)
+    
+    # Additional safety check - ensure all values are JSON serializable
+    try:
+        json.dumps(response)
+    except (TypeError, ValueError) as e:
+        print(f"JSON serialization error: {e}")
+        # Fallback: convert all numeric values to float
+        response = json.loads(json.dumps(response, default=lambda x: float(x) if isinstance(x, (int, float, np.number)) else str(x)))
+    
+    return response
+
+def analyze_texts(texts):
+    """Analyze a list of texts with batched model calls, in the /analyze response format"""
+    texts = [text.strip() if isinstance(text, str) else '' for text in texts]
+    results = [{'error': 'No text provided'}] * len(texts)
+    preprocessor = active_generation().preprocessor
+    
+    # Serve cached texts directly; only the misses go through the pipeline
+    miss_indices = []
+    contexts = {}
+    for i, text in enumerate(texts):
+        if not text:
+            continue
+        contexts[i] = preprocessor.create_context(text)
+        cached_response = get_cached_analysis(contexts[i])
+        if cached_response is not None:
+            results[i] = cached_response
+        else:
+            miss_indices.append(i)
+    miss_texts = [texts[i] for i in miss_indices]
+    miss_contexts = [contexts[i] for i in miss_indices]
+    
+    # One padded model.predict for the whole batch, one for all context windows
+    lstm_results = predict_hate_speech_batch(miss_texts, [context.processed_text for context in miss_contexts])
+    detections = preprocessor.detect_hate_words_batch(miss_texts, miss_contexts)
+    
+    for i, context, lstm_result, (hate_words, detection_info) in zip(miss_indices, miss_contexts, lstm_results, detections):
+        results[i] = build_analysis_response(context, lstm_result, hate_words, detection_info)
+        analysis_cache.put(context.cache_key, results[i])
+    
+    return results
+
+def _parse_stream_line(line):
+    """One /analyze/stream line: a JSON string or an object with 'text' (and optional 'id')"""
+    item = json.loads(line)
+    if isinstance(item, str):
+        return None, item
+    if isinstance(item, dict) and isinstance(item.get('text'), str):
+        return item.get('id'), item['text']
+    raise ValueError("expected a JSON string or an object with a 'text' field")
+
+def _analyze_stream_batch(batch):
+    """NDJSON result lines, in input order, for one batch of (index, id, text, parse error)"""
+    valid = [text for _, _, text, error in batch if error is None]
+    try:
+        results = iter(analyze_texts(valid))
+    except Exception as e:
+        print(f"Error in stream analysis: {e}")
+        results = iter([{'error': str(e)}] * len(valid))
+    
+    lines = []
+    with stage_latency.time('serialization'):
+        for index, item_id, _, error in batch:
+            line = {'index': index, 'error': f'Invalid line: {error}'} if error is not None else {'index': index, 'result': next(results)}
+            if item_id is not None:
+                line['id'] = item_id
+            lines.append(app.json.dumps(line) + '\n')
+    return ''.join(lines)
+
+def profilable(view):
+    """Let admins run a request under the profiler with "profile": true (or ?profile=1)
+    
+    The normal response gains a "profile" entry with the stage timing tree,
+    the top functions by cumulative time ("profile_top", default 20) and call
+    counts. Requests without the flag go straight to the view.
+    """
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        data = request.get_json(silent=True)
+        data = data if isinstance(data, dict) else {}
+        if not data.get('profile') and request.args.get('profile') in (None, '', '0', 'false'):
+            return view(*args, **kwargs)
+        
+        denied = require_admin()
+        if denied:
+            return denied
+        
+        try:
+            top_n = int(data.get('profile_top', request.args.get('profile_top', 20)))
+        except (TypeError, ValueError):
+            return jsonify({'error': 'profile_top must be an integer'}), 400
+        
+        g.profiling = True
+        try:
+            with RequestProfiler(stage_latency, top_n=top_n) as profiler:
+                response = app.make_response(view(*args, **kwargs))
+        except RuntimeError as e:
+            return jsonify({'error': str(e)}), 409
+        
+        payload = response.get_json(silent=True)
+        if not isinstance(payload, dict):
+            return response
+        payload['profile'] = profiler.report()
+        return jsonify(payload), response.status_code
+    return wrapper
 
 @app.route('/analyze', methods=['POST'])
+@profilable
 def analyze_text():
     """Analyze text for hate speech"""
     try:
@@ -774,251 +1697,205 @@ def analyze_text():
         if not text:
             return jsonify({'error': 'No text provided'}), 400
         
+        # Each derived form of the text is computed once for the whole request
+        preprocessor = active_generation().preprocessor
+        context = preprocessor.create_context(text)
+        
+        # Reposted/copy-pasted comments are served from the result cache
+        cached_response = get_cached_analysis(context)
+        if cached_response is not None:
+            return jsonify(cached_response)
+        
         # Get LSTM prediction
-        lstm_result = predict_hate_speech(text)
+        lstm_result = predict_hate_speech(text, context.processed_text)
         
         # Analyze text features using enhanced preprocessor
         print(f"DEBUG - Preprocessor hate words count: {len(preprocessor.hate_words)}")
         print(f"DEBUG - First 5 hate words: {preprocessor.hate_words[:5]}")
         
-        hate_words = preprocessor.detect_hate_words(text)
-        language = preprocessor.detect_language(text)
-        processed_text = preprocessor.preprocess_text(text)
+        hate_words = preprocessor.detect_hate_words(text, context=context)
         
         # Get detailed hate word detection info
         detection_info = getattr(preprocessor, 'last_detection_info', [])
         
-        # Get LSTM contribution (confidence from LSTM model)
-        lstm_contribution = float(lstm_result['probabilities']['OFF'])
-        
         # Debug: Print detection info for troubleshooting
         print(f"DEBUG - Text: '{text}'")
-        print(f"DEBUG - LSTM Prediction: {lstm_result['prediction']} (Confidence: {lstm_contribution:.3f})")
+        print(f"DEBUG - LSTM Prediction: {lstm_result['prediction']} (Confidence: {float(lstm_result['probabilities']['OFF']):.3f})")
         print(f"DEBUG - Detected hate words: {hate_words}")
         print(f"DEBUG - Detection info: {detection_info}")
-        print(f"DEBUG - Words in text: {re.findall(r'\\w+', text.lower())}")
-        
-        # Analyze what the LSTM model actually learned from this text
-        # This is more intelligent than just word matching
-        lstm_analysis = {
-            'model_confidence': lstm_contribution,
-            'prediction': lstm_result['prediction'],
-            'learned_patterns': 'The LSTM model has learned to recognize hate speech patterns from training data, including context, word combinations, and linguistic patterns that may not be captured by simple word lists.',
-            'context_understanding': 'Unlike word lists, the LSTM can understand context, sarcasm, and complex linguistic patterns.',
-            'training_based': 'This prediction is based on the model\'s training on thousands of labeled examples, not just dictionary matching.'
-        }
-        
-        # Calculate Sinhala ratio
-        sinhala_chars = len(re.findall(r'[\u0D80-\u0DFF]', text))
-        total_chars = len(text.replace(' ', ''))
-        sinhala_ratio = float(sinhala_chars / total_chars if total_chars > 0 else 0.0)
-        
-        # INTELLIGENT HATE SPEECH SCORING SYSTEM
-        # Primary: LSTM Model Intelligence
-        # Secondary: Context-aware word analysis
-        
-        # Step 1: Let LSTM be the primary decision maker
-        # The LSTM model has learned patterns from training data
-        # It can identify hate speech even without exact word matches
-        
-        # Step 2: Use word detection only as supporting evidence
-        # Not as the primary classifier
-        fuzzy_confidence = 0.0
-        high_confidence_words = []
-        
-        if hate_words and detection_info:
-            # Only use word detection if LSTM is uncertain
-            # If LSTM is very confident (>80%), trust it more than word lists
-            if lstm_contribution < 0.8:
-                # Calculate weighted fuzzy confidence as supporting evidence
-                total_similarity = 0.0
-                valid_matches = 0
-                
-                for info in detection_info:
-                    similarity = info.get('similarity', 0.0)
-                    match_type = info.get('match_type', 'unknown')
-                    
-                    # Weight by match type and similarity
-                    if match_type == 'exact':
-                        weight = 1.0
-                    elif match_type == 'variation':
-                        weight = 0.9
-                    elif match_type == 'fuzzy' and similarity >= 0.85:
-                        weight = similarity
-                    else:
-                        weight = 0.0  # Low confidence matches
-                    
-                    if weight > 0:
-                        total_similarity += weight
-                        valid_matches += 1
-                        
-                        # Track high-confidence hate words for reporting
-                        if weight >= 0.85:
-                            high_confidence_words.append({
-                                'word': info.get('word', ''),
-                                'matched_text': info.get('matched_text', ''),
-                                'confidence': weight,
-                                'type': match_type
-                            })
-                
-                # Calculate fuzzy confidence percentage
-                if valid_matches > 0:
-                    fuzzy_confidence = min(total_similarity / valid_matches, 1.0)
-                else:
-                    fuzzy_confidence = 0.3  # Low weight when LSTM is confident
-            else:
-                # LSTM is very confident, use word detection only for explanation
-                # Don't let it override LSTM's decision
-                fuzzy_confidence = 0.3  # Low weight when LSTM is confident
-        
-        # Step 2: LSTM-First Intelligent Scoring
-        # The LSTM model is the primary intelligence - it has learned from data
-        # Word detection is only supporting evidence
+        print(f"DEBUG - Words in text: {context.tokens}")
         
-        final_hate_percentage = 0.0
+        response = build_analysis_response(context, lstm_result, hate_words, detection_info)
+        analysis_cache.put(context.cache_key, response)
+        with stage_latency.time('serialization'):
+            return jsonify(response)
         
-        # Case 1: LSTM is very confident (>80%) - Trust the model
-        if lstm_contribution >= 0.8:
-            final_hate_percentage = lstm_contribution * 0.9  # 90% weight to LSTM
-            if fuzzy_confidence > 0.5:
-                final_hate_percentage += fuzzy_confidence * 0.1  # 10% supporting evidence
-            confidence_level = "High (LSTM Intelligence)"
-            
-        # Case 2: LSTM is moderately confident (50-80%) - Use both
-        elif lstm_contribution >= 0.5:
-            final_hate_percentage = lstm_contribution * 0.7  # 70% weight to LSTM
-            if fuzzy_confidence > 0.3:
-                final_hate_percentage += fuzzy_confidence * 0.3  # 30% supporting evidence
-            confidence_level = "Medium-High (LSTM + Context)"
-            
-        # Case 3: LSTM is uncertain (<50%) - Rely more on word patterns
-        elif lstm_contribution < 0.5:
-            if fuzzy_confidence >= 0.7:
-                final_hate_percentage = (lstm_contribution * 0.3) + (fuzzy_confidence * 0.7)
-                confidence_level = "Medium (Pattern Detection)"
-            else:
-                final_hate_percentage = lstm_contribution * 0.8  # Still trust LSTM more
-                confidence_level = "Low (LSTM Uncertain)"
-            final_hate_percentage = (lstm_contribution * 0.5) + (fuzzy_confidence * 0.5)
-            confidence_level = "Medium"
-            
-        # Case 5: Both low (likely safe)
-        else:
-            final_hate_percentage = max(lstm_contribution, fuzzy_confidence * 0.6)
-            confidence_level = "Low"
-        
-        # Step 3: Apply contextual adjustments
-        # Boost for multiple high-confidence hate words
-        if len(high_confidence_words) > 1:
-            final_hate_percentage = min(final_hate_percentage + 0.15, 1.0)
-        
-        # Boost for Sinhala content with hate words
-        if hate_words and sinhala_ratio > 0.5:
-            final_hate_percentage = min(final_hate_percentage + 0.05, 1.0)
-        
-        # Additional boost for text that needed processing (indicates obfuscation)
-        if processed_text != text.lower().strip():
-            final_hate_percentage = min(final_hate_percentage + 0.03, 1.0)
-        
-        # Convert to percentage
-        hate_score = float(final_hate_percentage)
-        
-        # Store analysis results for clear reporting
-        analysis_summary = {
-            'lstm_score': lstm_contribution * 100,
-            'fuzzy_confidence': fuzzy_confidence * 100,
-            'final_hate_percentage': hate_score * 100,
-            'confidence_level': confidence_level,
-            'high_confidence_hate_words': high_confidence_words,
-            'total_hate_words_detected': len(hate_words),
-            'analysis_method': 'Unified LSTM + Fuzzy Matching'
-        }
+    except Exception as e:
+        print(f"Error in analysis: {e}")
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/analyze/batch', methods=['POST'])
+def analyze_batch():
+    """Analyze a list of texts for hate speech with batched model calls"""
+    try:
+        data = request.get_json()
+        texts = data.get('texts')
         
-        # Prepare response with clear, unified results
-        response = {
-            'prediction': lstm_result['prediction'],
-            'confidence': lstm_result['confidence'],
-            'probabilities': lstm_result['probabilities'],
-            
-            # NEW: Clear summary for end users
-            'summary': {
-                'final_hate_percentage': round(analysis_summary['final_hate_percentage'], 1),
-                'confidence_level': analysis_summary['confidence_level'],
-                'probable_hate_words': [hw['word'] for hw in analysis_summary['high_confidence_hate_words']],
-                'detection_method': 'LSTM-First Intelligent Analysis',
-                'is_hate_speech': analysis_summary['final_hate_percentage'] > 50,
-                'recommendation': 'BLOCK' if analysis_summary['final_hate_percentage'] > 70 else 'REVIEW' if analysis_summary['final_hate_percentage'] > 30 else 'ALLOW',
-                'primary_reason': 'LSTM Model Intelligence' if lstm_contribution > 0.7 else 'Pattern Detection' if fuzzy_confidence > 0.5 else 'Combined Analysis'
-            },
-            
-            # Detailed analysis for debugging/advanced users
-            'analysis': {
-                'hate_score': hate_score,
-                'hate_words_found': hate_words,
-                'hate_word_count': len(hate_words),
-                'sinhala_ratio': sinhala_ratio,
-                'language_detected': language,
-                'lstm_contribution': lstm_contribution,
-                'processed_text': processed_text,
-                'detection_details': detection_info,
-                'fuzzy_matching_enabled': True,
-                'lstm_intelligence': lstm_analysis,  # Add LSTM intelligence analysis
-                
-                # Enhanced breakdown with new unified scoring
-                'unified_analysis': analysis_summary,
-                'models_used': {
-                    'lstm': True,
-                    'mbert': False,
-                    'academic_preprocessing': True,
-                    'fuzzy_word_matching': True,
-                    'word_variation_generation': True,
-                    'enhanced_singlish_detection': True,
-                    'unified_scoring': True
-                },
-                'detection_breakdown': {
-                    'exact_matches': sum(1 for info in detection_info if info.get('match_type') == 'exact'),
-                    'fuzzy_matches': sum(1 for info in detection_info if info.get('match_type') == 'fuzzy'),
-                    'variation_matches': sum(1 for info in detection_info if info.get('match_type') == 'variation'),
-                    'high_confidence_matches': len(analysis_summary['high_confidence_hate_words'])
-                }
-            },
-            'debug_info': lstm_result.get('debug_info', {})
-        }
+        if not isinstance(texts, list) or not texts:
+            return jsonify({'error': 'A non-empty list of texts is required'}), 400
         
-        # Convert any NumPy types to Python types for JSON serialization
-        response = convert_numpy_types(response)
+        if len(texts) > max_batch_size:
+            return jsonify({'error': f'Too many texts (maximum {max_batch_size} per batch)'}), 400
         
-        # Additional safety check - ensure all values are JSON serializable
-        try:
-            json.dumps(response)
-        except (TypeError, ValueError) as e:
-            print(f"JSON serialization error: {e}")
-            # Fallback: convert all numeric values to float
-            response = json.loads(json.dumps(response, default=lambda x: float(x) if isinstance(x, (int, float, np.number)) else str(x)))
+        results = analyze_texts(texts)
         
-        return jsonify(response)
+        with stage_latency.time('serialization'):
+            return jsonify({
+                'results': results,
+                'count': len(results)
+            })
         
     except Exception as e:
-        print(f"Error in analysis: {e}")
+        print(f"Error in batch analysis: {e}")
         return jsonify({'error': str(e)}), 500
 
+@app.route('/analyze/stream', methods=['POST'])
+def analyze_stream():
+    """Analyze newline-delimited JSON texts, streaming NDJSON results batch by batch
+    
+    The request body is read incrementally, so memory stays bounded by
+    stream_batch_size no matter how large the upload is.
+    """
+    stream = request.stream
+    
+    def generate():
+        batch = []
+        index = 0
+        for raw_line in stream:
+            line = raw_line.strip()
+            if not line:
+                continue
+            try:
+                item_id, text = _parse_stream_line(line)
+                batch.append((index, item_id, text, None))
+            except ValueError as e:
+                batch.append((index, None, None, e))
+            index += 1
+            
+            if len(batch) >= stream_batch_size:
+                yield _analyze_stream_batch(batch)
+                batch = []
+        
+        if batch:
+            yield _analyze_stream_batch(batch)
+    
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+@app.route('/metrics', methods=['GET'])
+def metrics_endpoint():
+    """Pipeline and process metrics in the Prometheus text format (per process under serve.py)"""
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
 @app.route('/models/status', methods=['GET'])
 def model_status():
     """Get model status"""
+    generation = active_generation()
+    model = generation.model if generation is not None else None
+    model_bundle = generation.bundle if generation is not None else None
+    bundle_metadata = model_bundle.metadata if model_bundle is not None else {}
     return jsonify({
         'current_model': 'Enhanced LSTM',
         'available_models': {
             'LSTM': {
                 'loaded': model is not None,
                 'status': 'Active' if model is not None else 'Inactive',
-                'max_words': max_words,
-                'max_len': max_len,
-                'embedding_dim': 200 if model else None,
+                'backend': inference_backend,
+                'tflite_variant': tflite_variant if inference_backend == 'tflite' else None,
+                'generation': generation.number if generation is not None else None,
+                'model_version': generation.model_version if generation is not None else None,
+                'bundle_version': model_bundle.version if model_bundle is not None else None,
+                'bundle': model_bundle.info() if model_bundle is not None else None,
+                'length_bucketing': length_bucketing_active(generation),
+                'length_buckets': list(generation.length_buckets if generation is not None else length_buckets),
+                'max_words': generation.max_words if generation is not None else max_words,
+                'max_len': generation.max_len if generation is not None else max_len,
+                'embedding_dim': bundle_metadata.get('embedding_dim', 200) if model else None,
                 'accuracy': '97.44%' if model else None
             }
         }
     })
 
+@app.route('/cache/stats', methods=['GET'])
+def cache_stats():
+    """Get analysis result cache statistics"""
+    stats = analysis_cache.stats()
+    generation = active_generation()
+    preprocessor = generation.preprocessor if generation is not None else None
+    stats['generation'] = generation.number if generation is not None else None
+    stats['model_version'] = generation.model_version if generation is not None else None
+    stats['lexicon_version'] = preprocessor.lexicon_version if preprocessor else None
+    stats['token_matches'] = preprocessor.token_match_memo.stats() if preprocessor else None
+    return jsonify(stats)
+
+@app.route('/batching/stats', methods=['GET'])
+def batching_stats():
+    """Get micro-batching statistics (batch-size distribution) of the current generation"""
+    generation = active_generation()
+    if generation is None or generation.batcher is None:
+        return jsonify({'error': 'Model is not ready', 'state': model_state}), 503
+    stats = generation.batcher.stats()
+    stats['generation'] = generation.number
+    return jsonify(stats)
+
+def get_feedback_store():
+    """The feedback store, after importing the legacy JSONL log once"""
+    global feedback_imported
+    
+    if not feedback_imported:
+        with feedback_import_lock:
+            if not feedback_imported:
+                if os.path.exists(legacy_feedback_file):
+                    try:
+                        imported, skipped = feedback_store.import_jsonl(legacy_feedback_file)
+                        if imported or skipped:
+                            print(f"✅ Imported {imported} feedback entries from {legacy_feedback_file} ({skipped} unreadable lines skipped)")
+                    except Exception as e:
+                        # Progress is recorded per batch; the next start picks up the rest
+                        print(f"❌ Error importing {legacy_feedback_file}: {e}")
+                feedback_imported = True
+    return feedback_store
+
+def require_admin():
+    """403 response unless ADMIN_TOKEN is set and sent as X-Admin-Token, else None"""
+    supplied = request.headers.get('X-Admin-Token', '')
+    if not admin_token or not hmac.compare_digest(supplied.encode('utf-8'), admin_token.encode('utf-8')):
+        return jsonify({'error': 'Admin token required'}), 403
+    return None
+
+@app.route('/admin/reload', methods=['POST'])
+def admin_reload():
+    """Hot-reload the model, vocabulary and lexicon without dropping requests"""
+    denied = require_admin()
+    if denied:
+        return denied
+    
+    if reload_delegate is not None:
+        # Prefork worker: the master reloads and recycles every worker
+        record = reload_delegate()
+        return jsonify(record), 202 if record['status'] == 'scheduled' else 503
+    
+    record = reload_model('admin')
+    status_code = {'ok': 200, 'in_progress': 409}.get(record['status'], 500)
+    return jsonify({**record, 'generations': generations.stats()}), status_code
+
+@app.route('/admin/reload', methods=['GET'])
+def admin_reload_status():
+    """Last reload and the generations currently loaded"""
+    denied = require_admin()
+    if denied:
+        return denied
+    return jsonify({'last_reload': last_reload, 'generations': generations.stats()})
+
 @app.route('/feedback', methods=['POST'])
 def submit_feedback():
     """Submit feedback for missed hate words or false positives"""
@@ -1044,11 +1921,9 @@ def submit_feedback():
             'model_version': 'Enhanced LSTM v1.0'
         }
         
-        # Save feedback to file
-        feedback_file = 'feedback_data.jsonl'
+        # Save feedback to the feedback store
         try:
-            with open(feedback_file, 'a', encoding='utf-8') as f:
-                f.write(json.dumps(feedback_data, ensure_ascii=False) + '\n')
+            feedback_id = get_feedback_store().add(feedback_data)
         except Exception as e:
             print(f"Error saving feedback: {e}")
             return jsonify({'error': 'Failed to save feedback'}), 500
@@ -1056,24 +1931,17 @@ def submit_feedback():
         # If it's a missed hate word, add to hate words list for immediate improvement
         if feedback_type == 'missed_hate' and user_annotation:
             try:
-                # Add to hate words list in memory
-                if user_annotation.lower() not in preprocessor.hate_words:
-                    preprocessor.hate_words.append(user_annotation.lower())
-                    print(f"Added new hate word to memory: {user_annotation}")
+                # Add to hate words list (and its variation index) in memory, also
+                # in a generation a reload installed while this request ran
+                pinned = active_generation()
+                for generation in {id(pinned): pinned, id(generations.current): generations.current}.values():
+                    # The lexicon version in the cache key makes older cached results miss
+                    if generation.preprocessor is not None and generation.preprocessor.add_hate_word(user_annotation):
+                        print(f"Added new hate word to memory: {user_annotation}")
                 
-                # Save to persistent hate words file
-                hate_words_file = 'persistent_hate_words.txt'
+                # Append to the persistent hate words file (membership is checked in memory)
                 try:
-                    # Read existing hate words
-                    existing_words = set()
-                    if os.path.exists(hate_words_file):
-                        with open(hate_words_file, 'r', encoding='utf-8') as f:
-                            existing_words = set(line.strip().lower() for line in f if line.strip())
-                    
-                    # Add new word if not already present
-                    if user_annotation.lower() not in existing_words:
-                        with open(hate_words_file, 'a', encoding='utf-8') as f:
-                            f.write(user_annotation.lower() + '\n')
+                    if lexicon_store.add(user_annotation):
                         print(f"Saved new hate word to file: {user_annotation}")
                 except Exception as e:
                     print(f"Error saving hate word to file: {e}")
@@ -1083,7 +1951,7 @@ def submit_feedback():
         
         return jsonify({
             'message': 'Feedback submitted successfully',
-            'feedback_id': len(str(feedback_data)),
+            'feedback_id': feedback_id,
             'action_taken': 'Added to hate words list' if feedback_type == 'missed_hate' else 'Logged for review'
         })
         
@@ -1093,36 +1961,25 @@ def submit_feedback():
 
 @app.route('/feedback/stats', methods=['GET'])
 def get_feedback_stats():
-    """Get feedback statistics"""
+    """Get feedback statistics (running counters, independent of the number of entries)"""
     try:
-        feedback_file = 'feedback_data.jsonl'
+        store = get_feedback_store()
+        counts = store.counts()
+        recent, _ = store.query(limit=10)  # Last 10 feedback entries
         stats = {
-            'total_feedback': 0,
-            'missed_hate': 0,
-            'false_positive': 0,
+            'total_feedback': sum(counts.values()),
+            'missed_hate': counts.get('missed_hate', 0),
+            'false_positive': counts.get('false_positive', 0),
+            'by_type': counts,
             'recent_feedback': []
         }
         
-        if os.path.exists(feedback_file):
-            with open(feedback_file, 'r', encoding='utf-8') as f:
-                lines = f.readlines()
-                stats['total_feedback'] = len(lines)
-                
-                for line in lines[-10:]:  # Last 10 feedback entries
-                    try:
-                        feedback = json.loads(line.strip())
-                        if feedback.get('feedback_type') == 'missed_hate':
-                            stats['missed_hate'] += 1
-                        elif feedback.get('feedback_type') == 'false_positive':
-                            stats['false_positive'] += 1
-                        
-                        stats['recent_feedback'].append({
-                            'text': feedback.get('text', '')[:50] + '...' if len(feedback.get('text', '')) > 50 else feedback.get('text', ''),
-                            'type': feedback.get('feedback_type'),
-                            'timestamp': feedback.get('timestamp')
-                        })
-                    except:
-                        continue
+        for feedback in reversed(recent):
+            stats['recent_feedback'].append({
+                'text': feedback['text'][:50] + '...' if len(feedback['text']) > 50 else feedback['text'],
+                'type': feedback['feedback_type'],
+                'timestamp': feedback['timestamp']
+            })
         
         return jsonify(stats)
         
@@ -1130,7 +1987,31 @@ def get_feedback_stats():
         print(f"Error getting feedback stats: {e}")
         return jsonify({'error': str(e)}), 500
 
+@app.route('/feedback', methods=['GET'])
+def list_feedback():
+    """Page through feedback, newest first
+    
+    Query parameters: type, since / until (ISO timestamps), limit, and
+    before (the next_before value of the previous page).
+    """
+    try:
+        before = request.args.get('before')
+        entries, next_before = get_feedback_store().query(
+            feedback_type=request.args.get('type'),
+            since=request.args.get('since'),
+            until=request.args.get('until'),
+            before_id=int(before) if before else None,
+            limit=int(request.args.get('limit', 50))
+        )
+        return jsonify({'feedback': entries, 'next_before': next_before})
+    except ValueError as e:
+        return jsonify({'error': f"Invalid query parameter: {e}"}), 400
+    except Exception as e:
+        print(f"Error listing feedback: {e}")
+        return jsonify({'error': str(e)}), 500
+
 @app.route('/test-fuzzy', methods=['POST'])
+@profilable
 def test_fuzzy_matching():
     """Test fuzzy matching capabilities"""
     try:
@@ -1140,24 +2021,27 @@ def test_fuzzy_matching():
         if not text:
             return jsonify({'error': 'No text provided'}), 400
         
+        preprocessor = active_generation().preprocessor
         if preprocessor is None:
             return jsonify({'error': 'Preprocessor not loaded'}), 500
         
+        context = preprocessor.create_context(text)
+        
         # Test hate word detection
-        hate_words = preprocessor.detect_hate_words(text)
+        hate_words = preprocessor.detect_hate_words(text, context=context)
         detection_info = getattr(preprocessor, 'last_detection_info', [])
         
         # Test text preprocessing
-        processed_text = preprocessor.preprocess_text(text)
+        processed_text = context.processed_text
         
         # Test language detection
-        language = preprocessor.detect_language(text)
+        language = preprocessor.detect_language(context)
         
         # Test similarity with specific examples
         test_words = ['hutta', 'paka', 'balla', 'modaya']
         similarity_tests = []
         
-        words_in_text = re.findall(r'\w+', text.lower())
+        words_in_text = context.tokens
         for test_word in test_words:
             for word_in_text in words_in_text:
                 similarity = preprocessor.calculate_similarity(test_word, word_in_text)
@@ -1187,10 +2071,6 @@ if __name__ == '__main__':
     print("Starting LSTM-Only Hate Speech Detection System")
     print("=" * 60)
     
-    # Load model
-    if load_lstm_model():
-        print("System ready!")
-        app.run(host='0.0.0.0', port=5003, debug=False)
-    else:
-        print("Failed to load model. Please ensure model files exist.")
-        exit(1) 
\ No newline at end of file
+    # Serve right away; /health reports loading until the model is ready
+    start_model_loading()
+    app.run(host='0.0.0.0', port=5003, debug=False) 
\ No newline at end of file
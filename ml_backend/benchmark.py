@@ -0,0 +1,334 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for the analysis pipeline
+Times preprocess_text, detect_hate_words, calculate_similarity, tokenization,
+model inference and end-to-end /analyze (Flask test client) on a seeded
+sample of each bundled dataset, writes throughput and latency percentiles as
+JSON, and compares a run against a stored baseline.
+
+    python ml_backend/benchmark.py run --output benchmark_baseline.json
+    python ml_backend/benchmark.py run --output benchmark.json
+    python ml_backend/benchmark.py compare benchmark_baseline.json benchmark.json
+"""
+
+import argparse
+import contextlib
+import hashlib
+import json
+import os
+import platform
+import random
+import sys
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+# Add current directory to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+# Measure the pipeline itself: no micro-batching window, no /analyze result cache
+# (set either variable to benchmark a serving configuration instead)
+os.environ.setdefault('MICRO_BATCH_WAIT_MS', '0')
+os.environ.setdefault('ANALYSIS_CACHE_SIZE', '0')
+
+DEFAULT_DATASETS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'DataSets')
+
+# name: (file, separator, text column)
+DATASETS = {
+    'SOLD_test': ('SOLD_test.tsv', '\t', 'text'),
+    'test': ('test.csv', ',', 'comment'),
+    'only_hate': ('only_hate.csv', ',', 'sensitive text'),
+}
+
+BENCHMARKS = ['preprocess_text', 'detect_hate_words', 'calculate_similarity', 'tokenization',
+              'model_inference', 'analyze_endpoint']
+
+# Statistics checked by compare; latencies regress upwards, throughput downwards
+COMPARED_LATENCIES = ('p50_ms', 'p95_ms')
+COMPARED_THROUGHPUT = 'throughput_per_s'
+
+
+def load_samples(datasets_dir, samples, seed):
+    """Seeded sample of non-empty texts from each dataset, in a stable order"""
+    texts_by_dataset = {}
+    for name, (filename, sep, column) in DATASETS.items():
+        path = os.path.join(datasets_dir, filename)
+        if not os.path.exists(path):
+            print(f"❌ {path} not found, skipping {name}")
+            continue
+        df = pd.read_csv(path, sep=sep, usecols=[column], dtype=str)
+        texts = [text.strip() for text in df[column].dropna() if text.strip()]
+        rng = random.Random(f"{seed}:{name}")
+        texts_by_dataset[name] = rng.sample(texts, min(samples, len(texts)))
+    return texts_by_dataset
+
+
+def digest(texts):
+    return hashlib.sha1('\n'.join(texts).encode('utf-8')).hexdigest()[:12]
+
+
+def summarize(durations, items):
+    """Throughput and latency percentiles of one benchmark on one dataset"""
+    seconds = np.asarray(durations, dtype=np.float64)
+    total = float(seconds.sum())
+    p50, p90, p95, p99 = np.percentile(seconds, [50, 90, 95, 99]) * 1000.0
+    return {
+        'calls': len(seconds),
+        'items': items,
+        'total_s': round(total, 6),
+        'throughput_per_s': round(items / total, 3) if total > 0 else None,
+        'mean_ms': round(float(seconds.mean()) * 1000.0, 4),
+        'p50_ms': round(float(p50), 4),
+        'p90_ms': round(float(p90), 4),
+        'p95_ms': round(float(p95), 4),
+        'p99_ms': round(float(p99), 4),
+        'max_ms': round(float(seconds.max()) * 1000.0, 4)
+    }
+
+
+def measure(fn, calls, repeats, warmup, before_pass=None):
+    """Per-call seconds of fn(*args) over `repeats` passes through calls
+
+    A pass over the first `warmup` calls runs first and is not recorded;
+    before_pass() runs before it and before every recorded pass.
+    """
+    durations = []
+    for recorded in [False] + [True] * repeats:
+        if before_pass is not None:
+            before_pass()
+        for args in (calls if recorded else calls[:warmup]):
+            started = time.perf_counter()
+            fn(*args)
+            if recorded:
+                durations.append(time.perf_counter() - started)
+    return durations
+
+
+class PipelineBenchmark:
+    """Runs the benchmarks against the pipeline loaded by app.load_lstm_model()"""
+
+    def __init__(self, app_module, texts_by_dataset, repeats=3, warmup=10, batch_sizes=(1, 32), seed=42):
+        self.app = app_module
+        self.texts_by_dataset = texts_by_dataset
+        self.repeats = repeats
+        self.warmup = warmup
+        self.batch_sizes = batch_sizes
+        self.seed = seed
+        self.generation = app_module.generations.current
+        self.preprocessor = self.generation.preprocessor
+
+    def clear_caches(self):
+        """Every recorded pass starts from a cold per-token fuzzy match memo"""
+        self.preprocessor.token_match_memo.clear()
+
+    def bench_preprocess_text(self, texts):
+        durations = measure(self.preprocessor.preprocess_text, [(text,) for text in texts], self.repeats, self.warmup)
+        return {'preprocess_text': summarize(durations, len(durations))}
+
+    def bench_detect_hate_words(self, texts):
+        # Includes the model calls that score context windows around candidate words
+        durations = measure(self.preprocessor.detect_hate_words, [(text,) for text in texts],
+                            self.repeats, self.warmup, before_pass=self.clear_caches)
+        return {'detect_hate_words': summarize(durations, len(durations))}
+
+    def bench_calculate_similarity(self, texts):
+        # Every token of the sample paired with a (seeded) random lexicon word
+        rng = random.Random(self.seed)
+        hate_words = self.preprocessor.hate_words
+        pairs = [(rng.choice(hate_words), token) for text in texts
+                 for token in self.preprocessor.create_context(text).tokens]
+        if not pairs:
+            return {}
+        durations = measure(self.preprocessor.calculate_similarity, pairs, self.repeats, self.warmup)
+        return {'calculate_similarity': summarize(durations, len(durations))}
+
+    def bench_tokenization(self, texts):
+        processed = [(self.preprocessor.preprocess_text(text),) for text in texts]
+        tokenizer, max_len = self.generation.tokenizer, self.generation.max_len
+        durations = measure(lambda text: tokenizer.encode_batch([text], max_len), processed, self.repeats, self.warmup)
+        return {'tokenization': summarize(durations, len(durations))}
+
+    def bench_model_inference(self, texts):
+        """model.predict on padded rows, one result per batch size (throughput in rows/s)"""
+        padded = self.generation.tokenizer.encode_batch([self.preprocessor.preprocess_text(text) for text in texts],
+                                                        self.generation.max_len)
+        model = self.generation.model
+        results = {}
+        for batch_size in self.batch_sizes:
+            batches = [(padded[start:start + batch_size],) for start in range(0, len(padded), batch_size)]
+            durations = measure(lambda x: model.predict(x, verbose=0), batches, self.repeats,
+                                max(1, self.warmup // batch_size))
+            results[f"model_inference@{batch_size}"] = summarize(durations, len(padded) * self.repeats)
+        return results
+
+    def bench_analyze_endpoint(self, texts):
+        client = self.app.app.test_client()
+        statuses = []
+
+        def post(text):
+            statuses.append(client.post('/analyze', json={'text': text}).status_code)
+
+        durations = measure(post, [(text,) for text in texts], self.repeats, self.warmup, before_pass=self.clear_caches)
+        stats = summarize(durations, len(durations))
+        stats['errors'] = sum(status != 200 for status in statuses[-len(durations):])
+        return {'analyze_endpoint': stats}
+
+    def run(self, benchmarks):
+        results = {}
+        for benchmark in benchmarks:
+            for dataset, texts in self.texts_by_dataset.items():
+                print(f"Running {benchmark} on {dataset} ({len(texts)} texts x {self.repeats})...")
+                # /analyze and the preprocessor print debug lines for every text
+                with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+                    measured = getattr(self, f"bench_{benchmark}")(texts)
+                for name, stats in measured.items():
+                    results.setdefault(name, {})[dataset] = stats
+        return results
+
+
+def environment(app_module):
+    generation = app_module.generations.current
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'numpy': np.__version__,
+        'inference_backend': app_module.inference_backend,
+        'model_version': generation.model_version,
+        'lexicon_words': len(generation.preprocessor.hate_words),
+        'micro_batch_wait_ms': app_module.micro_batch_wait_ms,
+        'analysis_cache_size': app_module.analysis_cache.max_entries
+    }
+
+
+def print_results(results):
+    print(f"{'benchmark':<26}{'dataset':<12}{'per sec':>12}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    for name, by_dataset in results.items():
+        for dataset, stats in by_dataset.items():
+            print(f"{name:<26}{dataset:<12}{stats['throughput_per_s'] or 0:>12.1f}{stats['p50_ms']:>10.3f}"
+                  f"{stats['p95_ms']:>10.3f}{stats['p99_ms']:>10.3f}{stats['max_ms']:>10.3f}")
+
+
+def run_command(args):
+    benchmarks = args.benchmarks.split(',') if args.benchmarks else BENCHMARKS
+    unknown = [name for name in benchmarks if name not in BENCHMARKS]
+    if unknown:
+        print(f"❌ Unknown benchmarks {unknown}; choose from {BENCHMARKS}")
+        sys.exit(1)
+    batch_sizes = [int(size) for size in args.batch_sizes.split(',')]
+
+    texts_by_dataset = load_samples(args.datasets_dir, args.samples, args.seed)
+    if not texts_by_dataset:
+        print(f"❌ No datasets found in {args.datasets_dir}")
+        sys.exit(1)
+
+    import app
+    if not app.load_lstm_model():
+        print(f"❌ {app.model_load_error}")
+        sys.exit(1)
+
+    print("=" * 60)
+    print("Singlish Pipeline Benchmark")
+    print("=" * 60)
+    started = time.time()
+    bench = PipelineBenchmark(app, texts_by_dataset, repeats=args.repeats, warmup=args.warmup,
+                              batch_sizes=batch_sizes, seed=args.seed)
+    results = bench.run(benchmarks)
+
+    report = {
+        'created': datetime.now().isoformat(),
+        'duration_s': round(time.time() - started, 1),
+        'environment': environment(app),
+        'settings': {
+            'samples': args.samples,
+            'repeats': args.repeats,
+            'warmup': args.warmup,
+            'seed': args.seed,
+            'batch_sizes': batch_sizes,
+            'datasets': {name: {'texts': len(texts), 'digest': digest(texts)} for name, texts in texts_by_dataset.items()}
+        },
+        'results': results
+    }
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+
+    print_results(results)
+    print(f"✅ Results written to {args.output}")
+
+
+def compare_reports(baseline, current, threshold):
+    """(regressions, lines) for every benchmark/dataset present in both reports"""
+    regressions = 0
+    lines = []
+    for name, by_dataset in current['results'].items():
+        for dataset, stats in by_dataset.items():
+            base = baseline['results'].get(name, {}).get(dataset)
+            if base is None:
+                lines.append(f"  {name} / {dataset}: not in baseline")
+                continue
+            changes = []
+            flagged = False
+            for key in COMPARED_LATENCIES + (COMPARED_THROUGHPUT,):
+                if not base.get(key) or stats.get(key) is None:
+                    continue
+                change = stats[key] / base[key] - 1.0
+                worse = change > threshold if key != COMPARED_THROUGHPUT else change < -threshold
+                flagged = flagged or worse
+                changes.append(f"{key} {base[key]:g} -> {stats[key]:g} ({change:+.1%}){' !' if worse else ''}")
+            regressions += flagged
+            lines.append(f"{'❌' if flagged else '✅'} {name} / {dataset}: " + ', '.join(changes))
+    return regressions, lines
+
+
+def compare_command(args):
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.current) as f:
+        current = json.load(f)
+
+    # Numbers are only comparable for the same inputs on the same setup
+    for section in ('settings', 'environment'):
+        for key, value in current[section].items():
+            if key not in ('platform',) and baseline[section].get(key) != value:
+                print(f"⚠️  {section}.{key} differs: baseline {baseline[section].get(key)}, current {value}")
+
+    regressions, lines = compare_reports(baseline, current, args.threshold)
+    print('\n'.join(lines))
+    if regressions:
+        print(f"❌ {regressions} regression(s) beyond {args.threshold:.0%}")
+        sys.exit(1)
+    print(f"✅ No regressions beyond {args.threshold:.0%}")
+
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description='Benchmark the analysis pipeline on the bundled datasets')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = subparsers.add_parser('run', help='Run the benchmarks and write a JSON report')
+    run_parser.add_argument('--output', default='benchmark.json', help='JSON report path')
+    run_parser.add_argument('--datasets-dir', default=DEFAULT_DATASETS_DIR, help='Directory with the DataSets files')
+    run_parser.add_argument('--samples', type=int, default=100, help='Texts sampled per dataset')
+    run_parser.add_argument('--repeats', type=int, default=3, help='Recorded passes over each sample')
+    run_parser.add_argument('--warmup', type=int, default=10, help='Unrecorded calls before each benchmark')
+    run_parser.add_argument('--seed', type=int, default=42, help='Sampling seed')
+    run_parser.add_argument('--batch-sizes', default='1,32', help='Comma-separated model inference batch sizes')
+    run_parser.add_argument('--benchmarks', help=f"Comma-separated subset of {','.join(BENCHMARKS)}")
+
+    compare_parser = subparsers.add_parser('compare', help='Flag regressions of a report against a baseline')
+    compare_parser.add_argument('baseline', help='Baseline JSON report')
+    compare_parser.add_argument('current', help='JSON report to check')
+    compare_parser.add_argument('--threshold', type=float, default=0.10,
+                                help='Relative slowdown of p50/p95 latency or throughput flagged as a regression')
+
+    args = parser.parse_args()
+    if args.command == 'run':
+        run_command(args)
+    else:
+        compare_command(args)
+
+
+if __name__ == "__main__":
+    main()
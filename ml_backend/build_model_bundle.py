@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Singlish Model Bundle Build Script
+Packs the trained weights, vocabulary, hate word lexicon, preprocessing tables
+and metadata into models/singlish_model.bundle, the single versioned file the
+server loads in one step
+"""
+
+import argparse
+import json
+import os
+import pickle
+import sys
+
+import numpy as np
+
+# Add current directory to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app import SinhalaTextPreprocessor
+from model_bundle import ModelBundle, build_bundle
+from numpy_lstm import keras_weight_arrays
+from vocab_tokenizer import keras_tokenizer_arrays
+
+
+def load_npz(path):
+    """(config, arrays) of an .npz written by export_keras_weights / export_keras_tokenizer"""
+    with np.load(path, allow_pickle=False) as data:
+        config = json.loads(str(data['__config__']))
+        return config, {key: data[key] for key in data.files if key != '__config__'}
+
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description='Build the versioned Singlish model bundle')
+    parser.add_argument('--weights', default='models/singlish_lstm_weights.npz', help='NumPy weights (from export_numpy_weights.py)')
+    parser.add_argument('--model', default='models/singlish_lstm_model.h5', help='Keras model, used if --weights is missing')
+    parser.add_argument('--vocab', default='models/singlish_vocab.npz', help='Vocabulary (from export_tokenizer.py)')
+    parser.add_argument('--tokenizer', default='models/singlish_tokenizer.pkl', help='Pickled tokenizer, used if --vocab is missing')
+    parser.add_argument('--metadata', default='models/singlish_metadata.json', help='Training metadata')
+    parser.add_argument('--output', default='models/singlish_model.bundle', help='Output bundle')
+    parser.add_argument('--version', help='Bundle version (default: creation time + content checksum)')
+    args = parser.parse_args()
+
+    if os.path.exists(args.weights):
+        print(f"Loading weights from {args.weights}")
+        weights = load_npz(args.weights)
+    else:
+        print(f"Loading model from {args.model}")
+        from tensorflow.keras.models import load_model
+        weights = keras_weight_arrays(load_model(args.model))
+
+    if os.path.exists(args.vocab):
+        print(f"Loading vocabulary from {args.vocab}")
+        vocab = load_npz(args.vocab)
+    else:
+        print(f"Loading tokenizer from {args.tokenizer}")
+        with open(args.tokenizer, 'rb') as f:
+            vocab = keras_tokenizer_arrays(pickle.load(f))
+
+    metadata = {}
+    if os.path.exists(args.metadata):
+        with open(args.metadata, 'r') as f:
+            metadata = json.load(f)
+
+    header = build_bundle(args.output, weights, vocab, SinhalaTextPreprocessor(), metadata, version=args.version)
+    ModelBundle(args.output)  # re-read and verify the checksums
+    print(f"✅ Bundle {header['version']} saved to {args.output} ({os.path.getsize(args.output) / 1024 / 1024:.1f} MB)")
+
+
+if __name__ == "__main__":
+    main()
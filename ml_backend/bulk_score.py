@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+Offline bulk scoring of CSV/TSV datasets
+Reads a dataset in chunks, scores every text with the same preprocessor,
+model and lexicon pipeline as /analyze in a pool of worker processes and
+writes the results to CSV or Parquet. Progress is checkpointed after every
+chunk so an interrupted run resumes where it stopped.
+"""
+
+import argparse
+import glob
+import json
+import multiprocessing
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+# Add current directory to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+TEXT_COLUMN_CANDIDATES = ['text', 'comment', 'Text', 'Comment', 'content']
+SCORE_COLUMNS = [
+    'prediction', 'off_probability', 'hate_score', 'final_hate_percentage', 'is_hate_speech',
+    'recommendation', 'confidence_level', 'hate_words', 'language', 'error'
+]
+
+# Pipeline module of each worker process (loaded once by _init_worker)
+_app = None
+
+
+def _init_worker():
+    """Load the model, tokenizer and preprocessor once per worker process"""
+    global _app
+    # Every row is scored on its own: no result cache shared across rows and chunks
+    os.environ['ANALYSIS_CACHE_SIZE'] = '0'
+    import app
+    if not app.load_lstm_model():
+        raise RuntimeError(app.model_load_error)
+    _app = app
+
+
+def _score_row(result):
+    """Flatten one /analyze response into the output columns"""
+    if 'error' in result:
+        return dict(dict.fromkeys(SCORE_COLUMNS), error=result['error'])
+
+    summary = result['summary']
+    analysis = result['analysis']
+    return {
+        'prediction': result['prediction'],
+        'off_probability': result['probabilities']['OFF'],
+        'hate_score': analysis['hate_score'],
+        'final_hate_percentage': summary['final_hate_percentage'],
+        'is_hate_speech': summary['is_hate_speech'],
+        'recommendation': summary['recommendation'],
+        'confidence_level': summary['confidence_level'],
+        'hate_words': '|'.join(analysis['hate_words_found']),
+        'language': analysis['language_detected'],
+        'error': None
+    }
+
+
+def _score_texts(texts):
+    """Worker task: score one chunk of texts"""
+    return [_score_row(result) for result in _app.analyze_texts(texts)]
+
+
+class BulkScorer:
+    """Chunked, checkpointed scoring of one dataset file"""
+
+    def __init__(self, input_path, output_path, text_column=None, sep=None, chunk_size=1000,
+                 workers=None, output_format=None, checkpoint_path=None):
+        self.input_path = input_path
+        self.output_path = output_path
+        self.text_column = text_column
+        self.sep = sep or ('\t' if input_path.lower().endswith('.tsv') else ',')
+        self.chunk_size = chunk_size
+        self.workers = workers or os.cpu_count() or 1
+        self.output_format = output_format or ('parquet' if output_path.lower().endswith('.parquet') else 'csv')
+        self.checkpoint_path = checkpoint_path or f"{output_path}.checkpoint.json"
+
+    def resolve_text_column(self):
+        """Use --text-column or the first known text column in the header"""
+        columns = pd.read_csv(self.input_path, sep=self.sep, nrows=0).columns
+        if self.text_column:
+            if self.text_column not in columns:
+                raise ValueError(f"Column '{self.text_column}' not found in {self.input_path} (columns: {list(columns)})")
+            return self.text_column
+        for candidate in TEXT_COLUMN_CANDIDATES:
+            if candidate in columns:
+                return candidate
+        raise ValueError(f"No text column found in {self.input_path}; pass --text-column (columns: {list(columns)})")
+
+    def load_checkpoint(self):
+        """Checkpoint of a previous run over the same input and settings, if any"""
+        if not os.path.exists(self.checkpoint_path):
+            return None
+        with open(self.checkpoint_path, 'r') as f:
+            checkpoint = json.load(f)
+        settings = {key: checkpoint.get(key) for key in ('input', 'text_column', 'chunk_size', 'format')}
+        if settings != self.settings():
+            raise ValueError(f"Checkpoint {self.checkpoint_path} was written with different settings: {settings}")
+        return checkpoint
+
+    def settings(self):
+        return {
+            'input': os.path.abspath(self.input_path),
+            'text_column': self.text_column,
+            'chunk_size': self.chunk_size,
+            'format': self.output_format
+        }
+
+    def save_checkpoint(self, chunks_done, rows_done, output_offset):
+        checkpoint = dict(self.settings(), chunks_done=chunks_done, rows_done=rows_done, output_offset=output_offset)
+        tmp_path = f"{self.checkpoint_path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(checkpoint, f)
+        os.replace(tmp_path, self.checkpoint_path)
+
+    def _open_output(self, checkpoint):
+        """Output handle positioned after the last checkpointed chunk"""
+        if self.output_format == 'parquet':
+            # One part file per chunk; parts past the checkpoint are rewritten
+            os.makedirs(self.output_path, exist_ok=True)
+            if not checkpoint:
+                # A fresh run may write fewer chunks than the last one; its extra parts would read as results
+                for part_path in glob.glob(os.path.join(self.output_path, 'part-*.parquet*')):
+                    os.remove(part_path)
+            return None
+        if checkpoint:
+            output = open(self.output_path, 'r+', encoding='utf-8', newline='')
+            # Drop rows written after the last checkpoint
+            output.truncate(checkpoint['output_offset'])
+            output.seek(checkpoint['output_offset'])
+            return output
+        return open(self.output_path, 'w', encoding='utf-8', newline='')
+
+    def _write_chunk(self, output, chunk_index, chunk, scores):
+        """Write one scored chunk and return the new output offset"""
+        scored = pd.concat([chunk.reset_index(drop=True), pd.DataFrame(scores, columns=SCORE_COLUMNS)], axis=1)
+        if self.output_format == 'parquet':
+            part_path = os.path.join(self.output_path, f"part-{chunk_index:06d}.parquet")
+            scored.to_parquet(f"{part_path}.tmp", index=False)
+            os.replace(f"{part_path}.tmp", part_path)
+            return 0
+        scored.to_csv(output, index=False, header=output.tell() == 0)
+        output.flush()
+        os.fsync(output.fileno())
+        return output.tell()
+
+    def run(self, restart=False):
+        print("=" * 60)
+        print("Singlish Bulk Scoring")
+        print("=" * 60)
+
+        if self.output_format == 'parquet':
+            try:
+                import pyarrow  # noqa: F401
+            except ImportError:
+                raise SystemExit("Parquet output requires pyarrow (pip install pyarrow)")
+
+        self.text_column = self.resolve_text_column()
+        if restart and os.path.exists(self.checkpoint_path):
+            os.remove(self.checkpoint_path)
+        checkpoint = self.load_checkpoint()
+
+        chunks_done = checkpoint['chunks_done'] if checkpoint else 0
+        rows_done = checkpoint['rows_done'] if checkpoint else 0
+        output_offset = checkpoint['output_offset'] if checkpoint else 0
+        if checkpoint:
+            print(f"Resuming after {chunks_done} chunks ({rows_done} rows) from {self.checkpoint_path}")
+
+        print(f"Scoring '{self.text_column}' of {self.input_path} with {self.workers} workers "
+              f"(chunks of {self.chunk_size} rows) -> {self.output_path}")
+
+        reader = pd.read_csv(self.input_path, sep=self.sep, chunksize=self.chunk_size, dtype=str, keep_default_na=False)
+        output = self._open_output(checkpoint)
+        started = time.time()
+        rows_scored = 0
+
+        # Spawned workers start without inherited BLAS/TensorFlow thread pools, one thread each
+        for variable in ('OMP_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'MKL_NUM_THREADS',
+                         'TF_NUM_INTRAOP_THREADS', 'TF_NUM_INTEROP_THREADS'):
+            os.environ.setdefault(variable, '1')
+
+        try:
+            with ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context('spawn'),
+                                     initializer=_init_worker) as pool:
+                pending = deque()
+                chunks = enumerate(reader)
+
+                def submit_next():
+                    for chunk_index, chunk in chunks:
+                        if chunk_index < chunks_done:
+                            continue  # already scored by the resumed run
+                        texts = chunk[self.text_column].tolist()
+                        pending.append((chunk_index, chunk, pool.submit(_score_texts, texts)))
+                        return True
+                    return False
+
+                # Keep a bounded window of chunks in flight so memory stays flat
+                for _ in range(self.workers * 2):
+                    if not submit_next():
+                        break
+
+                while pending:
+                    chunk_index, chunk, future = pending.popleft()
+                    scores = future.result()
+                    output_offset = self._write_chunk(output, chunk_index, chunk, scores)
+                    chunks_done = chunk_index + 1
+                    rows_done += len(chunk)
+                    rows_scored += len(chunk)
+                    self.save_checkpoint(chunks_done, rows_done, output_offset)
+
+                    elapsed = time.time() - started
+                    print(f"Chunk {chunks_done}: {rows_done} rows scored ({rows_scored / elapsed:.1f} rows/s)")
+                    submit_next()
+        finally:
+            if output is not None:
+                output.close()
+
+        print(f"✅ Scored {rows_done} rows in total, written to {self.output_path}")
+        # No checkpoint is written for an input without data rows
+        if os.path.exists(self.checkpoint_path):
+            os.remove(self.checkpoint_path)
+        return rows_done
+
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description='Score a CSV/TSV dataset offline with the Singlish LSTM pipeline')
+    parser.add_argument('input', help='CSV or TSV file (e.g. ../DataSets/SOLD_test.tsv)')
+    parser.add_argument('-o', '--output', help='Output .csv or .parquet path (default: <input>_scored.csv)')
+    parser.add_argument('--text-column', help=f"Column with the texts (default: first of {TEXT_COLUMN_CANDIDATES})")
+    parser.add_argument('--sep', help='Field separator (default: tab for .tsv, comma otherwise)')
+    parser.add_argument('--format', choices=['csv', 'parquet'], help='Output format (default: from the output extension)')
+    parser.add_argument('--chunk-size', type=int, default=1000, help='Rows per chunk / worker task')
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help='Worker processes (default: all cores)')
+    parser.add_argument('--restart', action='store_true', help='Ignore an existing checkpoint and start over')
+    args = parser.parse_args()
+
+    output = args.output or f"{os.path.splitext(args.input)[0]}_scored.csv"
+    scorer = BulkScorer(
+        args.input,
+        output,
+        text_column=args.text_column,
+        sep=args.sep,
+        chunk_size=args.chunk_size,
+        workers=args.workers,
+        output_format=args.format
+    )
+    scorer.run(restart=args.restart)
+
+
+if __name__ == "__main__":
+    main()
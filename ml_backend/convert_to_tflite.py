@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+Singlish LSTM TFLite Conversion Script
+Converts the trained Keras model to TFLite (float32, dynamic-range and int8)
+and reports the accuracy delta of each variant on the SOLD test set
+"""
+
+import argparse
+import json
+import os
+import pickle
+import sys
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import tensorflow as tf
+from tensorflow.keras.models import load_model
+from tensorflow.keras.preprocessing.sequence import pad_sequences
+
+# Add current directory to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app import SinhalaTextPreprocessor
+from tflite_model import TFLITE_VARIANTS, TFLiteModel, tflite_model_path
+
+# Largest probability difference from Keras accepted for each variant
+VERIFY_TOLERANCE = {'float32': 1e-4, 'dynamic': 0.05, 'int8': 0.05}
+
+
+class TFLiteConverter:
+    """Converts the Singlish LSTM to TFLite and evaluates the variants"""
+
+    def __init__(self, model_dir='models', data_path='../DataSets/SOLD_test.tsv',
+                 max_len=150, batch_size=1, calibration_samples=200):
+        self.model_dir = model_dir
+        self.data_path = data_path
+        self.max_len = max_len
+        self.batch_size = batch_size
+        self.calibration_samples = calibration_samples
+        self.preprocessor = SinhalaTextPreprocessor()
+        self.model = None
+        self.tokenizer = None
+
+    def load_artifacts(self):
+        """Load the trained Keras model and tokenizer"""
+        print("Loading model artifacts...")
+        self.model = load_model(os.path.join(self.model_dir, 'singlish_lstm_model.h5'))
+        with open(os.path.join(self.model_dir, 'singlish_tokenizer.pkl'), 'rb') as f:
+            self.tokenizer = pickle.load(f)
+
+    def load_evaluation_data(self):
+        """Tokenize the SOLD test set (labels NOT/OFF -> 0/1)"""
+        print(f"Loading evaluation data from {self.data_path}")
+        data = pd.read_csv(self.data_path, sep='\t')
+        data = data.dropna(subset=['text', 'label'])
+
+        texts = self.preprocessor.preprocess_batch(data['text'].astype(str).tolist())
+        labels = (data['label'].astype(str).str.upper() == 'OFF').astype(int).to_numpy()
+
+        sequences = self.tokenizer.texts_to_sequences(texts)
+        X = pad_sequences(sequences, maxlen=self.max_len, padding='post', truncating='post')
+        print(f"Evaluation set: {X.shape[0]} samples")
+        return X.astype(np.float32), labels
+
+    def static_model(self, unroll=False):
+        """Copy of the Keras model with a fixed (batch_size, max_len) float32 input
+
+        The fused TFLite LSTM op needs a static batch size. Token ids stay
+        float32, as in the Keras model; they are ids, not values to quantize.
+        With unroll=True the LSTMs are unrolled over the max_len steps.
+        """
+        inputs = tf.keras.Input((self.max_len,), batch_size=self.batch_size, dtype='float32')
+        x = inputs
+        for layer in self.model.layers:
+            config = layer.get_config()
+            if unroll and isinstance(layer, tf.keras.layers.Bidirectional):
+                config['layer']['config']['unroll'] = True
+                if 'backward_layer' in config:
+                    config['backward_layer']['config']['unroll'] = True
+            copy = layer.__class__.from_config(config)
+            x = copy(x)
+            copy.set_weights(layer.get_weights())
+        return tf.keras.Model(inputs, x)
+
+    def convert(self, variant, calibration_data):
+        """Convert the model to one TFLite variant"""
+        # Full-integer calibration of the fused LSTM op crashes the converter,
+        # so int8 quantizes the unrolled LSTMs (plain matmul/activation ops)
+        converter = tf.lite.TFLiteConverter.from_keras_model(self.static_model(unroll=variant == 'int8'))
+
+        if variant in ('dynamic', 'int8'):
+            converter.optimizations = [tf.lite.Optimize.DEFAULT]
+
+        if variant == 'int8':
+            def representative_dataset():
+                for start in range(0, len(calibration_data) - self.batch_size + 1, self.batch_size):
+                    yield [calibration_data[start:start + self.batch_size]]
+
+            converter.representative_dataset = representative_dataset
+            # Ops without an int8 kernel (the cast of the float token ids) fall
+            # back to float builtins; the model keeps float32 input and output
+            converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8,
+                                                   tf.lite.OpsSet.TFLITE_BUILTINS]
+            converter.inference_input_type = tf.float32
+            converter.inference_output_type = tf.float32
+
+        return converter.convert()
+
+    def verify(self, variant, model_path, calibration_data):
+        """Run a converted variant on the calibration rows and compare with Keras
+
+        Returns an error message, or None when the predictions are within
+        VERIFY_TOLERANCE of the Keras model.
+        """
+        expected = self.model.predict(calibration_data, verbose=0).reshape(-1)
+        actual = TFLiteModel(model_path).predict(calibration_data).reshape(-1)
+        max_diff = float(np.abs(actual - expected).max()) if len(expected) else 0.0
+        if not np.isfinite(max_diff) or max_diff > VERIFY_TOLERANCE[variant]:
+            return f"max probability difference {max_diff:.6f} exceeds {VERIFY_TOLERANCE[variant]}"
+        print(f"✅ Verified {variant} on {len(expected)} calibration rows (max diff {max_diff:.6f})")
+        return None
+
+    @staticmethod
+    def measure_latency(predict, X, samples=100):
+        """Mean single-item latency in milliseconds"""
+        samples = min(samples, len(X))
+        start = time.perf_counter()
+        for i in range(samples):
+            predict(X[i:i + 1])
+        return (time.perf_counter() - start) / samples * 1000 if samples else 0.0
+
+    def evaluate(self, name, predict, X, y, reference=None, size_bytes=None):
+        """Accuracy, agreement with the Keras model and latency of one variant"""
+        probabilities = predict(X).reshape(-1)
+        predictions = (probabilities > 0.5).astype(int)
+
+        result = {
+            'variant': name,
+            'accuracy': float((predictions == y).mean()),
+            'size_bytes': size_bytes,
+            'latency_ms': self.measure_latency(predict, X)
+        }
+        if reference is not None:
+            result['accuracy_delta'] = result['accuracy'] - reference['accuracy']
+            result['agreement_with_keras'] = float((predictions == reference['predictions']).mean())
+            result['max_abs_probability_diff'] = float(np.abs(probabilities - reference['probabilities']).max())
+            result['mean_abs_probability_diff'] = float(np.abs(probabilities - reference['probabilities']).mean())
+
+        print(f"{name:>8}: accuracy {result['accuracy']:.4f}"
+              + (f" (delta {result['accuracy_delta']:+.4f})" if reference is not None else '')
+              + f", {result['latency_ms']:.2f} ms/item")
+        return result, probabilities, predictions
+
+    def run(self):
+        """Convert every variant and write the accuracy report"""
+        print("=" * 60)
+        print("Singlish LSTM TFLite Conversion")
+        print("=" * 60)
+
+        self.load_artifacts()
+        X, y = self.load_evaluation_data()
+
+        keras_path = os.path.join(self.model_dir, 'singlish_lstm_model.h5')
+        keras_result, keras_probabilities, keras_predictions = self.evaluate(
+            'keras', lambda batch: self.model.predict(batch, verbose=0), X, y,
+            size_bytes=os.path.getsize(keras_path)
+        )
+        reference = {
+            'accuracy': keras_result['accuracy'],
+            'probabilities': keras_probabilities,
+            'predictions': keras_predictions
+        }
+
+        results = [keras_result]
+        failures = {}
+        calibration_data = X[:self.calibration_samples]
+        for variant in TFLITE_VARIANTS:
+            print(f"Converting {variant} variant...")
+            output_path = tflite_model_path(self.model_dir, variant)
+            try:
+                model_bytes = self.convert(variant, calibration_data)
+                with open(output_path, 'wb') as f:
+                    f.write(model_bytes)
+                print(f"✅ Saved {output_path} ({len(model_bytes) / 1e6:.1f} MB)")
+                error = self.verify(variant, output_path, calibration_data)
+            except Exception as e:
+                error = str(e)
+
+            if error:
+                print(f"❌ {variant} variant failed: {error}")
+                failures[variant] = error
+                # Don't leave a broken model where the server would load it
+                if os.path.exists(output_path):
+                    os.remove(output_path)
+                continue
+
+            tflite_model = TFLiteModel(output_path)
+            result, _, _ = self.evaluate(variant, tflite_model.predict, X, y, reference, len(model_bytes))
+            result['path'] = output_path
+            results.append(result)
+
+        report = {
+            'dataset': self.data_path,
+            'samples': int(len(y)),
+            'batch_size': self.batch_size,
+            'conversion_date': datetime.now().isoformat(),
+            'tensorflow_version': tf.__version__,
+            'results': results,
+            'failures': failures
+        }
+        report_path = os.path.join(self.model_dir, 'tflite_report.json')
+        with open(report_path, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"✅ Report saved to {report_path}")
+
+        return report
+
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description='Convert the Singlish LSTM to TFLite')
+    parser.add_argument('--model-dir', default='models', help='Directory with the trained artifacts')
+    parser.add_argument('--data', default='../DataSets/SOLD_test.tsv', help='Evaluation TSV with text/label columns')
+    parser.add_argument('--batch-size', type=int, default=1, help='Static batch size of the converted models')
+    parser.add_argument('--calibration-samples', type=int, default=200, help='Samples used to calibrate int8')
+    args = parser.parse_args()
+
+    converter = TFLiteConverter(
+        model_dir=args.model_dir,
+        data_path=args.data,
+        batch_size=args.batch_size,
+        calibration_samples=args.calibration_samples
+    )
+    report = converter.run()
+    if report['failures']:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
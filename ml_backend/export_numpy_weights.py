@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Singlish LSTM NumPy Weight Export Script
+Writes the trained Keras model to models/singlish_lstm_weights.npz for the
+TensorFlow-free NumPy backend and checks both produce the same predictions
+"""
+
+import argparse
+import os
+import sys
+
+import numpy as np
+from tensorflow.keras.models import load_model
+
+# Add current directory to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from numpy_lstm import NumpyLSTMModel, export_keras_weights
+
+
+def verify(keras_model, numpy_model, samples=64, max_len=150, tolerance=1e-5):
+    """Compare both models on random padded sequences"""
+    rng = np.random.default_rng(0)
+    vocab_size = numpy_model.layers[0][1]['embeddings'].shape[0]
+    x = rng.integers(1, vocab_size, size=(samples, max_len))
+    lengths = rng.integers(1, max_len + 1, size=samples)
+    x[np.arange(max_len) >= lengths[:, None]] = 0
+
+    difference = float(np.abs(keras_model.predict(x, verbose=0) - numpy_model.predict(x)).max())
+    print(f"Max absolute difference vs Keras on {samples} samples: {difference:.2e}")
+    return difference <= tolerance
+
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description='Export the Singlish LSTM weights for NumPy inference')
+    parser.add_argument('--model', default='models/singlish_lstm_model.h5', help='Trained Keras model')
+    parser.add_argument('--output', default='models/singlish_lstm_weights.npz', help='Output weight file')
+    args = parser.parse_args()
+
+    print(f"Loading model from {args.model}")
+    keras_model = load_model(args.model)
+    export_keras_weights(keras_model, args.output)
+    print(f"✅ Weights saved to {args.output}")
+
+    if not verify(keras_model, NumpyLSTMModel(args.output)):
+        print("❌ NumPy predictions differ from Keras by more than 1e-5")
+        sys.exit(1)
+    print("✅ NumPy predictions match Keras")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Singlish Tokenizer Export Script
+Writes the pickled Keras tokenizer to models/singlish_vocab.npz, the compact
+vocabulary the server loads without pickle or TensorFlow, and checks both
+produce the same token ids
+"""
+
+import argparse
+import os
+import pickle
+import sys
+
+import pandas as pd
+
+# Add current directory to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from vocab_tokenizer import VocabTokenizer, export_keras_tokenizer
+
+
+def verify(keras_tokenizer, vocab_tokenizer, texts):
+    """Compare the token ids of both tokenizers on texts"""
+    expected = keras_tokenizer.texts_to_sequences(texts)
+    actual = vocab_tokenizer.texts_to_sequences(texts)
+    mismatches = sum(1 for a, b in zip(expected, actual) if a != b)
+    print(f"Token id mismatches vs Keras on {len(texts)} texts: {mismatches}")
+    return mismatches == 0
+
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description='Export the Singlish tokenizer as a compact vocabulary file')
+    parser.add_argument('--tokenizer', default='models/singlish_tokenizer.pkl', help='Pickled Keras tokenizer')
+    parser.add_argument('--output', default='models/singlish_vocab.npz', help='Output vocabulary file')
+    parser.add_argument('--data', default='../DataSets/SOLD_test.tsv', help='Texts to verify the export on')
+    args = parser.parse_args()
+
+    print(f"Loading tokenizer from {args.tokenizer}")
+    with open(args.tokenizer, 'rb') as f:
+        keras_tokenizer = pickle.load(f)
+    config = export_keras_tokenizer(keras_tokenizer, args.output)
+    print(f"✅ Vocabulary of {config['vocab_size']} words saved to {args.output} "
+          f"({os.path.getsize(args.output) / 1024:.0f} KB)")
+
+    if os.path.exists(args.data):
+        texts = pd.read_csv(args.data, sep='\t' if args.data.endswith('.tsv') else ',')['text'].dropna().astype(str).tolist()
+        if not verify(keras_tokenizer, VocabTokenizer(args.output), texts):
+            print("❌ Token ids differ from the Keras tokenizer")
+            sys.exit(1)
+        print("✅ Token ids match the Keras tokenizer")
+    else:
+        print(f"⚠️  {args.data} not found, skipping verification")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+"""
+SQLite feedback store
+Feedback entries live in a local SQLite database in WAL mode (readers never
+block the writer). Per-type counters are updated in the same transaction as
+each insert, so /feedback/stats reads a handful of rows no matter how much
+feedback has been collected. Listing is paginated by id and can be limited
+to a feedback type and a timestamp range.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS feedback (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    timestamp TEXT NOT NULL,
+    feedback_type TEXT NOT NULL,
+    text TEXT NOT NULL,
+    user_annotation TEXT,
+    original_prediction TEXT,
+    confidence REAL,
+    model_version TEXT
+);
+CREATE INDEX IF NOT EXISTS feedback_timestamp ON feedback (timestamp);
+CREATE INDEX IF NOT EXISTS feedback_type_id ON feedback (feedback_type, id);
+CREATE TABLE IF NOT EXISTS feedback_counts (
+    feedback_type TEXT PRIMARY KEY,
+    count INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS store_meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+COLUMNS = ('id', 'timestamp', 'feedback_type', 'text', 'user_annotation',
+           'original_prediction', 'confidence', 'model_version')
+
+MAX_PAGE_SIZE = 500
+
+
+class FeedbackStore:
+    """Feedback entries with running per-type counts
+
+    The database is opened on first use, with one connection per thread
+    (and per process, so prefork workers never share one).
+    """
+
+    def __init__(self, path='feedback_data.db'):
+        self.path = path
+        self._local = threading.local()
+
+    def _connection(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is not None and self._local.pid == os.getpid():
+            return connection
+        connection = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+        connection.execute('PRAGMA journal_mode=WAL')
+        connection.execute('PRAGMA synchronous=NORMAL')
+        connection.executescript(SCHEMA)
+        self._local.connection = connection
+        self._local.pid = os.getpid()
+        return connection
+
+    def _insert(self, connection, feedback):
+        cursor = connection.execute(
+            'INSERT INTO feedback (timestamp, feedback_type, text, user_annotation, original_prediction, '
+            'confidence, model_version) VALUES (?, ?, ?, ?, ?, ?, ?)',
+            (feedback['timestamp'], feedback['feedback_type'], feedback['text'], feedback.get('user_annotation'),
+             feedback.get('original_prediction'), feedback.get('confidence'), feedback.get('model_version'))
+        )
+        connection.execute(
+            'INSERT INTO feedback_counts (feedback_type, count) VALUES (?, 1) '
+            'ON CONFLICT (feedback_type) DO UPDATE SET count = count + 1',
+            (feedback['feedback_type'],)
+        )
+        return cursor.lastrowid
+
+    def add(self, feedback):
+        """Store one feedback dict (the /feedback fields); returns its id"""
+        connection = self._connection()
+        with connection:
+            connection.execute('BEGIN IMMEDIATE')
+            return self._insert(connection, feedback)
+
+    def counts(self):
+        """{feedback_type: count} from the running counters"""
+        rows = self._connection().execute('SELECT feedback_type, count FROM feedback_counts')
+        return {feedback_type: count for feedback_type, count in rows}
+
+    def query(self, feedback_type=None, since=None, until=None, before_id=None, limit=50):
+        """Newest-first page of entries
+
+        since/until bound the ISO timestamp (since inclusive, until exclusive);
+        before_id continues from the next_before_id of the previous page.
+        Returns (entries, next_before_id), next_before_id None on the last page.
+        """
+        conditions, params = [], []
+        for condition, value in (('feedback_type = ?', feedback_type), ('timestamp >= ?', since),
+                                 ('timestamp < ?', until), ('id < ?', before_id)):
+            if value is not None:
+                conditions.append(condition)
+                params.append(value)
+        limit = max(1, min(int(limit), MAX_PAGE_SIZE))
+        sql = f"SELECT {', '.join(COLUMNS)} FROM feedback"
+        if conditions:
+            sql += ' WHERE ' + ' AND '.join(conditions)
+        sql += ' ORDER BY id DESC LIMIT ?'
+
+        rows = self._connection().execute(sql, params + [limit + 1]).fetchall()
+        entries = [dict(zip(COLUMNS, row)) for row in rows[:limit]]
+        next_before_id = entries[-1]['id'] if len(rows) > limit else None
+        return entries, next_before_id
+
+    def import_jsonl(self, path, batch_size=1000):
+        """Import a feedback_data.jsonl log; safe to run again, also concurrently
+
+        The number of lines already imported is recorded and re-read in each
+        write transaction, so a rerun (or another process importing at the same
+        time) only adds lines not imported yet. Returns (imported, skipped)
+        line counts; unreadable lines are skipped.
+        """
+        key = f"imported_lines:{os.path.abspath(path)}"
+        connection = self._connection()
+        done = self._imported_lines(connection, key)
+
+        imported = skipped = 0
+        line_number = 0
+        batch = []  # (line number, feedback)
+
+        def flush():
+            nonlocal imported
+            with connection:
+                connection.execute('BEGIN IMMEDIATE')
+                recorded = self._imported_lines(connection, key)
+                for number, feedback in batch:
+                    if number > recorded:
+                        self._insert(connection, feedback)
+                        imported += 1
+                connection.execute(
+                    'INSERT INTO store_meta (key, value) VALUES (?, ?) '
+                    'ON CONFLICT (key) DO UPDATE SET value = excluded.value',
+                    (key, str(max(line_number, recorded)))
+                )
+            batch.clear()
+
+        with open(path, 'r', encoding='utf-8') as f:
+            for line_number, line in enumerate(f, start=1):
+                if line_number <= done:
+                    continue
+                try:
+                    feedback = _parse_feedback_line(line)
+                except ValueError:
+                    skipped += 1
+                    continue
+                batch.append((line_number, feedback))
+                if len(batch) >= batch_size:
+                    flush()
+        if line_number > done:
+            flush()
+        return imported, skipped
+
+    def _imported_lines(self, connection, key):
+        row = connection.execute('SELECT value FROM store_meta WHERE key = ?', (key,)).fetchone()
+        return int(row[0]) if row else 0
+
+
+def _parse_feedback_line(line):
+    """Feedback dict of one JSONL line; ValueError if it cannot be stored"""
+    feedback = json.loads(line)
+    if not isinstance(feedback, dict):
+        raise ValueError('not a JSON object')
+    if not isinstance(feedback.get('feedback_type'), str) or not feedback['feedback_type']:
+        raise ValueError('missing feedback_type')
+    if not isinstance(feedback.get('text'), str):
+        raise ValueError('missing text')
+    for column in COLUMNS[1:]:
+        if not isinstance(feedback.get(column), (str, int, float, type(None))):
+            raise ValueError(f"{column} is not a scalar")
+    feedback['timestamp'] = feedback.get('timestamp') or ''
+    return feedback
@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+"""
+Feedback Import Script
+Imports the feedback_data.jsonl log written by older versions of the server
+into the SQLite feedback store. Rerunning it only imports lines appended
+since the previous run.
+"""
+
+import argparse
+import os
+import sys
+
+# Add current directory to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from feedback_store import FeedbackStore
+
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description='Import feedback_data.jsonl into the feedback store')
+    parser.add_argument('--input', default='feedback_data.jsonl', help='JSONL feedback log')
+    parser.add_argument('--db', default=os.environ.get('FEEDBACK_DB', 'feedback_data.db'), help='Feedback database')
+    args = parser.parse_args()
+
+    if not os.path.exists(args.input):
+        print(f"❌ {args.input} not found")
+        sys.exit(1)
+
+    store = FeedbackStore(args.db)
+    imported, skipped = store.import_jsonl(args.input)
+    print(f"✅ Imported {imported} feedback entries into {args.db} ({skipped} unreadable lines skipped)")
+    print(f"Feedback counts: {store.counts()}")
+
+
+if __name__ == "__main__":
+    main()
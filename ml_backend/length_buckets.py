@@ -0,0 +1,66 @@
+"""
+Length-bucketed padding
+Sequences are padded only up to the smallest bucket bound that fits them
+(e.g. 16/32/64/150) instead of always to max_len, so the BiLSTM does not
+spend most of its steps on padding
+"""
+
+import random
+
+DEFAULT_LENGTH_BUCKETS = '16,32,64,150'
+
+
+def parse_length_buckets(value, max_len):
+    """'16,32,64,150' -> sorted bucket bounds, always ending at max_len"""
+    bounds = sorted({int(bound) for bound in str(value).split(',') if bound.strip()})
+    return tuple(bound for bound in bounds if 0 < bound < max_len) + (max_len,)
+
+
+def bucket_bound(length, buckets):
+    """Smallest bucket bound that fits a sequence of this length"""
+    for bound in buckets:
+        if length <= bound:
+            return bound
+    return buckets[-1]
+
+
+def group_by_bucket(lengths, buckets):
+    """[(bound, row indexes)] for the token counts of a batch, smallest bucket first"""
+    groups = {}
+    for row, length in enumerate(lengths):
+        groups.setdefault(bucket_bound(length, buckets), []).append(row)
+    return sorted(groups.items())
+
+
+def bucketed_batches(lengths, buckets, batch_size, shuffle=True, seed=None):
+    """Training batches of row indexes that share a bucket: [(bound, rows)]
+
+    Rows are shuffled within each bucket and the batch order is shuffled
+    across buckets, so every batch is padded only to its own bound.
+    """
+    rng = random.Random(seed)
+    groups = {}
+    for row, length in enumerate(lengths):
+        groups.setdefault(bucket_bound(length, buckets), []).append(row)
+
+    batches = []
+    for bound, rows in sorted(groups.items()):
+        if shuffle:
+            rng.shuffle(rows)
+        batches.extend((bound, rows[start:start + batch_size]) for start in range(0, len(rows), batch_size))
+    if shuffle:
+        rng.shuffle(batches)
+    return batches
+
+
+def is_padding_invariant(model):
+    """True if the amount of padding cannot change the model's predictions
+
+    That holds when the embedding masks the padding id 0. The NumPy and
+    TFLite backends state it themselves; Keras models are checked for
+    Embedding(mask_zero=True).
+    """
+    if hasattr(model, 'padding_invariant'):
+        return bool(model.padding_invariant)
+    layers = getattr(model, 'layers', None)
+    return bool(layers) and bool(getattr(layers[0], 'mask_zero', False))
@@ -0,0 +1,417 @@
+"""
+Lexicon indexes for hate word detection
+Precompiled matchers built once from the hate word lexicon so detection
+does not have to rescan the text for every word and variation
+"""
+
+import re
+import threading
+import time
+from collections import OrderedDict, deque
+
+
+def collapse_repetitions(word):
+    """Collapse every run of a repeated character to a single character"""
+    return re.sub(r'(.)\1+', r'\1', word)
+
+
+def singlish_normalize(word):
+    """Common Singlish vowel normalizations (a->o, ending o/e -> a)"""
+    variations = word
+    variations = variations.replace('a', 'o')  # a->o variations
+    variations = re.sub(r'o$', 'a', variations)  # ending o->a
+    variations = re.sub(r'e$', 'a', variations)  # ending e->a
+    return variations
+
+
+class AhoCorasickMatcher:
+    """Multi-pattern substring matcher (Aho-Corasick automaton)
+
+    Every pattern carries a payload; a single pass over the text reports the
+    payloads of all patterns that occur anywhere in it.
+    """
+
+    def __init__(self):
+        # State 0 is the root; each state has goto edges, a failure link, the
+        # payloads of patterns ending exactly there, and the full output set
+        # (its own payloads plus those reachable through failure links).
+        # Payloads are kept in tuples and edges in int-valued dicts, which the
+        # cyclic garbage collector does not track, so a large automaton does
+        # not make every full collection slower
+        self._goto = [{}]
+        self._fail = [0]
+        self._own = [()]
+        self._output = [()]
+        self._built = True
+        self.pattern_count = 0
+
+    def add(self, pattern, payload):
+        """Add a pattern with its payload (call build() before matching)"""
+        if not pattern:
+            return
+        state = 0
+        for char in pattern:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._own.append(())
+                self._output.append(())
+                self._goto[state][char] = next_state
+            state = next_state
+        self._own[state] += (payload,)
+        self.pattern_count += 1
+        self._built = False
+
+    def copy(self):
+        """Independent copy that add() can extend while this one keeps matching"""
+        clone = AhoCorasickMatcher.__new__(AhoCorasickMatcher)
+        clone._goto = [dict(edges) for edges in self._goto]
+        clone._fail = list(self._fail)
+        clone._own = list(self._own)  # Payload tuples are immutable, so sharing them is safe
+        clone._output = list(self._output)
+        clone._built = self._built
+        clone.pattern_count = self.pattern_count
+        return clone
+
+    def build(self, yield_every=0):
+        """Compute failure links with a breadth-first walk of the trie
+
+        yield_every > 0 releases the GIL every that many states, for builds
+        running on a background thread.
+        """
+        queue = deque()
+        visited = 0
+        for state in self._goto[0].values():
+            self._fail[state] = 0
+            self._output[state] = self._own[state]
+            queue.append(state)
+
+        while queue:
+            state = queue.popleft()
+            visited += 1
+            if yield_every and visited % yield_every == 0:
+                time.sleep(0)
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[next_state] = target if target != next_state else 0
+                # Patterns ending at the failure state also end here
+                self._output[next_state] = (
+                    self._own[next_state] + self._output[self._fail[next_state]]
+                )
+
+        self._built = True
+
+    def iter_matches(self, text):
+        """Yield the payload of every pattern occurrence in text"""
+        if not self._built:
+            self.build()
+
+        goto = self._goto
+        fail = self._fail
+        output = self._output
+        state = 0
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if output[state]:
+                yield from output[state]
+
+    def find_all(self, text):
+        """Return the set of payloads of all patterns found in text"""
+        return set(self.iter_matches(text))
+
+
+class VariationIndex:
+    """Aho-Corasick index over every hate word and its generated variations
+
+    Payloads are (word_index, variation_rank) pairs; rank 0 is the hate word
+    itself, so the smallest matched rank tells exact matches from variations.
+
+    Words added after construction go into a small delta automaton: each add
+    inserts only the new word's variations into a copy of it. Once DELTA_LIMIT words have accumulated, a background
+    thread folds them into a new main automaton while adds and matches carry
+    on against the old pair. Automata are never modified once published, so
+    concurrent match() calls need no lock.
+    """
+
+    DELTA_LIMIT = 32
+
+    def __init__(self, hate_words, generate_variations):
+        self.hate_words = []
+        self.variations = []
+        self._generate_variations = generate_variations
+        self._write_lock = threading.Lock()
+        for hate_word in hate_words:
+            self._add_word(hate_word)
+        self._delta_words = []
+        self._fold_thread = None
+        # (main, delta) swapped as one reference so readers see a consistent pair
+        self._matchers = (self._build_matcher(range(len(self.hate_words))), None)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['_write_lock'], state['_fold_thread']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._write_lock = threading.Lock()
+        self._fold_thread = None
+
+    def _add_word(self, hate_word):
+        word_index = len(self.hate_words)
+        self.variations.append(self._generate_variations(hate_word.lower()))
+        self.hate_words.append(hate_word)
+        return word_index
+
+    def _build_matcher(self, word_indexes, cooperative=False, matcher=None):
+        """Automaton over the variations of word_indexes (added to a copy of matcher if given)"""
+        matcher = matcher.copy() if matcher is not None else AhoCorasickMatcher()
+        for count, word_index in enumerate(word_indexes):
+            for rank, variation in enumerate(self.variations[word_index]):
+                matcher.add(variation, (word_index, rank))
+            if cooperative and count % 32 == 0:
+                time.sleep(0)  # Let request threads take the GIL during a background build
+        matcher.build(yield_every=1000 if cooperative else 0)
+        return matcher
+
+    def add_word(self, hate_word):
+        """Index a new hate word without rebuilding the main automaton"""
+        with self._write_lock:
+            word_index = self._add_word(hate_word)
+            self._delta_words.append(word_index)
+            # Only the new word's variations are inserted; the published delta is never modified
+            self._matchers = (self._matchers[0], self._build_matcher([word_index], matcher=self._matchers[1]))
+            if len(self._delta_words) >= self.DELTA_LIMIT and self._fold_thread is None:
+                self._fold_thread = threading.Thread(target=self._fold, args=(len(self.hate_words),),
+                                                     name='variation-index-fold', daemon=True)
+                self._fold_thread.start()
+
+    def _fold(self, word_count):
+        """Build a main automaton over the first word_count words and swap it in"""
+        try:
+            main = self._build_matcher(range(word_count), cooperative=True)
+        except Exception as e:
+            print(f"Error folding variation index: {e}")
+            with self._write_lock:
+                self._fold_thread = None
+            return
+        with self._write_lock:
+            # Words added while the fold ran stay in the delta
+            self._delta_words = [word_index for word_index in self._delta_words if word_index >= word_count]
+            delta = self._build_matcher(self._delta_words) if self._delta_words else None
+            self._matchers = (main, delta)
+            self._fold_thread = None
+
+    def wait_for_fold(self, timeout=None):
+        """Block until a running background fold has been swapped in"""
+        thread = self._fold_thread
+        if thread is not None:
+            thread.join(timeout)
+
+    @property
+    def pattern_count(self):
+        main, delta = self._matchers
+        return main.pattern_count + (delta.pattern_count if delta is not None else 0)
+
+    def match(self, text_lower):
+        """Find hate words present in text, in lexicon order
+
+        Returns a list of (hate_word, matched_variation, is_exact) tuples where
+        matched_variation is the first variation (in generation order) found.
+        """
+        best_rank = {}
+        for matcher in self._matchers:
+            if matcher is None:
+                continue
+            for word_index, rank in matcher.iter_matches(text_lower):
+                current = best_rank.get(word_index)
+                if current is None or rank < current:
+                    best_rank[word_index] = rank
+
+        matches = []
+        for word_index in sorted(best_rank):
+            rank = best_rank[word_index]
+            matches.append((
+                self.hate_words[word_index],
+                self.variations[word_index][rank],
+                rank == 0
+            ))
+        return matches
+
+
+def fuzzy_length_window(length):
+    """Range of word lengths that can reach a 0.8 similarity with a word of this length"""
+    low = min(-(-2 * length // 3), length - 2)
+    high = max(3 * length // 2, length + 2)
+    return max(low, 0), high
+
+
+class FuzzyIndex:
+    """SymSpell-style candidate index for fuzzy hate word matching
+
+    Returns, for a token, a superset of the hate words whose
+    calculate_similarity score against it can reach 0.8, so only those need
+    the full Singlish-aware scoring. A pair can only reach 0.8 through:
+
+    - at most 2 positional differences (edit distance <= 2),
+    - equal forms after collapsing repeated characters,
+    - equal forms after Singlish vowel normalization, or
+    - a SequenceMatcher ratio >= 0.8 / 75% containment, which needs both
+      lengths within [2/3, 3/2] of each other and leaves a common
+      subsequence after deleting at most len // 3 characters from each word.
+
+    Words up to MAX_INDEXED_LENGTH characters are indexed by their deletion
+    variants; longer words (and candidates for long tokens) are found
+    through a length bucket scan over that bounded length window.
+    """
+
+    MAX_INDEXED_LENGTH = 10
+
+    def __init__(self, hate_words=()):
+        self.hate_words = []
+        self._deletes = {}
+        self._by_length = {}
+        self._collapsed = {}
+        self._singlish = {}
+        self._exact = {}
+        for hate_word in hate_words:
+            self.add_word(hate_word)
+
+    @staticmethod
+    def _max_deletes(length):
+        return max(2, length // 3)
+
+    @staticmethod
+    def _delete_variants(word, max_deletes):
+        """All strings obtained by deleting up to max_deletes characters"""
+        variants = {word}
+        frontier = {word}
+        for _ in range(max_deletes):
+            next_frontier = set()
+            for current in frontier:
+                for i in range(len(current)):
+                    next_frontier.add(current[:i] + current[i + 1:])
+            next_frontier -= variants
+            variants |= next_frontier
+            frontier = next_frontier
+        return variants
+
+    @staticmethod
+    def _length_window(length):
+        return fuzzy_length_window(length)
+
+    def add_word(self, hate_word):
+        """Index a hate word (lexicon order is preserved in the results)"""
+        word_index = len(self.hate_words)
+        word = hate_word.lower()
+        self.hate_words.append(hate_word)
+
+        self._by_length.setdefault(len(word), []).append(word_index)
+        self._collapsed.setdefault(collapse_repetitions(word), []).append(word_index)
+        self._singlish.setdefault(singlish_normalize(word), []).append(word_index)
+        self._exact.setdefault(word, []).append(word_index)
+
+        if len(word) <= self.MAX_INDEXED_LENGTH:
+            for variant in self._delete_variants(word, self._max_deletes(len(word))):
+                self._deletes.setdefault(variant, []).append(word_index)
+
+    def candidates(self, token):
+        """Return the set of lexicon indexes that may fuzzily match token"""
+        found = set()
+        found.update(self._collapsed.get(collapse_repetitions(token), ()))
+        found.update(self._singlish.get(token, ()))
+        found.update(self._exact.get(singlish_normalize(token), ()))
+
+        low, high = self._length_window(len(token))
+        if len(token) <= self.MAX_INDEXED_LENGTH:
+            for variant in self._delete_variants(token, self._max_deletes(len(token))):
+                found.update(self._deletes.get(variant, ()))
+            low = max(low, self.MAX_INDEXED_LENGTH + 1)
+
+        for length in range(low, high + 1):
+            found.update(self._by_length.get(length, ()))
+
+        return found
+
+
+class TokenMatchMemo:
+    """Bounded LRU memo of per-token fuzzy match results
+
+    Maps a token to the (word_index, similarity) pairs of every hate word it
+    fuzzily matches, together with the lexicon size they were computed
+    against. Lexicon words are only ever appended, so an entry computed
+    before words were added stays valid for the older words; the caller
+    scores the token against the newer words only, on the next lookup,
+    instead of adding a word having to invalidate entries.
+    """
+
+    def __init__(self, max_entries=50000):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.extensions = 0
+
+    def __getstate__(self):
+        # Memoized results are process-local; pickle an empty memo
+        return {'max_entries': self.max_entries}
+
+    def __setstate__(self, state):
+        self.__init__(state['max_entries'])
+
+    def get(self, token, word_count):
+        """(matches, computed_word_count) memoized for token, or None
+
+        A hit only counts as one if it covers the first word_count words; an
+        older entry is returned for the caller to extend.
+        """
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(token)
+            if entry[1] >= word_count:
+                self.hits += 1
+            else:
+                self.extensions += 1
+            return entry
+
+    def put(self, token, matches, word_count):
+        """Store matches of token against the first word_count lexicon words"""
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            entry = self._entries.get(token)
+            # Keep an entry another thread computed against more words
+            if entry is not None and entry[1] >= word_count:
+                return
+            self._entries[token] = (matches, word_count)
+            self._entries.move_to_end(token)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """Drop every entry"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """Counters for monitoring"""
+        with self._lock:
+            return {
+                'size': len(self._entries),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses,
+                'extensions': self.extensions
+            }
@@ -0,0 +1,80 @@
+"""
+Append-only store for hate words learned from feedback
+The file is read once; afterwards membership is a set lookup, new words
+are appended as single lines, and refresh() only reads lines other
+processes appended since the last read.
+"""
+
+import os
+import threading
+
+
+class LexiconStore:
+    """Hate words persisted one per line, in the order they were added"""
+
+    def __init__(self, path='persistent_hate_words.txt'):
+        self.path = path
+        self.words = []
+        self._word_set = set()
+        self._offset = 0
+        self._lock = threading.Lock()
+        self.refresh()
+
+    def __contains__(self, word):
+        return word.lower() in self._word_set
+
+    def __len__(self):
+        return len(self.words)
+
+    def _remember(self, word):
+        if word and word not in self._word_set:
+            self._word_set.add(word)
+            self.words.append(word)
+            return True
+        return False
+
+    def refresh(self):
+        """Read lines appended since the last read (everything if the file was rewritten)
+
+        Returns the newly seen words.
+        """
+        with self._lock:
+            try:
+                size = os.path.getsize(self.path)
+            except OSError:
+                return []
+            if size < self._offset:
+                self.words, self._word_set, self._offset = [], set(), 0
+            if size == self._offset:
+                return []
+
+            with open(self.path, 'rb') as f:
+                f.seek(self._offset)
+                data = f.read(size - self._offset)
+            # A line still being written by another process is read next time; a
+            # final line without its newline is picked up once add() terminates it
+            end = data.rfind(b'\n') + 1
+            self._offset += end
+            lines = data[:end].decode('utf-8').splitlines()
+            return [word for word in (line.strip().lower() for line in lines) if self._remember(word)]
+
+    def add(self, word):
+        """Append word unless it is already stored; True if it was added
+
+        Lines other processes appended are left for refresh(), so its caller
+        still sees them (the word may then be stored twice, which reads back
+        as once).
+        """
+        word = word.strip().lower()
+        with self._lock:
+            if not self._remember(word):
+                return False
+            # One O_APPEND write per word, so concurrent writers never interleave
+            # lines; refresh() reads it back like any other appended line
+            with open(self.path, 'ab+') as f:
+                prefix = b''
+                if f.seek(0, os.SEEK_END) > 0:
+                    f.seek(-1, os.SEEK_END)
+                    prefix = b'' if f.read(1) == b'\n' else b'\n'
+                f.write(prefix + word.encode('utf-8') + b'\n')
+            return True
@@ -0,0 +1,358 @@
+#!/usr/bin/env python3
+"""
+Closed-loop load generator for the ML backend
+Replays a weighted mix of texts from the bundled datasets against /analyze
+of a local server in steps of increasing concurrency (or request rate),
+reports throughput, latency percentiles and error rate per step, and finds
+the step where p99 latency crosses the SLO. Texts repeat, so the server's
+/analyze result cache would serve most of them: --start runs the server with
+the cache off, and every step records the cache hit rate it saw.
+Standard library only.
+
+    python ml_backend/load_test.py --start --concurrency 1,2,4,8,16 --slo-ms 500
+    python ml_backend/load_test.py --concurrency 8 --rates 5,10,20,40 --output load.json
+"""
+
+import argparse
+import csv
+import http.client
+import json
+import math
+import os
+import random
+import shlex
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime
+from urllib.parse import urlsplit
+
+DEFAULT_DATASETS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'DataSets')
+
+# name: (file, delimiter, text column)
+DATASETS = {
+    'SOLD_test': ('SOLD_test.tsv', '\t', 'text'),
+    'test': ('test.csv', ',', 'comment'),
+    'only_hate': ('only_hate.csv', ',', 'sensitive text'),
+}
+
+# Throughput gain below which a higher step counts as no longer scaling
+MIN_SCALING_GAIN = 0.05
+
+
+def load_mix(datasets_dir, weights):
+    """[(texts, weight)] for every dataset with a positive weight"""
+    mix = []
+    for name, weight in weights.items():
+        if weight <= 0:
+            continue
+        filename, delimiter, column = DATASETS[name]
+        with open(os.path.join(datasets_dir, filename), newline='', encoding='utf-8') as f:
+            texts = [row[column].strip() for row in csv.DictReader(f, delimiter=delimiter) if (row.get(column) or '').strip()]
+        print(f"Loaded {len(texts)} texts from {filename} (weight {weight:g})")
+        mix.append((texts, weight))
+    return mix
+
+
+def parse_mix(value):
+    weights = {}
+    for part in value.split(','):
+        name, _, weight = part.partition('=')
+        if name not in DATASETS:
+            raise argparse.ArgumentTypeError(f"Unknown dataset '{name}', choose from {list(DATASETS)}")
+        weights[name] = float(weight or 1)
+    return weights
+
+
+def parse_steps(value):
+    return [float(step) for step in value.split(',')] if value else []
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    rank = max(0, min(len(sorted_values) - 1, math.ceil(fraction * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+
+class LoadStep:
+    """One step: `concurrency` client threads, each sending its next request when the
+    previous one returns (paced to rate / concurrency requests per second if rate is set)"""
+
+    def __init__(self, url, path, mix, concurrency, rate=None, duration=30.0, warmup=5.0, timeout=30.0, seed=0):
+        parts = urlsplit(url)
+        self.host, self.port = parts.hostname, parts.port or 80
+        self.path = path
+        self.mix = mix
+        self.concurrency = int(concurrency)
+        self.rate = rate
+        self.duration = duration
+        self.warmup = warmup
+        self.timeout = timeout
+        self.seed = seed
+        self._samples = []
+        self._lock = threading.Lock()
+
+    def _client(self, index, measure_from, stop_at):
+        rng = random.Random(f"{self.seed}:{self.concurrency}:{self.rate}:{index}")
+        pools = [texts for texts, _ in self.mix]
+        weights = [weight for _, weight in self.mix]
+        interval = self.concurrency / self.rate if self.rate else 0.0
+        connection = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+        samples = []
+        next_send = time.perf_counter() + rng.random() * interval  # spread the clients over one interval
+
+        while True:
+            if interval:
+                delay = next_send - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                # A client that fell behind does not burst to catch up
+                next_send = max(next_send + interval, time.perf_counter())
+            started = time.perf_counter()
+            if started >= stop_at:
+                break
+            body = json.dumps({'text': rng.choice(rng.choices(pools, weights)[0])})
+            try:
+                connection.request('POST', self.path, body=body, headers={'Content-Type': 'application/json'})
+                response = connection.getresponse()
+                response.read()
+                status = response.status
+            except (OSError, http.client.HTTPException) as e:
+                status = type(e).__name__
+                connection.close()
+            if started >= measure_from:
+                samples.append((time.perf_counter() - started, status))
+        connection.close()
+        with self._lock:
+            self._samples.extend(samples)
+
+    def run(self):
+        now = time.perf_counter()
+        measure_from, stop_at = now + self.warmup, now + self.warmup + self.duration
+        threads = [threading.Thread(target=self._client, args=(i, measure_from, stop_at), daemon=True)
+                   for i in range(self.concurrency)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        # Requests started in the window may finish after it; count the time they took
+        elapsed = max(self.duration, time.perf_counter() - measure_from)
+        return self.summarize(elapsed)
+
+    def summarize(self, elapsed):
+        ok = sorted(latency for latency, status in self._samples if status == 200)
+        errors = {}
+        for _, status in self._samples:
+            if status != 200:
+                errors[str(status)] = errors.get(str(status), 0) + 1
+        total = len(self._samples)
+
+        def ms(value):
+            return round(value * 1000.0, 2) if value is not None else None
+
+        return {
+            'concurrency': self.concurrency,
+            'target_rate': self.rate,
+            'requests': total,
+            'throughput': round(len(ok) / elapsed, 2),
+            'error_rate': round((total - len(ok)) / total, 4) if total else 0.0,
+            'errors': errors,
+            'p50_ms': ms(percentile(ok, 0.50)),
+            'p95_ms': ms(percentile(ok, 0.95)),
+            'p99_ms': ms(percentile(ok, 0.99)),
+            'max_ms': ms(ok[-1] if ok else None)
+        }
+
+
+def find_saturation(steps, slo_ms, max_error_rate):
+    """First step breaching the SLO, first step that stopped scaling, and the best step within the SLO"""
+    breach = knee = best = None
+    for index, step in enumerate(steps):
+        within = (step['p99_ms'] is not None and step['p99_ms'] <= slo_ms and step['error_rate'] <= max_error_rate)
+        if within and breach is None:
+            best = index if best is None or step['throughput'] > steps[best]['throughput'] else best
+        elif breach is None:
+            breach = index
+        if knee is None and index > 0 and step['throughput'] < steps[index - 1]['throughput'] * (1 + MIN_SCALING_GAIN):
+            knee = index
+    return {
+        'slo_breached_at_step': breach,
+        'stopped_scaling_at_step': knee,
+        'max_throughput_within_slo': steps[best]['throughput'] if best is not None else None,
+        'best_step_within_slo': best
+    }
+
+
+def wait_until_ready(url, timeout):
+    """Poll /health until the model is loaded; False on timeout"""
+    parts = urlsplit(url)
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            connection = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=5)
+            connection.request('GET', '/health')
+            ready = connection.getresponse().status == 200
+            connection.close()
+            if ready:
+                return True
+        except (OSError, http.client.HTTPException):
+            pass
+        time.sleep(1.0)
+    return False
+
+
+def fetch_cache_stats(url, timeout=5):
+    """GET /cache/stats (from whichever worker answers under serve.py); None if unavailable"""
+    parts = urlsplit(url)
+    try:
+        connection = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=timeout)
+        connection.request('GET', '/cache/stats')
+        response = connection.getresponse()
+        body = response.read()
+        connection.close()
+        return json.loads(body) if response.status == 200 else None
+    except (OSError, http.client.HTTPException, ValueError):
+        return None
+
+
+def cache_delta(before, after):
+    """Result cache hits, misses and hit rate between two /cache/stats snapshots"""
+    if before is None or after is None:
+        return None
+    hits, misses = after['hits'] - before['hits'], after['misses'] - before['misses']
+    if hits < 0 or misses < 0:
+        return None  # Answered by different workers (or the cache was reset)
+    return {
+        'enabled': after['enabled'],
+        'max_entries': after['max_entries'],
+        'hits': hits,
+        'misses': misses,
+        'hit_rate': round(hits / (hits + misses), 4) if hits + misses else 0.0
+    }
+
+
+def start_server(command):
+    """Start the backend in the background (its output goes to load_test_server.log)
+
+    The /analyze result cache is off unless ANALYSIS_CACHE_SIZE is set.
+    """
+    log = open('load_test_server.log', 'w')
+    env = dict(os.environ)
+    env.setdefault('ANALYSIS_CACHE_SIZE', '0')
+    print(f"Starting ML backend: {command} (ANALYSIS_CACHE_SIZE={env['ANALYSIS_CACHE_SIZE']})")
+    return subprocess.Popen(shlex.split(command), stdout=log, stderr=subprocess.STDOUT, env=env,
+                            cwd=os.path.dirname(os.path.abspath(__file__)))
+
+
+def print_step(index, step):
+    rate = f"{step['target_rate']:g}/s" if step['target_rate'] else 'closed'
+    p99 = f"{step['p99_ms']:.1f}" if step['p99_ms'] is not None else '-'
+    p50 = f"{step['p50_ms']:.1f}" if step['p50_ms'] is not None else '-'
+    p95 = f"{step['p95_ms']:.1f}" if step['p95_ms'] is not None else '-'
+    max_ms = f"{step['max_ms']:.1f}" if step['max_ms'] is not None else '-'
+    cache_hits = f"{step['cache']['hit_rate']:.1%}" if step['cache'] is not None else '-'
+    print(f"{index:>4}{step['concurrency']:>6}{rate:>10}{step['throughput']:>10.2f}{p50:>10}{p95:>10}{p99:>10}"
+          f"{max_ms:>10}{step['error_rate']:>9.2%}{cache_hits:>11}")
+
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description='Concurrency/rate sweep against a local ML backend')
+    parser.add_argument('--url', default='http://127.0.0.1:5003', help='ML backend base URL')
+    parser.add_argument('--path', default='/analyze', help='Endpoint receiving {"text": ...}')
+    parser.add_argument('--concurrency', default='1,2,4,8,16',
+                        help='Comma-separated client counts (one step each, or the fixed count with --rates)')
+    parser.add_argument('--rates', help='Comma-separated total request rates per second (one step each)')
+    parser.add_argument('--step-duration', type=float, default=30.0, help='Measured seconds per step')
+    parser.add_argument('--warmup', type=float, default=5.0, help='Unmeasured seconds at the start of each step')
+    parser.add_argument('--timeout', type=float, default=30.0, help='Request timeout (counted as an error)')
+    parser.add_argument('--mix', type=parse_mix, default=parse_mix('SOLD_test=1,test=1,only_hate=1'),
+                        help='Dataset weights, e.g. SOLD_test=2,test=1,only_hate=0.5')
+    parser.add_argument('--datasets-dir', default=DEFAULT_DATASETS_DIR, help='Directory with the DataSets files')
+    parser.add_argument('--seed', type=int, default=42, help='Text selection seed')
+    parser.add_argument('--slo-ms', type=float, default=1000.0, help='p99 latency objective in milliseconds')
+    parser.add_argument('--max-error-rate', type=float, default=0.01, help='Error rate tolerated within the SLO')
+    parser.add_argument('--full-sweep', action='store_true', help='Keep going after the SLO is breached')
+    parser.add_argument('--start', action='store_true', help='Start the backend with --server-cmd and stop it afterwards')
+    parser.add_argument('--server-cmd', default=f"{sys.executable} app.py",
+                        help='Command run from ml_backend/ by --start (e.g. "python serve.py --workers 4")')
+    parser.add_argument('--ready-timeout', type=float, default=300.0, help='Seconds to wait for /health')
+    parser.add_argument('--output', help='Write the steps and saturation summary as JSON')
+    args = parser.parse_args()
+
+    concurrency_steps = [int(step) for step in parse_steps(args.concurrency)]
+    rate_steps = parse_steps(args.rates)
+    if rate_steps:
+        schedule = [(concurrency_steps[0], rate) for rate in rate_steps]
+    else:
+        schedule = [(concurrency, None) for concurrency in concurrency_steps]
+
+    mix = load_mix(args.datasets_dir, args.mix)
+    if not mix:
+        print("❌ The text mix is empty")
+        sys.exit(1)
+
+    server = start_server(args.server_cmd) if args.start else None
+    try:
+        if not wait_until_ready(args.url, args.ready_timeout):
+            print(f"❌ {args.url}/health did not report ready within {args.ready_timeout:g}s")
+            sys.exit(1)
+
+        server_cache = fetch_cache_stats(args.url)
+        print("=" * 60)
+        print(f"Load test: POST {args.url}{args.path}, p99 SLO {args.slo_ms:g} ms")
+        print("=" * 60)
+        if server_cache is not None and server_cache['enabled']:
+            print(f"⚠️  The server's result cache is on ({server_cache['max_entries']} entries); repeated texts "
+                  f"are answered from it (see the cache hit column)")
+        print(f"{'step':>4}{'conc':>6}{'rate':>10}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}"
+              f"{'max ms':>10}{'errors':>9}{'cache hit':>11}")
+        steps = []
+        for concurrency, rate in schedule:
+            before = fetch_cache_stats(args.url)
+            step = LoadStep(args.url, args.path, mix, concurrency, rate, args.step_duration, args.warmup,
+                            args.timeout, args.seed).run()
+            # Warmup requests included; under serve.py only one worker's cache is sampled
+            step['cache'] = cache_delta(before, fetch_cache_stats(args.url))
+            steps.append(step)
+            print_step(len(steps) - 1, step)
+            breached = step['p99_ms'] is None or step['p99_ms'] > args.slo_ms or step['error_rate'] > args.max_error_rate
+            if breached and not args.full_sweep:
+                break
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=30)
+
+    saturation = find_saturation(steps, args.slo_ms, args.max_error_rate)
+    if saturation['best_step_within_slo'] is not None:
+        print(f"✅ Max throughput within the SLO: {saturation['max_throughput_within_slo']:.2f} req/s "
+              f"(step {saturation['best_step_within_slo']})")
+    else:
+        print("❌ No step met the SLO")
+    if saturation['slo_breached_at_step'] is not None:
+        print(f"p99 SLO or error budget exceeded at step {saturation['slo_breached_at_step']}")
+    if saturation['stopped_scaling_at_step'] is not None:
+        print(f"Throughput stopped scaling at step {saturation['stopped_scaling_at_step']}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({
+                'created': datetime.now().isoformat(),
+                'url': args.url + args.path,
+                'settings': dict({key: getattr(args, key) for key in ('step_duration', 'warmup', 'timeout', 'mix', 'seed',
+                                                                      'slo_ms', 'max_error_rate')},
+                                 server_cmd=args.server_cmd if args.start else None,
+                                 server_cache={key: server_cache[key] for key in ('enabled', 'max_entries')}
+                                 if server_cache is not None else None),
+                'steps': steps,
+                'saturation': saturation
+            }, f, indent=2)
+        print(f"✅ Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,220 @@
+"""
+In-process metrics for the ML backend
+Counters, latency histograms and gauges kept in memory and rendered in the
+Prometheus text exposition format (version 0.0.4). Recording a value is a
+lock, a bisect and two additions, cheap enough for every pipeline stage.
+"""
+
+import bisect
+import os
+import resource
+import threading
+import time
+
+# Seconds; spans sub-millisecond regex passes up to multi-second model calls
+DEFAULT_LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025,
+                           0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _format_labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ''
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in pairs)
+    return '{' + ','.join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + '}'
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    if value != value:
+        return 'NaN'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, documentation, labels=(), callback=None):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(labels)
+        # Returns the value (or {labels: value}) at render time, replacing recorded values
+        self.callback = callback
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def _key(self, labels):
+        if len(labels) != len(self.label_names):
+            raise ValueError(f"{self.name} takes labels {self.label_names}")
+        return tuple(labels)
+
+    def render(self):
+        if self.callback is not None:
+            value = self.callback()
+            with self._lock:
+                self._values = value if isinstance(value, dict) else {(): value}
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for labels, value in items:
+            lines.extend(self._render_series(labels, value))
+        return lines
+
+    def _render_series(self, labels, value):
+        return [f"{self.name}{_format_labels(self.label_names, labels)} {_format_value(value)}"]
+
+
+class Counter(_Metric):
+    """Monotonically increasing count per label set, incremented or read from a callback at render time"""
+
+    kind = 'counter'
+
+    def inc(self, *labels, amount=1):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    """Current value per label set, set directly or read from a callback at render time"""
+
+    kind = 'gauge'
+
+    def set(self, value, *labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(_Metric):
+    """Bucketed distribution (cumulative buckets, sum and count) per label set"""
+
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labels=(), buckets=DEFAULT_LATENCY_BUCKETS):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(sorted(buckets))
+        # Object with enter(labels) / exit(labels, seconds), told about every
+        # timed block while set (see request_profiler.py); None costs one check
+        self.trace_hook = None
+
+    def observe(self, value, *labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._values.get(key)
+            if series is None:
+                series = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def time(self, *labels):
+        """Context manager observing the seconds spent in its block"""
+        return _Timer(self, labels)
+
+    def _render_series(self, labels, value):
+        counts, total, count = value
+        lines = []
+        cumulative = 0
+        for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+            cumulative += bucket_count
+            le = _format_labels(self.label_names, labels, [('le', _format_value(float(bound)))])
+            lines.append(f"{self.name}_bucket{le} {cumulative}")
+        label_text = _format_labels(self.label_names, labels)
+        lines.append(f"{self.name}_sum{label_text} {_format_value(total)}")
+        lines.append(f"{self.name}_count{label_text} {count}")
+        return lines
+
+    def render(self):
+        # Copy the series under the lock, so a scrape never sees a half-updated one
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            items = sorted((labels, (list(counts), total, count)) for labels, (counts, total, count) in self._values.items())
+        for labels, value in items:
+            lines.extend(self._render_series(labels, value))
+        return lines
+
+
+class _Timer:
+    __slots__ = ('histogram', 'labels', 'started')
+
+    def __init__(self, histogram, labels):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        hook = self.histogram.trace_hook
+        if hook is not None:
+            hook.enter(self.labels)
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        seconds = time.perf_counter() - self.started
+        self.histogram.observe(seconds, *self.labels)
+        hook = self.histogram.trace_hook
+        if hook is not None:
+            hook.exit(self.labels, seconds)
+        return False
+
+
+class MetricsRegistry:
+    """Named metrics rendered together by /metrics"""
+
+    def __init__(self):
+        self._metrics = []
+
+    def _register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name, documentation, labels=(), callback=None):
+        return self._register(Counter(name, documentation, labels, callback))
+
+    def gauge(self, name, documentation, labels=(), callback=None):
+        return self._register(Gauge(name, documentation, labels, callback))
+
+    def histogram(self, name, documentation, labels=(), buckets=DEFAULT_LATENCY_BUCKETS):
+        return self._register(Histogram(name, documentation, labels, buckets))
+
+    def render(self):
+        lines = []
+        for metric in self._metrics:
+            try:
+                lines.extend(metric.render())
+            except Exception as e:
+                lines.append(f"# {metric.name} unavailable: {e}")
+        return '\n'.join(lines) + '\n'
+
+
+def _resident_memory_bytes():
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError):
+        # Peak instead of current RSS where /proc is unavailable (KiB on Linux, bytes on macOS)
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def _open_fds():
+    try:
+        return len(os.listdir('/proc/self/fd'))
+    except OSError:
+        return float('nan')
+
+
+def add_process_gauges(registry):
+    """Standard process_* metrics of the current process (each prefork worker reports its own)"""
+    started = [time.time()]
+    os.register_at_fork(after_in_child=lambda: started.__setitem__(0, time.time()))
+    registry.counter('process_cpu_seconds_total', 'User and system CPU time of this process',
+                   callback=lambda: sum(os.times()[:2]))
+    registry.gauge('process_resident_memory_bytes', 'Resident memory of this process',
+                   callback=_resident_memory_bytes)
+    registry.gauge('process_open_fds', 'Open file descriptors', callback=_open_fds)
+    registry.gauge('process_threads', 'Live Python threads', callback=threading.active_count)
+    registry.gauge('process_start_time_seconds', 'Start time of this process (Unix time)', callback=lambda: started[0])
+    registry.gauge('process_info', 'Process id of the worker that served this scrape', labels=('pid',),
+                   callback=lambda: {(str(os.getpid()),): 1})
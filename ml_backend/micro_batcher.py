@@ -0,0 +1,160 @@
+"""
+Dynamic micro-batching for model inference
+Concurrent request threads queue their padded rows; a single scheduler
+thread runs them through the model as one batch once enough rows are
+waiting or the oldest one has waited max_wait_ms
+"""
+
+import os
+import queue
+import threading
+import time
+from collections import Counter
+from concurrent.futures import Future
+
+import numpy as np
+
+
+class MicroBatcher:
+    """Coalesces concurrent predict() calls into batched model calls
+
+    predict_fn receives the concatenated rows and must return one output row
+    per input row. Rows padded to different widths are queued together but
+    run as one model call per width. max_wait_ms <= 0 disables batching
+    (direct calls).
+    """
+
+    def __init__(self, predict_fn, max_batch_size=64, max_wait_ms=5.0):
+        self.predict_fn = predict_fn
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0.0, float(max_wait_ms)) / 1000.0
+        self._stats_lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._batch_sizes = Counter()
+        self._requests = 0
+        self._queue_wait = 0.0
+        self._pid = None
+        self._queue = None
+
+    @property
+    def enabled(self):
+        return self.max_wait > 0
+
+    def _ensure_started(self):
+        """Start the scheduler thread (again after a fork, which drops threads)"""
+        if self._pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._pid == os.getpid():
+                return
+            self._queue = queue.Queue()
+            thread = threading.Thread(target=self._run, args=(self._queue,), name='micro-batcher', daemon=True)
+            thread.start()
+            self._pid = os.getpid()
+
+    def predict(self, x):
+        """Predict rows of x, batched together with other concurrent callers"""
+        x = np.asarray(x)
+        if not self.enabled or len(x) == 0:
+            outputs = self.predict_fn(x)
+            if len(x):
+                self._record([len(x)], [0.0])
+            return outputs
+
+        return self._submit(x).result()
+
+    def predict_many(self, arrays):
+        """predict() for several arrays (e.g. one per padded width), queued together"""
+        arrays = [np.asarray(x) for x in arrays]
+        if not self.enabled:
+            return [self.predict(x) for x in arrays]
+        futures = [self._submit(x) if len(x) else None for x in arrays]
+        return [future.result() if future is not None else self.predict_fn(x) for x, future in zip(arrays, futures)]
+
+    def close(self):
+        """Stop the scheduler thread after it has flushed what is already queued"""
+        with self._start_lock:
+            if self._queue is not None and self._pid == os.getpid():
+                self._queue.put(None)
+            self._queue = None
+            self._pid = None
+
+    def _submit(self, x):
+        self._ensure_started()
+        future = Future()
+        self._queue.put((x, future, time.perf_counter()))
+        return future
+
+    def _run(self, pending_queue):
+        while True:
+            item = pending_queue.get()
+            if item is None:
+                return
+            pending = [item]
+            rows = len(item[0])
+            deadline = time.perf_counter() + self.max_wait
+            closed = False
+
+            while rows < self.max_batch_size:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    item = pending_queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is None:
+                    closed = True
+                    break
+                pending.append(item)
+                rows += len(item[0])
+
+            self._flush(pending)
+            if closed:
+                return
+
+    def _flush(self, pending):
+        by_width = {}
+        for item in pending:
+            by_width.setdefault(item[0].shape[1:], []).append(item)
+        for group in by_width.values():
+            self._flush_group(group)
+
+    def _flush_group(self, pending):
+        started = time.perf_counter()
+        try:
+            outputs = self.predict_fn(np.concatenate([x for x, _, _ in pending]))
+        except Exception as e:
+            for _, future, _ in pending:
+                future.set_exception(e)
+            return
+
+        self._record([len(x) for x, _, _ in pending], [started - queued for _, _, queued in pending])
+
+        offset = 0
+        for x, future, _ in pending:
+            future.set_result(outputs[offset:offset + len(x)])
+            offset += len(x)
+
+    def _record(self, request_rows, queue_waits):
+        with self._stats_lock:
+            self._batch_sizes[sum(request_rows)] += 1
+            self._requests += len(request_rows)
+            self._queue_wait += sum(queue_waits)
+
+    def stats(self):
+        """Batch-size distribution and queueing counters"""
+        with self._stats_lock:
+            batches = sum(self._batch_sizes.values())
+            rows = sum(size * count for size, count in self._batch_sizes.items())
+            return {
+                'enabled': self.enabled,
+                'max_batch_size': self.max_batch_size,
+                'max_wait_ms': self.max_wait * 1000.0,
+                'batches': batches,
+                'requests': self._requests,
+                'rows': rows,
+                'mean_batch_size': rows / batches if batches else 0.0,
+                'mean_queue_wait_ms': self._queue_wait / self._requests * 1000.0 if self._requests else 0.0,
+                'batch_size_histogram': {str(size): count for size, count in sorted(self._batch_sizes.items())}
+            }
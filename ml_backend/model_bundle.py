@@ -0,0 +1,193 @@
+"""
+Versioned model artifact bundle
+One file holding everything the server needs: the LSTM weights, the
+vocabulary, the hate word lexicon, the preprocessing tables and the training
+metadata. Every array is stored raw and 64-byte aligned after a JSON header,
+so the bundle is memory-mapped and arrays are read in place; the header
+records a SHA-256 checksum of every array and section.
+
+Layout: magic (8 bytes) | format version (uint32) | reserved (uint32) |
+header length (uint64) | header JSON | padding | aligned array data
+"""
+
+import hashlib
+import json
+import os
+import struct
+from datetime import datetime
+
+import numpy as np
+
+from numpy_lstm import NumpyLSTMModel
+from vocab_tokenizer import VocabTokenizer
+
+BUNDLE_MAGIC = b'SLSTMBDL'
+BUNDLE_FORMAT_VERSION = 1
+ALIGNMENT = 64
+_PREAMBLE = struct.Struct('<8sIIQ')
+
+
+def _aligned(offset):
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+def _section_bytes(value):
+    return json.dumps(value, sort_keys=True, ensure_ascii=False).encode('utf-8')
+
+
+def write_bundle(path, arrays, sections, metadata, version=None):
+    """Write arrays ({name: ndarray}) and JSON sections ({name: value}) to one bundle file
+
+    The version defaults to the creation time plus the start of the content
+    checksum, so rebuilding identical artifacts gives the same checksum.
+    Returns the header.
+    """
+    arrays = {name: np.ascontiguousarray(array) for name, array in arrays.items()}
+    entries = {}
+    offset = 0
+    for name, array in arrays.items():
+        entries[name] = {
+            'dtype': array.dtype.str,
+            'shape': list(array.shape),
+            'offset': offset,
+            'nbytes': array.nbytes,
+            'sha256': hashlib.sha256(array.data).hexdigest()
+        }
+        offset = _aligned(offset + array.nbytes)
+
+    checksums = {f"array:{name}": entry['sha256'] for name, entry in entries.items()}
+    checksums.update({f"section:{name}": hashlib.sha256(_section_bytes(value)).hexdigest()
+                      for name, value in sections.items()})
+    content_sha256 = hashlib.sha256(_section_bytes(checksums)).hexdigest()
+
+    created = datetime.now()
+    header = {
+        'version': version or f"{created.strftime('%Y%m%dT%H%M%S')}-{content_sha256[:12]}",
+        'created': created.isoformat(),
+        'content_sha256': content_sha256,
+        'metadata': metadata,
+        'arrays': entries,
+        'sections': sections,
+        'section_sha256': {name: checksums[f"section:{name}"] for name in sections}
+    }
+    header_bytes = json.dumps(header, ensure_ascii=False).encode('utf-8')
+    data_start = _aligned(_PREAMBLE.size + len(header_bytes))
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(_PREAMBLE.pack(BUNDLE_MAGIC, BUNDLE_FORMAT_VERSION, 0, len(header_bytes)))
+        f.write(header_bytes)
+        for name, array in arrays.items():
+            f.seek(data_start + entries[name]['offset'])
+            f.write(array.data)
+        f.truncate(data_start + offset)
+    os.replace(tmp_path, path)
+    return header
+
+
+def build_bundle(path, weights, vocab, preprocessor, metadata, version=None):
+    """Bundle (config, arrays) pairs from keras_weight_arrays / keras_tokenizer_arrays with a preprocessor"""
+    weights_config, weight_arrays = weights
+    vocab_config, vocab_arrays = vocab
+    arrays = {f"weights/{name}": array for name, array in weight_arrays.items()}
+    arrays.update({f"vocab/{name}": array for name, array in vocab_arrays.items()})
+    sections = {
+        'weights': weights_config,
+        'vocab': vocab_config,
+        'lexicon': {
+            'hate_words': list(preprocessor.hate_words),
+            'safe_words': list(preprocessor.safe_words)
+        },
+        'preprocessing': {
+            'char_mapping': preprocessor.char_mapping,
+            'obfuscation_substitutions': preprocessor.OBFUSCATION_SUBSTITUTIONS,
+            'sinhala_variations': preprocessor.SINHALA_VARIATIONS,
+            'fuzzy_threshold': preprocessor.fuzzy_threshold
+        }
+    }
+    return write_bundle(path, arrays, sections, metadata, version=version)
+
+
+class ModelBundle:
+    """Read-only, memory-mapped view of a bundle written by write_bundle"""
+
+    def __init__(self, path, verify=True):
+        self.path = path
+        with open(path, 'rb') as f:
+            magic, format_version, _, header_length = _PREAMBLE.unpack(f.read(_PREAMBLE.size))
+            if magic != BUNDLE_MAGIC:
+                raise ValueError(f"{path} is not a model bundle")
+            if format_version != BUNDLE_FORMAT_VERSION:
+                raise ValueError(f"Unsupported bundle format: {format_version}")
+            self.header = json.loads(f.read(header_length).decode('utf-8'))
+
+        self.version = self.header['version']
+        self.metadata = self.header['metadata']
+        self.sections = self.header['sections']
+        self._data_start = _aligned(_PREAMBLE.size + header_length)
+        self._buffer = np.memmap(path, dtype=np.uint8, mode='r')
+        if verify:
+            self.verify()
+
+    def array(self, name):
+        """Array stored under name, backed by the memory map (no copy)"""
+        entry = self.header['arrays'][name]
+        start = self._data_start + entry['offset']
+        return self._buffer[start:start + entry['nbytes']].view(np.dtype(entry['dtype'])).reshape(entry['shape'])
+
+    def arrays(self, prefix):
+        """{name without prefix: array} for every array under prefix/"""
+        prefix = f"{prefix}/"
+        return {name[len(prefix):]: self.array(name) for name in self.header['arrays'] if name.startswith(prefix)}
+
+    def verify(self):
+        """Check every array and section against its recorded checksum"""
+        for name, entry in self.header['arrays'].items():
+            if hashlib.sha256(self.array(name).data).hexdigest() != entry['sha256']:
+                raise ValueError(f"Checksum mismatch for array '{name}' in {self.path}")
+        for name, value in self.sections.items():
+            if hashlib.sha256(_section_bytes(value)).hexdigest() != self.header['section_sha256'][name]:
+                raise ValueError(f"Checksum mismatch for section '{name}' in {self.path}")
+
+    def numpy_model(self):
+        return NumpyLSTMModel.from_arrays(self.sections['weights'], self.arrays('weights'))
+
+    def keras_model(self):
+        """Keras model rebuilt from the bundled layer configs and weights"""
+        from tensorflow.keras.models import Sequential
+        from tensorflow.keras.layers import Embedding, LSTM, Dense, Bidirectional
+
+        arrays = self.arrays('weights')
+        model = Sequential()
+        weights = []
+        for i, layer in enumerate(self.sections['weights']['layers']):
+            prefix = f"layer{i}/"
+            if layer['type'] == 'embedding':
+                vocab_size, dim = arrays[f"{prefix}embeddings"].shape
+                model.add(Embedding(vocab_size, dim, mask_zero=layer.get('mask_zero', False)))
+                weights.append(arrays[f"{prefix}embeddings"])
+            elif layer['type'] == 'lstm':
+                lstm = LSTM(layer['units'], return_sequences=layer['return_sequences'],
+                            activation=layer['activation'], recurrent_activation=layer['recurrent_activation'])
+                model.add(Bidirectional(lstm) if layer['bidirectional'] else lstm)
+                for direction in (['forward', 'backward'] if layer['bidirectional'] else ['forward']):
+                    weights.extend(arrays[f"{prefix}{direction}/{name}"] for name in ('kernel', 'recurrent_kernel', 'bias'))
+            elif layer['type'] == 'dense':
+                model.add(Dense(arrays[f"{prefix}kernel"].shape[1], activation=layer['activation']))
+                weights.extend([arrays[f"{prefix}kernel"], arrays[f"{prefix}bias"]])
+        model.build((None, None))
+        model.set_weights([np.asarray(weight) for weight in weights])
+        return model
+
+    def tokenizer(self):
+        return VocabTokenizer.from_arrays(self.sections['vocab'], self.arrays('vocab'))
+
+    def info(self):
+        """Summary for /models/status"""
+        return {
+            'path': self.path,
+            'version': self.version,
+            'created': self.header['created'],
+            'content_sha256': self.header['content_sha256'],
+            'metadata': self.metadata
+        }
@@ -0,0 +1,152 @@
+"""
+Model generations for zero-downtime reloads
+Every load of the model, tokenizer and preprocessor is one generation.
+Requests pin the generation that is current when they start, a reload swaps
+in a fully built new one atomically, and a replaced generation is released
+as soon as the last request holding it has finished.
+"""
+
+import os
+import threading
+import time
+
+
+class ModelGeneration:
+    """One consistent set of model, tokenizer, preprocessor and their settings"""
+
+    def __init__(self, number, model=None, tokenizer=None, preprocessor=None, model_version=None,
+                 bundle=None, max_words=None, max_len=None, length_buckets=None, batcher=None):
+        self.number = number
+        self.model = model
+        self.tokenizer = tokenizer
+        self.preprocessor = preprocessor
+        self.model_version = model_version
+        self.bundle = bundle
+        self.max_words = max_words
+        self.max_len = max_len
+        self.length_buckets = length_buckets
+        self.batcher = batcher
+        self.loaded_at = time.time()
+        self.active = 0  # requests currently holding this generation
+        self.retired = False
+
+    def close(self):
+        """Drop the references to the loaded artifacts so they can be freed"""
+        if self.batcher is not None:
+            self.batcher.close()
+        self.model = self.tokenizer = self.preprocessor = self.bundle = None
+
+    def info(self):
+        return {
+            'generation': self.number,
+            'model_version': self.model_version,
+            'bundle_version': self.bundle.version if self.bundle is not None else None,
+            'loaded_at': self.loaded_at,
+            'active_requests': self.active
+        }
+
+
+class GenerationManager:
+    """Reference-counted current generation with atomic swaps"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._next_number = 1
+        self.current = None
+        self.retired = []  # replaced generations still held by requests
+        self.released = 0
+
+    def next_number(self):
+        with self._lock:
+            number = self._next_number
+            self._next_number += 1
+            return number
+
+    def acquire(self):
+        """Pin the current generation (None before the first load)"""
+        with self._lock:
+            generation = self.current
+            if generation is not None:
+                generation.active += 1
+            return generation
+
+    def release(self, generation):
+        with self._lock:
+            generation.active -= 1
+            free = generation.retired and generation.active == 0
+            if free:
+                self.retired.remove(generation)
+        if free:
+            self._free(generation)
+
+    def install(self, generation):
+        """Make generation current; the previous one is released once unused"""
+        with self._lock:
+            previous, self.current = self.current, generation
+            free = False
+            if previous is not None:
+                previous.retired = True
+                free = previous.active == 0
+                if not free:
+                    self.retired.append(previous)
+        if free:
+            self._free(previous)
+        return previous
+
+    def _free(self, generation):
+        generation.close()
+        self.released += 1
+        print(f"Released model generation {generation.number}")
+
+    def stats(self):
+        with self._lock:
+            return {
+                'current': self.current.info() if self.current is not None else None,
+                'draining': [generation.info() for generation in self.retired],
+                'released': self.released
+            }
+
+
+class ArtifactWatcher:
+    """Polls artifact files and calls on_change when any of them changes"""
+
+    def __init__(self, paths_fn, on_change, interval=5.0):
+        self.paths_fn = paths_fn
+        self.on_change = on_change
+        self.interval = interval
+        self.signature = None
+
+    def snapshot(self):
+        """(path, mtime, size) of every artifact that exists"""
+        signature = []
+        for path in self.paths_fn():
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            signature.append((path, stat.st_mtime_ns, stat.st_size))
+        return tuple(signature)
+
+    def mark_current(self):
+        """Accept the artifacts as they are now (e.g. after writing one ourselves)"""
+        self.signature = self.snapshot()
+
+    def start(self):
+        self.mark_current()
+        thread = threading.Thread(target=self._run, name='artifact-watcher', daemon=True)
+        thread.start()
+        return thread
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            signature = self.snapshot()
+            if signature == self.signature:
+                continue
+            changed = sorted({entry[0] for entry in set(signature) ^ set(self.signature)})
+            self.signature = signature
+            print(f"Artifacts changed: {changed}")
+            try:
+                self.on_change()
+            except Exception as e:
+                print(f"Error reloading after artifact change: {e}")
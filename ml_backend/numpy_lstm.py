@@ -0,0 +1,243 @@
+"""
+NumPy inference engine for the Singlish LSTM
+Runs the Embedding -> Bidirectional LSTM -> Dense stack built by
+SinglishLSTMTrainer.create_model from a plain .npz weight file, so the
+serving process does not need to import TensorFlow
+"""
+
+import json
+
+import numpy as np
+
+WEIGHTS_FORMAT_VERSION = 1
+
+
+def _sigmoid(x):
+    # tanh form is overflow-free for large negative inputs
+    return 0.5 * (1.0 + np.tanh(0.5 * x))
+
+
+def _hard_sigmoid(x):
+    return np.clip(0.2 * x + 0.5, 0.0, 1.0)
+
+
+ACTIVATIONS = {
+    'linear': lambda x: x,
+    'relu': lambda x: np.maximum(x, 0.0),
+    'sigmoid': _sigmoid,
+    'hard_sigmoid': _hard_sigmoid,
+    'tanh': np.tanh,
+}
+
+
+def _activation_name(activation):
+    """Activation name from a Keras layer config entry (string or serialized dict)"""
+    if isinstance(activation, dict):
+        activation = activation.get('config', {}).get('name') or activation.get('class_name')
+    name = str(activation).lower()
+    if name not in ACTIVATIONS:
+        raise ValueError(f"Unsupported activation: {activation}")
+    return name
+
+
+def pad_sequences(sequences, maxlen, padding='post', truncating='post', value=0):
+    """NumPy equivalent of keras pad_sequences for lists of token ids"""
+    padded = np.full((len(sequences), maxlen), value, dtype=np.int32)
+    for i, sequence in enumerate(sequences):
+        if not len(sequence):
+            continue
+        trunc = sequence[:maxlen] if truncating == 'post' else sequence[-maxlen:]
+        if padding == 'post':
+            padded[i, :len(trunc)] = trunc
+        else:
+            padded[i, maxlen - len(trunc):] = trunc
+    return padded
+
+
+def keras_weight_arrays(model):
+    """(config, arrays) holding the weights of a trained Keras model
+
+    Only reads model.layers and get_weights(), so this module still does not
+    import TensorFlow itself. Dropout layers are inference no-ops and skipped.
+    """
+    layers = []
+    arrays = {}
+
+    for layer in model.layers:
+        kind = type(layer).__name__
+        weights = layer.get_weights()
+        prefix = f"layer{len(layers)}"
+
+        if kind == 'Embedding':
+            arrays[f"{prefix}/embeddings"] = weights[0]
+            layers.append({'type': 'embedding', 'mask_zero': bool(layer.get_config().get('mask_zero', False))})
+
+        elif kind in ('Bidirectional', 'LSTM'):
+            wrapped = layer.forward_layer if kind == 'Bidirectional' else layer
+            config = wrapped.get_config()
+            if kind == 'Bidirectional' and layer.merge_mode != 'concat':
+                raise ValueError(f"Unsupported Bidirectional merge_mode: {layer.merge_mode}")
+            if not config.get('use_bias', True):
+                raise ValueError("LSTM(use_bias=False) is not supported")
+
+            directions = ['forward', 'backward'] if kind == 'Bidirectional' else ['forward']
+            for direction, offset in zip(directions, range(0, len(weights), 3)):
+                arrays[f"{prefix}/{direction}/kernel"] = weights[offset]
+                arrays[f"{prefix}/{direction}/recurrent_kernel"] = weights[offset + 1]
+                arrays[f"{prefix}/{direction}/bias"] = weights[offset + 2]
+
+            layers.append({
+                'type': 'lstm',
+                'bidirectional': kind == 'Bidirectional',
+                'units': int(config['units']),
+                'return_sequences': bool(config.get('return_sequences', False)),
+                'activation': _activation_name(config.get('activation', 'tanh')),
+                'recurrent_activation': _activation_name(config.get('recurrent_activation', 'sigmoid'))
+            })
+
+        elif kind == 'Dense':
+            arrays[f"{prefix}/kernel"] = weights[0]
+            arrays[f"{prefix}/bias"] = weights[1] if len(weights) > 1 else np.zeros(weights[0].shape[1], dtype=weights[0].dtype)
+            layers.append({'type': 'dense', 'activation': _activation_name(layer.get_config().get('activation', 'linear'))})
+
+        elif kind in ('Dropout', 'InputLayer'):
+            continue
+
+        else:
+            raise ValueError(f"Unsupported layer for NumPy export: {kind}")
+
+    config = {'format_version': WEIGHTS_FORMAT_VERSION, 'layers': layers}
+    return config, arrays
+
+
+def export_keras_weights(model, path):
+    """Write the weights of a trained Keras model to an .npz file"""
+    config, arrays = keras_weight_arrays(model)
+    np.savez(path, __config__=np.array(json.dumps(config)), **arrays)
+    return config
+
+
+class NumpyLSTMModel:
+    """Keras-like predict() over weights written by export_keras_weights
+
+    Input projections are computed for all timesteps (and both directions)
+    with one matmul per layer; only the recurrent h @ U product runs per step.
+    Models trained with Embedding(mask_zero=True) skip padding like Keras does,
+    so their predictions do not depend on how far the input is padded.
+    """
+
+    def __init__(self, weights_path, dtype=np.float32):
+        with np.load(weights_path, allow_pickle=False) as data:
+            config = json.loads(str(data['__config__']))
+            arrays = {key: data[key] for key in data.files if key != '__config__'}
+        self._load(config, arrays, dtype)
+        self.weights_path = weights_path
+
+    @classmethod
+    def from_arrays(cls, config, arrays, dtype=np.float32):
+        """Model over in-memory (or memory-mapped) arrays from keras_weight_arrays
+
+        Arrays already in dtype are used as they are, not copied.
+        """
+        model = cls.__new__(cls)
+        model._load(config, arrays, dtype)
+        model.weights_path = None
+        return model
+
+    def _load(self, config, arrays, dtype):
+        if config.get('format_version') != WEIGHTS_FORMAT_VERSION:
+            raise ValueError(f"Unsupported weights format: {config.get('format_version')}")
+        self.dtype = dtype
+        self.layers = []
+        for i, layer in enumerate(config['layers']):
+            prefix = f"layer{i}/"
+            params = {key[len(prefix):]: arrays[key].astype(dtype, copy=False) for key in arrays if key.startswith(prefix)}
+            self.layers.append((layer, params))
+
+        self.padding_invariant = any(
+            layer['type'] == 'embedding' and layer.get('mask_zero') for layer, _ in self.layers
+        )
+        self._prepare_lstm_layers()
+
+    def _prepare_lstm_layers(self):
+        """Stack forward/backward input kernels so one matmul projects both directions"""
+        for layer, params in self.layers:
+            if layer['type'] != 'lstm':
+                continue
+            directions = ['forward', 'backward'] if layer['bidirectional'] else ['forward']
+            params['input_kernel'] = np.concatenate([params[f"{d}/kernel"] for d in directions], axis=1)
+            params['input_bias'] = np.concatenate([params[f"{d}/bias"] for d in directions])
+
+    def _run_lstm(self, x, layer, params, mask=None):
+        batch, steps, _ = x.shape
+        units = layer['units']
+        activation = ACTIVATIONS[layer['activation']]
+        recurrent_activation = ACTIVATIONS[layer['recurrent_activation']]
+        directions = ['forward', 'backward'] if layer['bidirectional'] else ['forward']
+
+        # (batch, steps, directions * 4 * units) for every timestep at once
+        projected = x @ params['input_kernel'] + params['input_bias']
+
+        outputs = []
+        for d, direction in enumerate(directions):
+            gates_x = projected[:, :, d * 4 * units:(d + 1) * 4 * units]
+            recurrent_kernel = params[f"{direction}/recurrent_kernel"]
+            h = np.zeros((batch, units), dtype=self.dtype)
+            c = np.zeros((batch, units), dtype=self.dtype)
+            order = range(steps) if direction == 'forward' else range(steps - 1, -1, -1)
+            sequence = np.empty((batch, steps, units), dtype=self.dtype) if layer['return_sequences'] else None
+
+            for t in order:
+                z = gates_x[:, t] + h @ recurrent_kernel
+                # Keras gate order: input, forget, cell, output
+                i = recurrent_activation(z[:, :units])
+                f = recurrent_activation(z[:, units:2 * units])
+                g = activation(z[:, 2 * units:3 * units])
+                o = recurrent_activation(z[:, 3 * units:])
+                c_next = f * c + i * g
+                h_next = o * activation(c_next)
+
+                if mask is None:
+                    h, c = h_next, c_next
+                    if sequence is not None:
+                        sequence[:, t] = h
+                else:
+                    # Masked steps keep the previous state (Bidirectional zeroes their outputs)
+                    keep = mask[:, t, None]
+                    h = np.where(keep, h_next, h)
+                    c = np.where(keep, c_next, c)
+                    if sequence is not None:
+                        sequence[:, t] = np.where(keep, h_next, 0.0) if layer['bidirectional'] else h
+
+            outputs.append(sequence if sequence is not None else h)
+
+        return np.concatenate(outputs, axis=-1)
+
+    def predict(self, x, verbose=0, batch_size=256):
+        """Run inference on a (batch, max_len) array of token ids"""
+        x = np.asarray(x)
+        results = []
+        for start in range(0, len(x), batch_size):
+            results.append(self._forward(x[start:start + batch_size]))
+        if not results:
+            return np.zeros((0, 1), dtype=self.dtype)
+        return np.concatenate(results, axis=0)
+
+    def _forward(self, x):
+        out = x.astype(np.int64)
+        mask = None
+        for layer, params in self.layers:
+            if layer['type'] == 'embedding':
+                if layer.get('mask_zero'):
+                    mask = out != 0
+                    # Trailing all-padding columns are no-ops under the mask
+                    steps = int(mask.any(axis=0).nonzero()[0].max()) + 1 if mask.any() else 1
+                    out, mask = out[:, :steps], mask[:, :steps]
+                out = params['embeddings'][out]
+            elif layer['type'] == 'lstm':
+                out = self._run_lstm(out, layer, params, mask)
+                if not layer['return_sequences']:
+                    mask = None
+            elif layer['type'] == 'dense':
+                out = ACTIVATIONS[layer['activation']](out @ params['kernel'] + params['bias'])
+        return out
@@ -0,0 +1,135 @@
+"""
+On-demand profiling of a single request
+Runs one request under cProfile and records the pipeline stages it passes
+through (the blocks timed by the stage latency histogram) as a tree. Only
+the profiled request's thread is traced; other requests see a hook that
+returns immediately, and when nothing is being profiled there is no hook.
+Work the request hands to another thread is invisible to cProfile, so the
+pipeline runs the model on the request thread while profiling and reports
+each call with count_call().
+"""
+
+import cProfile
+import os
+import pstats
+import threading
+import time
+
+# Functions whose call counts are reported by name
+COUNTED_FUNCTIONS = ('calculate_similarity', 'generate_word_variations')
+
+_local = threading.local()
+_hook_lock = threading.Lock()
+_profiling = threading.Lock()  # one profiled request at a time (one cProfile per interpreter on 3.12+)
+
+
+def count_call(name):
+    """Count one call of name in the profile of the calling thread, if any"""
+    profile = getattr(_local, 'profile', None)
+    if profile is not None:
+        profile.counts[name] = profile.counts.get(name, 0) + 1
+
+
+class _StageNode:
+    __slots__ = ('name', 'calls', 'seconds', 'children')
+
+    def __init__(self, name):
+        self.name = name
+        self.calls = 0
+        self.seconds = 0.0
+        self.children = {}
+
+    def to_dict(self):
+        node = {'stage': self.name, 'calls': self.calls, 'total_ms': round(self.seconds * 1000.0, 3)}
+        if self.children:
+            children = sorted(self.children.values(), key=lambda child: child.seconds, reverse=True)
+            node['children'] = [child.to_dict() for child in children]
+            node['self_ms'] = round((self.seconds - sum(child.seconds for child in children)) * 1000.0, 3)
+        return node
+
+
+class _StageHook:
+    """Histogram.trace_hook: forwards stage events to the profile of the calling thread"""
+
+    def enter(self, labels):
+        profile = getattr(_local, 'profile', None)
+        if profile is not None:
+            profile._enter_stage('/'.join(labels))
+
+    def exit(self, labels, seconds):
+        profile = getattr(_local, 'profile', None)
+        if profile is not None:
+            profile._exit_stage(seconds)
+
+
+class RequestProfiler:
+    """Context manager profiling the block it wraps on the current thread
+
+    stage_histogram is the Histogram whose timed blocks form the stage tree.
+    Raises RuntimeError on entry if another request is being profiled.
+    """
+
+    def __init__(self, stage_histogram, top_n=20):
+        self.stage_histogram = stage_histogram
+        self.top_n = max(1, int(top_n))
+        self.root = _StageNode('request')
+        self._stack = [self.root]
+        self.counts = {}  # count_call() totals
+        self._profiler = cProfile.Profile()
+
+    def _enter_stage(self, name):
+        parent = self._stack[-1]
+        node = parent.children.get(name)
+        if node is None:
+            node = parent.children[name] = _StageNode(name)
+        self._stack.append(node)
+
+    def _exit_stage(self, seconds):
+        if len(self._stack) > 1:
+            node = self._stack.pop()
+            node.calls += 1
+            node.seconds += seconds
+
+    def __enter__(self):
+        if not _profiling.acquire(blocking=False):
+            raise RuntimeError('Another request is being profiled')
+        with _hook_lock:
+            self.stage_histogram.trace_hook = _StageHook()
+        _local.profile = self
+        self._started = time.perf_counter()
+        self._profiler.enable()
+        return self
+
+    def __exit__(self, *exc):
+        self._profiler.disable()
+        self.root.seconds = time.perf_counter() - self._started
+        self.root.calls = 1
+        _local.profile = None
+        with _hook_lock:
+            self.stage_histogram.trace_hook = None
+        _profiling.release()
+        return False
+
+    def report(self):
+        """Stage tree, top functions by cumulative time and selected call counts"""
+        stats = pstats.Stats(self._profiler).stats
+        functions = []
+        call_counts = {name: 0 for name in COUNTED_FUNCTIONS}
+        for (filename, line, function), (_, calls, total, cumulative, _) in stats.items():
+            if function in call_counts:
+                call_counts[function] += calls
+            functions.append({
+                'function': f"{os.path.basename(filename)}:{line}({function})" if line else function,
+                'calls': calls,
+                'total_ms': round(total * 1000.0, 3),
+                'cumulative_ms': round(cumulative * 1000.0, 3)
+            })
+        functions.sort(key=lambda entry: entry['cumulative_ms'], reverse=True)
+        # Forward passes the request made (one per length bucket of each lstm_predict)
+        call_counts['model_predict'] = self.counts.get('model_predict', 0)
+        return {
+            'total_ms': round(self.root.seconds * 1000.0, 3),
+            'stages': self.root.to_dict(),
+            'top_functions': functions[:self.top_n],
+            'call_counts': call_counts
+        }
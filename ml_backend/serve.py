@@ -0,0 +1,376 @@
+#!/usr/bin/env python3
+"""
+Prefork production server for the ML backend
+Loads the model, tokenizer and lexicon index once in the master process and
+forks worker processes that share them copy-on-write. Workers are recycled
+gracefully after a number of requests, SIGHUP reloads the artifacts and then
+recycles every worker onto them, and workers report their health
+through a shared-memory table served at /health/workers.
+"""
+
+import argparse
+import ctypes
+import gc
+import os
+import random
+import signal
+import socket
+import sys
+import threading
+import time
+from multiprocessing.sharedctypes import RawArray
+
+from flask import jsonify
+from werkzeug.serving import make_server
+from werkzeug.wsgi import ClosingIterator
+
+# Add current directory to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import app as ml_app
+
+# TensorFlow's runtime hangs in a child forked after it has run ops, so the
+# Keras model is loaded by each worker instead of by the master
+FORK_SAFE_BACKENDS = ('numpy', 'tflite')
+
+WORKER_STATES = {0: 'stopped', 1: 'booting', 2: 'serving', 3: 'draining'}
+STOPPED, BOOTING, SERVING, DRAINING = 0, 1, 2, 3
+
+
+class WorkerSlot(ctypes.Structure):
+    """Per-worker health record in memory shared by the master and all workers"""
+    _fields_ = [
+        ('pid', ctypes.c_int),
+        ('state', ctypes.c_int),
+        ('generation', ctypes.c_int),
+        ('active', ctypes.c_int),
+        ('requests', ctypes.c_long),
+        ('started', ctypes.c_double),
+        ('heartbeat', ctypes.c_double),
+    ]
+
+
+class Worker:
+    """One forked worker: serves the shared listening socket until told to stop"""
+
+    def __init__(self, server_config, slot_index):
+        self.config = server_config
+        self.slot_index = slot_index
+        self.slot = server_config.slots[slot_index]
+        self.master_pid = server_config.pid  # Recorded at fork time; getppid() turns into 1 if the master dies
+        self.server = None
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+        jitter = server_config.max_requests_jitter
+        self.max_requests = server_config.max_requests + (random.randint(0, jitter) if jitter else 0)
+
+    def run(self):
+        signal.signal(signal.SIGTERM, lambda *_: self.stop())
+        signal.signal(signal.SIGHUP, lambda *_: self.stop())
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+        self.slot.state = BOOTING
+        ml_app.reload_delegate = self.request_reload
+        if not self.config.model_preloaded and not ml_app.load_inference_model():
+            raise RuntimeError('could not load the model')
+        ml_app.start_lexicon_watcher()  # Words learned by the other workers, without a recycle
+        self.server = make_server(
+            self.config.host, self.config.port, self.wsgi_app,
+            threaded=True, fd=self.config.listener.fileno()
+        )
+        threading.Thread(target=self._heartbeat, name='worker-heartbeat', daemon=True).start()
+        if self._stopping.is_set():
+            return
+
+        self.slot.state = SERVING
+        print(f"Worker {self.slot_index} (pid {os.getpid()}) serving")
+        self.server.serve_forever(poll_interval=0.5)
+
+        # Let in-flight requests finish before exiting
+        self.slot.state = DRAINING
+        deadline = time.time() + self.config.graceful_timeout
+        while self.slot.active > 0 and time.time() < deadline:
+            time.sleep(0.05)
+        self.slot.state = STOPPED
+
+    def stop(self):
+        """Stop accepting connections (safe to call from a signal handler)"""
+        if not self._stopping.is_set():
+            self._stopping.set()
+            self.slot.state = DRAINING
+            if self.server is not None:
+                # shutdown() blocks until serve_forever returns, so never call it on the serving thread
+                threading.Thread(target=self.server.shutdown, daemon=True).start()
+
+    def request_reload(self):
+        """POST /admin/reload in a worker: the master reloads, then recycles every worker"""
+        if os.getppid() != self.master_pid:
+            return {'status': 'error', 'error': f"master process {self.master_pid} is gone", 'master_pid': self.master_pid}
+        os.kill(self.master_pid, signal.SIGHUP)
+        return {'status': 'scheduled', 'master_pid': self.master_pid}
+
+    def _heartbeat(self):
+        while True:
+            self.slot.heartbeat = time.time()
+            time.sleep(1.0)
+
+    def _request_finished(self):
+        with self._lock:
+            self.slot.active -= 1
+
+    def wsgi_app(self, environ, start_response):
+        with self._lock:
+            self.slot.active += 1
+            self.slot.requests += 1
+            recycle = self.max_requests and self.slot.requests >= self.max_requests
+        if recycle:
+            print(f"Worker {self.slot_index} (pid {os.getpid()}) reached {self.max_requests} requests, recycling")
+            self.stop()
+        try:
+            return ClosingIterator(ml_app.app(environ, start_response), [self._request_finished])
+        except Exception:
+            self._request_finished()
+            raise
+
+
+class PreforkServer:
+    """Master process: binds the socket, preloads the model and supervises workers"""
+
+    def __init__(self, host='0.0.0.0', port=5003, workers=2, max_requests=0, max_requests_jitter=0,
+                 graceful_timeout=30.0, heartbeat_timeout=60.0, recycle_timeout=120.0):
+        self.host = host
+        self.port = port
+        self.workers = workers
+        self.max_requests = max_requests
+        self.max_requests_jitter = max_requests_jitter
+        self.graceful_timeout = graceful_timeout
+        self.heartbeat_timeout = heartbeat_timeout
+        self.recycle_timeout = recycle_timeout
+        self.slots = RawArray(WorkerSlot, workers)
+        self.pid = os.getpid()
+        self.listener = None
+        self.model_preloaded = ml_app.inference_backend in FORK_SAFE_BACKENDS
+        self.children = {}  # pid -> slot index
+        self._stopping = False
+        self._recycle_queue = []
+        self._recycle_waiting_since = None
+        self._recycle_skipped = set()  # slots a rolling restart stopped waiting for
+        self._reload_requested = False
+
+    def preload(self):
+        """Load everything the workers share before forking"""
+        if not self.model_preloaded:
+            print(f"The {ml_app.inference_backend} backend is not fork-safe; each worker loads its own model copy "
+                  f"(use INFERENCE_BACKEND=numpy or tflite to share the weights)")
+        if not ml_app.load_lstm_model(include_model=self.model_preloaded):
+            print(ml_app.model_load_error)
+            return False
+
+        ml_app.app.add_url_rule('/health/workers', 'worker_health', self.worker_health)
+
+        # Keep the cyclic GC from touching (and so copying) the preloaded objects in workers
+        gc.collect()
+        gc.freeze()
+        return True
+
+    def worker_health(self):
+        """Health of every worker slot (readable from any worker)"""
+        now = time.time()
+        workers = []
+        for index, slot in enumerate(self.slots):
+            workers.append({
+                'slot': index,
+                'pid': slot.pid,
+                'state': WORKER_STATES.get(slot.state, 'unknown'),
+                'generation': slot.generation,
+                'requests': slot.requests,
+                'active_requests': slot.active,
+                'uptime_seconds': round(now - slot.started, 1) if slot.started else None,
+                'heartbeat_age_seconds': round(now - slot.heartbeat, 1) if slot.heartbeat else None
+            })
+        serving = sum(1 for worker in workers if worker['state'] == 'serving')
+        return jsonify({
+            'status': 'healthy' if serving else 'unhealthy',
+            'served_by': os.getpid(),
+            'master_pid': self.pid,
+            'workers': workers
+        }), 200 if serving else 503
+
+    def spawn(self, slot_index):
+        slot = self.slots[slot_index]
+        slot.generation += 1
+        slot.state = BOOTING
+        slot.active = 0
+        slot.requests = 0
+        slot.started = slot.heartbeat = time.time()
+
+        pid = os.fork()
+        if pid == 0:
+            exit_code = 0
+            try:
+                slot.pid = os.getpid()
+                Worker(self, slot_index).run()
+            except Exception as e:
+                print(f"Worker {slot_index} failed: {e}")
+                exit_code = 1
+            finally:
+                os._exit(exit_code)
+
+        slot.pid = pid
+        self.children[pid] = slot_index
+
+    def recycle_all(self):
+        """Rolling restart: replace workers one at a time"""
+        print("Recycling all workers")
+        self._recycle_queue = [pid for pid in self.children]
+
+    def request_reload(self):
+        """Safe to call from a signal handler; the main loop does the reload"""
+        self._reload_requested = True
+
+    def _reload(self):
+        """Reload the shared artifacts, then roll the workers onto them
+
+        If the new artifacts fail to load the workers keep serving the old ones.
+        """
+        self._reload_requested = False
+        record = ml_app.reload_model('SIGHUP', include_model=self.model_preloaded)
+        if record['status'] == 'ok':
+            gc.collect()
+            gc.freeze()
+            self.recycle_all()
+        else:
+            print(f"Reload {record['status']}, keeping the current workers: {record.get('error')}")
+
+    def stop(self):
+        self._stopping = True
+
+    def _reap(self):
+        while self.children:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+            slot_index = self.children.pop(pid, None)
+            if slot_index is None:
+                continue
+            self.slots[slot_index].state = STOPPED
+            if not self._stopping:
+                if os.waitstatus_to_exitcode(status) != 0:
+                    print(f"Worker {slot_index} (pid {pid}) exited with status {os.waitstatus_to_exitcode(status)}")
+                    time.sleep(1.0)  # avoid a tight respawn loop
+                self.spawn(slot_index)
+
+    def _check_heartbeats(self):
+        now = time.time()
+        for pid, slot_index in list(self.children.items()):
+            slot = self.slots[slot_index]
+            if slot.state == SERVING and now - slot.heartbeat > self.heartbeat_timeout:
+                print(f"Worker {slot_index} (pid {pid}) missed heartbeats, killing")
+                os.kill(pid, signal.SIGKILL)
+
+    def _advance_recycling(self):
+        # Only take the next worker down once every slot is serving again
+        if not self._recycle_queue:
+            self._recycle_waiting_since = None
+            self._recycle_skipped.clear()
+            return
+        not_serving = [index for index, slot in enumerate(self.slots) if slot.state != SERVING]
+        self._recycle_skipped.intersection_update(not_serving)
+        blocking = [index for index in not_serving if index not in self._recycle_skipped]
+        if blocking:
+            now = time.time()
+            if self._recycle_waiting_since is None:
+                self._recycle_waiting_since = now
+            if now - self._recycle_waiting_since < self.recycle_timeout:
+                return
+            # A worker that keeps failing to boot must not hold the rest on the old generation
+            print(f"❌ Recycling blocked for {self.recycle_timeout:g}s by workers {blocking} that are not serving; "
+                  f"no longer waiting for them")
+            self._recycle_skipped.update(blocking)
+        self._recycle_waiting_since = None
+        pid = self._recycle_queue.pop(0)
+        if pid in self.children:
+            os.kill(pid, signal.SIGTERM)
+
+    def run(self):
+        self.listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.listener.bind((self.host, self.port))
+        self.listener.listen(1024)
+        self.listener.set_inheritable(True)
+
+        if not self.preload():
+            return 1
+
+        signal.signal(signal.SIGTERM, lambda *_: self.stop())
+        signal.signal(signal.SIGINT, lambda *_: self.stop())
+        signal.signal(signal.SIGHUP, lambda *_: self.request_reload())
+        if ml_app.model_reload_interval > 0:
+            watcher = ml_app.ArtifactWatcher(ml_app.artifact_paths, self.request_reload,
+                                             interval=ml_app.model_reload_interval)
+            watcher.start()
+
+        for slot_index in range(self.workers):
+            self.spawn(slot_index)
+        print(f"Serving on http://{self.host}:{self.port} with {self.workers} workers")
+
+        while not self._stopping:
+            if self._reload_requested:
+                self._reload()
+            self._reap()
+            self._check_heartbeats()
+            self._advance_recycling()
+            time.sleep(0.2)
+
+        print("Shutting down workers...")
+        for pid in list(self.children):
+            os.kill(pid, signal.SIGTERM)
+        deadline = time.time() + self.graceful_timeout + 5
+        while self.children and time.time() < deadline:
+            self._reap()
+            time.sleep(0.1)
+        for pid in list(self.children):
+            os.kill(pid, signal.SIGKILL)
+        self.listener.close()
+        return 0
+
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description='Prefork server for the ML backend')
+    parser.add_argument('--host', default=os.environ.get('ML_HOST', '0.0.0.0'))
+    parser.add_argument('--port', type=int, default=int(os.environ.get('ML_PORT', 5003)))
+    parser.add_argument('--workers', type=int, default=int(os.environ.get('ML_WORKERS', os.cpu_count() or 1)))
+    parser.add_argument('--max-requests', type=int, default=int(os.environ.get('ML_MAX_REQUESTS', 0)),
+                        help='Recycle a worker after this many requests (0 = never)')
+    parser.add_argument('--max-requests-jitter', type=int, default=int(os.environ.get('ML_MAX_REQUESTS_JITTER', 0)),
+                        help='Random extra requests per worker so they do not recycle together')
+    parser.add_argument('--graceful-timeout', type=float, default=30.0,
+                        help='Seconds a stopping worker waits for in-flight requests')
+    parser.add_argument('--heartbeat-timeout', type=float, default=60.0,
+                        help='Kill workers whose heartbeat is older than this')
+    parser.add_argument('--recycle-timeout', type=float, default=120.0,
+                        help='Seconds a rolling restart waits for every worker to serve before moving on')
+    args = parser.parse_args()
+
+    print("Starting LSTM-Only Hate Speech Detection System (prefork)")
+    print("=" * 60)
+
+    server = PreforkServer(
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        max_requests=args.max_requests,
+        max_requests_jitter=args.max_requests_jitter,
+        graceful_timeout=args.graceful_timeout,
+        heartbeat_timeout=args.heartbeat_timeout,
+        recycle_timeout=args.recycle_timeout
+    )
+    sys.exit(server.run())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+/analyze result cache: texts that preprocess to the same string must not
+share a cached result, since detection reads the original text
+"""
+
+import os
+import sys
+
+import numpy as np
+import pytest
+
+ML_BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ML_BACKEND_DIR)
+
+import app as ml_app
+from lexicon_store import LexiconStore
+from micro_batcher import MicroBatcher
+from model_generations import GenerationManager
+from result_cache import ResultCache
+from vocab_tokenizer import VocabTokenizer
+
+# Inputs that all preprocess to 'pakaya oya'
+EQUIVALENT_TEXTS = ['p@kaya oya', 'pakaya oya', 'PAKAYA oya']
+
+
+class ConstantModel:
+    """Model stand-in: the same probability for every row"""
+
+    def predict(self, x, verbose=0):
+        return np.full((len(x), 1), 0.7, dtype=np.float32)
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    # A manager of its own, so no generation outlives the test
+    monkeypatch.setattr(ml_app, 'generations', GenerationManager())
+    preprocessor = ml_app.SinhalaTextPreprocessor(lexicon_store=LexiconStore(str(tmp_path / 'words.txt')))
+    generation = ml_app.ModelGeneration(
+        ml_app.generations.next_number(), model=ConstantModel(), model_version='test',
+        tokenizer=VocabTokenizer(os.path.join(ML_BACKEND_DIR, 'models', 'singlish_vocab.npz')),
+        preprocessor=preprocessor, max_words=ml_app.max_words, max_len=ml_app.max_len,
+        length_buckets=ml_app.length_buckets
+    )
+    generation.batcher = MicroBatcher(lambda x: generation.model.predict(x), max_wait_ms=0)
+    ml_app.generations.install(generation)
+    monkeypatch.setattr(ml_app, 'model_state', 'ready')
+    monkeypatch.setattr(ml_app, 'analysis_cache', ResultCache(max_entries=100))
+    yield ml_app.app.test_client()
+    generation.close()
+
+
+def analyze(client, text):
+    response = client.post('/analyze', json={'text': text})
+    assert response.status_code == 200
+    return response.get_json()
+
+
+def test_equivalent_texts_preprocess_the_same():
+    preprocessor = ml_app.SinhalaTextPreprocessor(lexicon_store=LexiconStore(os.devnull))
+    assert len({preprocessor.preprocess_text(text) for text in EQUIVALENT_TEXTS}) == 1
+
+
+@pytest.mark.parametrize('first', EQUIVALENT_TEXTS)
+def test_analyze_does_not_serve_another_texts_result(client, first):
+    fresh = {}
+    for text in EQUIVALENT_TEXTS:
+        ml_app.analysis_cache.clear()
+        fresh[text] = analyze(client, text)
+
+    ml_app.analysis_cache.clear()
+    analyze(client, first)
+    for text in EQUIVALENT_TEXTS:
+        assert analyze(client, text) == fresh[text]
+
+
+def test_batch_does_not_serve_another_texts_result(client):
+    fresh = []
+    for text in EQUIVALENT_TEXTS:
+        ml_app.analysis_cache.clear()
+        fresh.append(analyze(client, text))
+
+    ml_app.analysis_cache.clear()
+    analyze(client, EQUIVALENT_TEXTS[0])
+    response = client.post('/analyze/batch', json={'texts': EQUIVALENT_TEXTS})
+    assert response.get_json()['results'] == fresh
+
+
+def test_identical_text_is_served_from_cache(client):
+    first = analyze(client, 'pakaya oya')
+    assert analyze(client, 'pakaya oya') == first
+    assert ml_app.analysis_cache.stats()['hits'] == 1
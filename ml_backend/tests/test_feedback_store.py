@@ -0,0 +1,81 @@
+"""
+Legacy feedback_data.jsonl import: unreadable lines are skipped, and
+importing the same log twice, or from two processes at once, stores every
+line once
+"""
+
+import json
+import os
+import sys
+import threading
+
+ML_BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ML_BACKEND_DIR)
+
+from feedback_store import FeedbackStore
+
+
+def entry(number, feedback_type='missed_hate'):
+    return json.dumps({'timestamp': f"2024-01-01T00:00:{number % 60:02d}", 'feedback_type': feedback_type,
+                       'text': f"text {number}", 'user_annotation': f"word{number}", 'confidence': 0.5})
+
+
+def write_log(path, lines):
+    path.write_text(''.join(line + '\n' for line in lines), encoding='utf-8')
+    return str(path)
+
+
+def test_malformed_lines_are_skipped(tmp_path):
+    log = write_log(tmp_path / 'feedback.jsonl', [
+        entry(1),
+        'not json',
+        '[1, 2]',
+        '"a string"',
+        '{"feedback_type": "missed_hate", "text": null}',
+        '{"feedback_type": "missed_hate"}',
+        '{"feedback_type": "missed_hate", "text": "x", "user_annotation": {"nested": true}}',
+        entry(2, 'false_positive'),
+    ])
+    store = FeedbackStore(str(tmp_path / 'feedback.db'))
+
+    assert store.import_jsonl(log) == (2, 6)
+    assert store.counts() == {'missed_hate': 1, 'false_positive': 1}
+    assert store.import_jsonl(log) == (0, 0)
+
+
+def test_rerun_imports_only_appended_lines(tmp_path):
+    path = tmp_path / 'feedback.jsonl'
+    log = write_log(path, [entry(number) for number in range(5)])
+    store = FeedbackStore(str(tmp_path / 'feedback.db'))
+    assert store.import_jsonl(log) == (5, 0)
+
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write(entry(5) + '\n')
+    assert store.import_jsonl(log) == (1, 0)
+    assert store.counts() == {'missed_hate': 6}
+
+
+def test_concurrent_imports_store_each_line_once(tmp_path):
+    lines = 2000
+    log = write_log(tmp_path / 'feedback.jsonl', [entry(number) for number in range(lines)])
+    db = str(tmp_path / 'feedback.db')
+    FeedbackStore(db).counts()  # Create the schema before the importers race
+    results = []
+    barrier = threading.Barrier(4)
+
+    def run():
+        store = FeedbackStore(db)
+        barrier.wait()
+        results.append(store.import_jsonl(log, batch_size=50))
+
+    threads = [threading.Thread(target=run) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    store = FeedbackStore(db)
+    assert sum(imported for imported, _ in results) == lines
+    assert store.counts() == {'missed_hate': lines}
+    entries, _ = store.query(limit=500)
+    assert len({entry['text'] for entry in entries}) == 500
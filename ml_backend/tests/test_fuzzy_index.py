@@ -0,0 +1,80 @@
+"""
+FuzzyIndex must never drop a hate word that the full calculate_similarity
+scoring would match: candidates() is checked against scoring every lexicon
+word, on dataset tokens and on edited forms of the hate words themselves
+"""
+
+import os
+import random
+import sys
+
+import pandas as pd
+import pytest
+
+ML_BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ML_BACKEND_DIR)
+
+import app as ml_app
+from lexicon_index import FuzzyIndex
+from lexicon_store import LexiconStore
+
+SOLD_TEST = os.path.join(os.path.dirname(ML_BACKEND_DIR), 'DataSets', 'SOLD_test.tsv')
+
+
+def edits(word, rng):
+    """Deletions, repetitions, substitutions and additions the fuzzy matcher is meant to catch"""
+    forms = {word + word[-1], word + 'a', word[:-1], word[1:], word.replace('a', 'aa', 1),
+             word.replace('u', 'o', 1), word.replace('th', 't'), word.replace('i', 'ee')}
+    for _ in range(4):
+        i = rng.randrange(len(word))
+        forms.add(word[:i] + word[i + 1:])
+        forms.add(word[:i] + word[i] * 3 + word[i + 1:])
+        forms.add(word[:i] + rng.choice('aeiouhkt') + word[i + 1:])
+    return {form for form in forms if form}
+
+
+@pytest.fixture(scope='module')
+def preprocessor():
+    return ml_app.SinhalaTextPreprocessor(lexicon_store=LexiconStore(os.devnull))
+
+
+@pytest.fixture(scope='module')
+def tokens(preprocessor):
+    rng = random.Random(4)
+    sample = set()
+    for hate_word in preprocessor.hate_words:
+        sample |= edits(hate_word.lower(), rng)
+    texts = pd.read_csv(SOLD_TEST, sep='\t', usecols=['text'], dtype=str)['text'].dropna()
+    dataset_tokens = sorted({token for text in texts[:200] for token in preprocessor.preprocess_text(text).split()})
+    sample |= set(rng.sample(dataset_tokens, min(300, len(dataset_tokens))))
+    return sorted(sample)
+
+
+def brute_force_matches(preprocessor, token):
+    matches = []
+    for word_index, hate_word in enumerate(preprocessor.fuzzy_index.hate_words):
+        hate_word_lower = hate_word.lower()
+        if token == hate_word_lower:
+            continue
+        similarity = preprocessor.calculate_similarity(hate_word_lower, token)
+        if similarity >= preprocessor.fuzzy_threshold:
+            matches.append((word_index, similarity))
+    return tuple(matches)
+
+
+def test_candidates_cover_every_fuzzy_match(preprocessor, tokens):
+    matched = 0
+    for token in tokens:
+        expected = brute_force_matches(preprocessor, token)
+        candidates = preprocessor.fuzzy_index.candidates(token)
+        assert {word_index for word_index, _ in expected} <= candidates, token
+        assert preprocessor._fuzzy_token_matches(token) == expected, token
+        matched += bool(expected)
+    assert matched > 100  # The sample exercises real near-misses
+
+
+def test_words_added_later_are_indexed():
+    index = FuzzyIndex(['hutta'])
+    index.add_word('pakaya')
+    assert 1 in index.candidates('pakayaa')
+    assert 0 in index.candidates('huttta')
@@ -0,0 +1,52 @@
+"""
+refresh_lexicon() across prefork workers: every worker's preprocessor
+gains the words the others learned from /feedback, including after it
+saved words of its own
+"""
+
+import os
+import sys
+from types import SimpleNamespace
+
+ML_BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ML_BACKEND_DIR)
+
+import app as ml_app
+from lexicon_store import LexiconStore
+from model_generations import GenerationManager, ModelGeneration
+
+
+def make_worker(path):
+    """Store, preprocessor and generation manager of one worker process"""
+    store = LexiconStore(path)
+    generations = GenerationManager()
+    preprocessor = ml_app.SinhalaTextPreprocessor(lexicon_store=store)
+    generations.install(ModelGeneration(generations.next_number(), preprocessor=preprocessor))
+    return SimpleNamespace(store=store, generations=generations, preprocessor=preprocessor)
+
+
+def learn(worker, word):
+    """What /feedback does with a missed_hate annotation"""
+    worker.preprocessor.add_hate_word(word)
+    worker.store.add(word)
+
+
+def refresh(monkeypatch, worker):
+    monkeypatch.setattr(ml_app, 'lexicon_store', worker.store)
+    monkeypatch.setattr(ml_app, 'generations', worker.generations)
+    return ml_app.refresh_lexicon()
+
+
+def test_workers_pick_up_each_others_words(tmp_path, monkeypatch):
+    path = str(tmp_path / 'words.txt')
+    first, second = make_worker(path), make_worker(path)
+
+    learn(first, 'zorblaxa')
+    learn(second, 'zorblaxb')
+    learn(first, 'zorblaxc')
+
+    assert refresh(monkeypatch, first) == ['zorblaxb']
+    assert refresh(monkeypatch, second) == ['zorblaxa', 'zorblaxc']
+    for worker in (first, second):
+        assert {'zorblaxa', 'zorblaxb', 'zorblaxc'} <= worker.preprocessor.hate_word_set
+        assert refresh(monkeypatch, worker) == []
@@ -0,0 +1,50 @@
+"""
+LexiconStore shared by several processes: each store must see every word
+the others append, whatever it added itself in between
+"""
+
+import os
+import sys
+
+ML_BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ML_BACKEND_DIR)
+
+from lexicon_store import LexiconStore
+
+
+def test_refresh_returns_words_appended_by_another_store(tmp_path):
+    path = str(tmp_path / 'words.txt')
+    a, b = LexiconStore(path), LexiconStore(path)
+
+    assert a.add('wordA')
+    assert b.add('wordB')
+    assert b.refresh() == ['worda']
+    assert a.refresh() == ['wordb']
+    assert a.words == ['worda', 'wordb'] and b.words == ['wordb', 'worda']
+
+
+def test_own_words_are_not_returned_by_refresh(tmp_path):
+    path = str(tmp_path / 'words.txt')
+    a = LexiconStore(path)
+    assert a.add('wordA')
+    assert not a.add('WORDA')
+    assert a.refresh() == []
+
+
+def test_word_added_by_both_stores_reads_back_once(tmp_path):
+    path = str(tmp_path / 'words.txt')
+    a, b = LexiconStore(path), LexiconStore(path)
+    assert a.add('same') and b.add('same')
+    assert a.refresh() == [] and b.refresh() == []
+    assert LexiconStore(path).words == ['same']
+
+
+def test_partial_last_line_is_read_once_complete(tmp_path):
+    path = tmp_path / 'words.txt'
+    path.write_bytes(b'first\nsecond\npart')
+    store = LexiconStore(str(path))
+    assert store.words == ['first', 'second']
+
+    with open(path, 'ab') as f:
+        f.write(b'ial\n')
+    assert store.refresh() == ['partial']
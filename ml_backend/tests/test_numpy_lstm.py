@@ -0,0 +1,69 @@
+"""
+NumpyLSTMModel must reproduce Keras predictions for the network built by
+SinglishLSTMTrainer.create_model (scaled down), with and without masking
+"""
+
+import os
+import sys
+
+import numpy as np
+import pytest
+
+ML_BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ML_BACKEND_DIR)
+
+from numpy_lstm import NumpyLSTMModel, export_keras_weights
+
+keras = pytest.importorskip('tensorflow').keras
+
+VOCAB_SIZE = 500
+MAX_LEN = 40
+
+
+def make_model(mask_zero):
+    keras.utils.set_random_seed(0)
+    model = keras.Sequential([
+        keras.Input((None,)),
+        keras.layers.Embedding(VOCAB_SIZE, 16, mask_zero=mask_zero),
+        keras.layers.Bidirectional(keras.layers.LSTM(12, return_sequences=True)),
+        keras.layers.Bidirectional(keras.layers.LSTM(8)),
+        keras.layers.Dense(8, activation='relu'),
+        keras.layers.Dropout(0.5),
+        keras.layers.Dense(1, activation='sigmoid')
+    ])
+    # Perturb every weight, so the zero-initialized biases are exercised too
+    for layer in model.layers:
+        layer.set_weights([w + np.random.default_rng(1).normal(0, 0.3, w.shape).astype(w.dtype)
+                           for w in layer.get_weights()])
+    return model
+
+
+def padded_rows(rows=32, max_len=MAX_LEN):
+    rng = np.random.default_rng(2)
+    x = rng.integers(1, VOCAB_SIZE, size=(rows, max_len))
+    lengths = rng.integers(1, max_len + 1, size=rows)
+    x[np.arange(max_len) >= lengths[:, None]] = 0
+    return x
+
+
+@pytest.mark.parametrize('mask_zero', [False, True])
+def test_numpy_matches_keras(tmp_path, mask_zero):
+    keras_model = make_model(mask_zero)
+    path = str(tmp_path / 'weights.npz')
+    export_keras_weights(keras_model, path)
+    numpy_model = NumpyLSTMModel(path)
+
+    x = padded_rows()
+    expected = keras_model.predict(x, verbose=0)
+    assert np.abs(numpy_model.predict(x) - expected).max() <= 1e-5
+    assert numpy_model.padding_invariant == mask_zero
+
+
+def test_masked_model_ignores_padding(tmp_path):
+    path = str(tmp_path / 'weights.npz')
+    export_keras_weights(make_model(mask_zero=True), path)
+    numpy_model = NumpyLSTMModel(path)
+
+    x = padded_rows(max_len=20)
+    wider = np.concatenate([x, np.zeros((len(x), 30), dtype=x.dtype)], axis=1)
+    assert np.abs(numpy_model.predict(x) - numpy_model.predict(wider)).max() <= 1e-6
@@ -0,0 +1,76 @@
+"""
+preprocess_text with precompiled tables must match the original sequential
+str.replace / re.sub implementation, kept here as the reference
+"""
+
+import os
+import random
+import re
+import sys
+import unicodedata
+
+import pandas as pd
+import pytest
+
+ML_BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ML_BACKEND_DIR)
+
+import app as ml_app
+from lexicon_store import LexiconStore
+
+DATASETS_DIR = os.path.join(os.path.dirname(ML_BACKEND_DIR), 'DataSets')
+
+# Characters the tables act on: substitutions, aspirated and doubled letters,
+# Sinhala conjuncts, URL/mention markers, punctuation, whitespace and a capital sigma
+ALPHABET = list('@3104$78!52+69*#abdeghijkopstuzAEHKOTUΣς .,?-_/:\n\t') + ['ක', '්', 'ෂ', 'ණ', 'ළ', 'ඥ', 'http', 'www']
+
+
+def reference_preprocess(preprocessor, text):
+    """preprocess_text as it was before the tables were precompiled"""
+    text = str(text)
+    text = re.sub(r'[^\u0D80-\u0DFF]', lambda m: m.group(0).lower(), text)
+    for old, new in preprocessor.char_mapping.items():
+        text = text.replace(old, new)
+
+    for sub, original in preprocessor.OBFUSCATION_SUBSTITUTIONS.items():
+        text = text.replace(sub, original)
+    for variation, normalized in preprocessor.SINHALA_VARIATIONS.items():
+        text = text.replace(variation, normalized)
+    text = re.sub(r'o$', 'a', text)
+    text = re.sub(r'e$', 'a', text)
+    text = re.sub(r'(.)\1{4,}', r'\1\1\1', text)
+    text = re.sub(r'\b(\w)\s+(\w)\s+(\w)\s+(\w)', r'\1\2\3\4', text)
+    text = re.sub(r'\b(\w)\s+(\w)\s+(\w)', r'\1\2\3', text)
+    text = re.sub(r'\b(\w)\s+(\w)', r'\1\2', text)
+    text = text.lower()
+    text = unicodedata.normalize('NFKC', text)
+
+    text = re.sub(r'http\S+|www\S+|@\w+', '', text)
+    text = re.sub(r'[^\w\s\u0D80-\u0DFF.,!?]', ' ', text)
+    return re.sub(r'\s+', ' ', text).strip()
+
+
+@pytest.fixture(scope='module')
+def preprocessor():
+    return ml_app.SinhalaTextPreprocessor(lexicon_store=LexiconStore(os.devnull))
+
+
+def dataset_texts(limit=1500):
+    texts = []
+    for filename, sep, column in (('SOLD_test.tsv', '\t', 'text'), ('test.csv', ',', 'comment'),
+                                  ('only_hate.csv', ',', 'sensitive text')):
+        df = pd.read_csv(os.path.join(DATASETS_DIR, filename), sep=sep, usecols=[column], dtype=str)
+        texts.extend(df[column].dropna()[:limit])
+    return texts
+
+
+def test_dataset_texts_match_reference(preprocessor):
+    for text in dataset_texts():
+        assert preprocessor.preprocess_text(text) == reference_preprocess(preprocessor, text), text
+
+
+def test_random_texts_match_reference(preprocessor):
+    rng = random.Random(7)
+    for _ in range(5000):
+        text = ''.join(rng.choice(ALPHABET) * rng.choice((1, 1, 1, 2, 3, 5)) for _ in range(rng.randint(1, 30)))
+        assert preprocessor.preprocess_text(text) == reference_preprocess(preprocessor, text), repr(text)
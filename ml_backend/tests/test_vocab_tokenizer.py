@@ -0,0 +1,59 @@
+"""
+VocabTokenizer must give the token ids (and padded rows) of the Keras
+Tokenizer it was exported from
+"""
+
+import os
+import pickle
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+ML_BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ML_BACKEND_DIR)
+
+from vocab_tokenizer import VocabTokenizer, export_keras_tokenizer
+
+text_module = pytest.importorskip('tensorflow.keras.preprocessing.text')
+sequence_module = pytest.importorskip('tensorflow.keras.preprocessing.sequence')
+
+MODELS_DIR = os.path.join(ML_BACKEND_DIR, 'models')
+SOLD_TEST = os.path.join(os.path.dirname(ML_BACKEND_DIR), 'DataSets', 'SOLD_test.tsv')
+
+
+@pytest.fixture(scope='module')
+def texts():
+    texts = pd.read_csv(SOLD_TEST, sep='\t', usecols=['text'], dtype=str)['text'].dropna().tolist()
+    return texts[:2000] + ['', '   ', 'UPPER lower MiXeD', 'tabs\tand\nnewlines', 'punct!!! "quoted" (paren)']
+
+
+def test_shipped_vocabulary_matches_pickled_tokenizer(texts):
+    with open(os.path.join(MODELS_DIR, 'singlish_tokenizer.pkl'), 'rb') as f:
+        keras_tokenizer = pickle.load(f)
+    vocab_tokenizer = VocabTokenizer(os.path.join(MODELS_DIR, 'singlish_vocab.npz'))
+    assert vocab_tokenizer.texts_to_sequences(texts) == keras_tokenizer.texts_to_sequences(texts)
+
+
+@pytest.mark.parametrize('settings', [
+    {'num_words': 300, 'oov_token': '<OOV>'},
+    {'num_words': 300},
+    {'filters': '!?.', 'lower': False, 'oov_token': '<OOV>'},
+    {'char_level': True, 'num_words': 40},
+], ids=['oov', 'dropped', 'filters', 'char_level'])
+def test_exported_vocabulary_matches_keras(tmp_path, texts, settings):
+    keras_tokenizer = text_module.Tokenizer(**settings)
+    keras_tokenizer.fit_on_texts(texts[:1000])
+    path = str(tmp_path / 'vocab.npz')
+    export_keras_tokenizer(keras_tokenizer, path)
+    vocab_tokenizer = VocabTokenizer(path)
+
+    expected = keras_tokenizer.texts_to_sequences(texts)
+    assert vocab_tokenizer.texts_to_sequences(texts) == expected
+    for padding in ('pre', 'post'):
+        for truncating in ('pre', 'post'):
+            padded = sequence_module.pad_sequences(expected, maxlen=20, padding=padding, truncating=truncating)
+            np.testing.assert_array_equal(
+                vocab_tokenizer.encode_batch(texts, 20, padding=padding, truncating=truncating), padded
+            )
@@ -0,0 +1,81 @@
+"""
+TFLite inference backend for the Singlish LSTM
+Wraps a TFLite interpreter behind the Keras predict() interface used by app.py
+"""
+
+import threading
+
+import numpy as np
+
+try:
+    # Lightweight runtime when installed; falls back to the TensorFlow one
+    from tflite_runtime.interpreter import Interpreter
+except ImportError:
+    Interpreter = None
+
+TFLITE_VARIANTS = ('float32', 'dynamic', 'int8')
+
+
+def tflite_model_path(model_dir, variant):
+    """File name used for a converted model variant"""
+    return f"{model_dir}/singlish_lstm_model_{variant}.tflite"
+
+
+class TFLiteModel:
+    """Keras-like predict() over a TFLite interpreter
+
+    The converted LSTM has a fixed batch dimension, so larger inputs are
+    run through the interpreter in chunks of that size.
+    """
+
+    def __init__(self, model_path, num_threads=None):
+        interpreter_class = Interpreter
+        if interpreter_class is None:
+            import tensorflow as tf
+            interpreter_class = tf.lite.Interpreter
+
+        self.model_path = model_path
+        self.interpreter = interpreter_class(model_path=model_path, num_threads=num_threads)
+        self.interpreter.allocate_tensors()
+        self._input = self.interpreter.get_input_details()[0]
+        self._output = self.interpreter.get_output_details()[0]
+        self.batch_size = int(self._input['shape'][0])
+        # Converted with a fixed (batch, max_len) input, so rows cannot be bucketed
+        self.padding_invariant = False
+
+        # The interpreter is not thread-safe
+        self._lock = threading.Lock()
+
+    def _quantize_input(self, x):
+        scale, zero_point = self._input['quantization']
+        if scale and np.issubdtype(self._input['dtype'], np.integer):
+            x = np.round(x / scale + zero_point)
+        return x.astype(self._input['dtype'])
+
+    def _dequantize_output(self, y):
+        scale, zero_point = self._output['quantization']
+        if scale and np.issubdtype(self._output['dtype'], np.integer):
+            return (y.astype(np.float32) - zero_point) * scale
+        return y.astype(np.float32)
+
+    def predict(self, x, verbose=0):
+        """Run inference on a (batch, max_len) array of token ids"""
+        x = np.asarray(x, dtype=np.float32)
+        outputs = []
+
+        with self._lock:
+            for start in range(0, len(x), self.batch_size):
+                chunk = x[start:start + self.batch_size]
+                rows = len(chunk)
+                if rows < self.batch_size:
+                    padding = np.zeros((self.batch_size - rows,) + chunk.shape[1:], dtype=chunk.dtype)
+                    chunk = np.concatenate([chunk, padding], axis=0)
+
+                self.interpreter.set_tensor(self._input['index'], self._quantize_input(chunk))
+                self.interpreter.invoke()
+                output = self.interpreter.get_tensor(self._output['index'])
+                outputs.append(self._dequantize_output(output[:rows]))
+
+        if not outputs:
+            return np.zeros((0, 1), dtype=np.float32)
+        return np.concatenate(outputs, axis=0)
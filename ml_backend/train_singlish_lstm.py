@@ -19,6 +19,7 @@ from tensorflow.keras.models import Sequential
 from tensorflow.keras.layers import Embedding, LSTM, Dense, Dropout, Bidirectional, Conv1D, MaxPooling1D
 from tensorflow.keras.callbacks import EarlyStopping, ReduceLROnPlateau, ModelCheckpoint
 from tensorflow.keras.optimizers import Adam
+from tensorflow.keras.utils import Sequence
 import matplotlib.pyplot as plt
 import seaborn as sns
 from sklearn.metrics import classification_report, confusion_matrix
@@ -27,14 +28,51 @@ from sklearn.metrics import classification_report, confusion_matrix
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from app import SinhalaTextPreprocessor
+from numpy_lstm import export_keras_weights, keras_weight_arrays
+from vocab_tokenizer import export_keras_tokenizer, keras_tokenizer_arrays
+from model_bundle import build_bundle
+from length_buckets import bucketed_batches, parse_length_buckets
+
+class BucketedSequence(Sequence):
+    """Batches of rows from the same length bucket, each cut to its bucket bound
+    
+    X is padded to max_len with post padding, so a row's length is its number
+    of non-zero ids. Batches are reshuffled after every epoch.
+    """
+    
+    def __init__(self, X, y, buckets, batch_size=32, shuffle=True, seed=42):
+        super().__init__()
+        self.X = X
+        self.y = y
+        self.buckets = buckets
+        self.batch_size = batch_size
+        self.shuffle = shuffle
+        self.lengths = np.count_nonzero(X, axis=1)
+        self.rng = np.random.RandomState(seed)
+        self.on_epoch_end()
+    
+    def __len__(self):
+        return len(self.batches)
+    
+    def __getitem__(self, index):
+        bound, rows = self.batches[index]
+        return self.X[rows, :bound], self.y[rows]
+    
+    def on_epoch_end(self):
+        self.batches = bucketed_batches(
+            self.lengths, self.buckets, self.batch_size,
+            shuffle=self.shuffle, seed=int(self.rng.randint(2 ** 31))
+        )
 
 class SinglishLSTMTrainer:
     """Trainer for Singlish LSTM model"""
     
-    def __init__(self, max_words=20000, max_len=150, embedding_dim=300):
+    def __init__(self, max_words=20000, max_len=150, embedding_dim=300, length_buckets=None):
         self.max_words = max_words
         self.max_len = max_len
         self.embedding_dim = embedding_dim
+        # Length-bucketed batches need a masked (padding-invariant) model
+        self.length_buckets = parse_length_buckets(length_buckets, max_len) if length_buckets else None
         self.preprocessor = SinhalaTextPreprocessor()
         self.tokenizer = None
         self.model = None
@@ -138,9 +176,15 @@ class SinglishLSTMTrainer:
         """Create the LSTM model architecture"""
         print("Creating model architecture...")
         
+        if self.length_buckets:
+            # Variable-width input; masking makes padding ignored by the LSTMs
+            embedding = Embedding(vocab_size, self.embedding_dim, mask_zero=True)
+        else:
+            embedding = Embedding(vocab_size, self.embedding_dim, input_length=self.max_len)
+        
         model = Sequential([
             # Embedding layer
-            Embedding(vocab_size, self.embedding_dim, input_length=self.max_len),
+            embedding,
             
             # Bidirectional LSTM layers
             Bidirectional(LSTM(128, return_sequences=True, dropout=0.2, recurrent_dropout=0.2)),
@@ -155,6 +199,8 @@ class SinglishLSTMTrainer:
             # Output layer (binary classification)
             Dense(1, activation='sigmoid')
         ])
+        if self.length_buckets:
+            model.build((None, None))
         
         # Compile model
         model.compile(
@@ -187,14 +233,24 @@ class SinglishLSTMTrainer:
         ]
         
         # Train model
-        history = self.model.fit(
-            X_train, y_train,
-            validation_data=(X_val, y_val),
-            epochs=50,
-            batch_size=32,
-            callbacks=callbacks,
-            verbose=1
-        )
+        if self.length_buckets:
+            print(f"Length-bucketed batches: {list(self.length_buckets)}")
+            history = self.model.fit(
+                BucketedSequence(X_train, y_train, self.length_buckets, batch_size=32),
+                validation_data=BucketedSequence(X_val, y_val, self.length_buckets, batch_size=32, shuffle=False),
+                epochs=50,
+                callbacks=callbacks,
+                verbose=1
+            )
+        else:
+            history = self.model.fit(
+                X_train, y_train,
+                validation_data=(X_val, y_val),
+                epochs=50,
+                batch_size=32,
+                callbacks=callbacks,
+                verbose=1
+            )
         
         return history
     
@@ -235,17 +291,27 @@ class SinglishLSTMTrainer:
             pickle.dump(self.tokenizer, f)
         print("✅ Tokenizer saved")
         
+        # Save the compact vocabulary the server loads instead of the pickle
+        export_keras_tokenizer(self.tokenizer, 'models/singlish_vocab.npz')
+        print("✅ Vocabulary saved")
+        
         # Save preprocessor
         with open('models/singlish_preprocessor.pkl', 'wb') as f:
             pickle.dump(self.preprocessor, f)
         print("✅ Preprocessor saved")
         
+        # Save plain weights for the TensorFlow-free NumPy backend
+        export_keras_weights(self.model, 'models/singlish_lstm_weights.npz')
+        print("✅ NumPy weights saved")
+        
         # Save metadata
         metadata = {
             'max_words': self.max_words,
             'max_len': self.max_len,
             'vocab_size': len(self.tokenizer.word_index) + 1,
             'embedding_dim': self.embedding_dim,
+            'mask_zero': bool(self.length_buckets),
+            'length_buckets': list(self.length_buckets) if self.length_buckets else None,
             'model_type': 'Singlish_LSTM',
             'training_date': datetime.now().isoformat(),
             'hate_words_count': len(self.preprocessor.hate_words)
@@ -255,6 +321,16 @@ class SinglishLSTMTrainer:
             json.dump(metadata, f, indent=2)
         print("✅ Metadata saved")
         
+        # Save everything the server needs as one versioned bundle
+        bundle = build_bundle(
+            'models/singlish_model.bundle',
+            keras_weight_arrays(self.model),
+            keras_tokenizer_arrays(self.tokenizer),
+            self.preprocessor,
+            metadata
+        )
+        print(f"✅ Model bundle {bundle['version']} saved")
+        
         print("🎉 All model artifacts saved successfully!")
     
     def train(self):
@@ -302,7 +378,8 @@ class SinglishLSTMTrainer:
 
 def main():
     """Main function"""
-    trainer = SinglishLSTMTrainer()
+    # e.g. LENGTH_BUCKETS=16,32,64,150 trains a masked model on length-bucketed batches
+    trainer = SinglishLSTMTrainer(length_buckets=os.environ.get('LENGTH_BUCKETS'))
     trainer.train()
 
 if __name__ == "__main__":
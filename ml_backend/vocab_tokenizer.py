@@ -0,0 +1,161 @@
+"""
+Compact serving tokenizer
+The trained Keras Tokenizer is exported to a plain .npz vocabulary: the words
+as one sorted UTF-8 blob with offsets, plus the token id of every word. Only
+word -> id lookup is kept (no word_counts / word_docs / index_word), loading
+needs neither pickle nor TensorFlow, and the ids match texts_to_sequences.
+"""
+
+import json
+
+import numpy as np
+
+VOCAB_FORMAT_VERSION = 1
+
+
+def keras_tokenizer_arrays(tokenizer):
+    """(config, arrays) holding the vocabulary of a fitted Keras Tokenizer
+
+    Every word is stored with the id texts_to_sequences gives it: words past
+    num_words become the OOV id, or -1 (dropped) without an OOV token.
+    """
+    if getattr(tokenizer, 'analyzer', None) is not None:
+        raise ValueError("Tokenizers with a custom analyzer cannot be exported")
+
+    num_words = tokenizer.num_words
+    oov_id = tokenizer.word_index.get(tokenizer.oov_token) if tokenizer.oov_token is not None else None
+    drop_id = -1 if oov_id is None else oov_id
+
+    words = sorted(word.encode('utf-8') for word in tokenizer.word_index)
+    offsets = np.zeros(len(words) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(word) for word in words])
+    ids = np.empty(len(words), dtype=np.int32)
+    for row, word in enumerate(words):
+        i = tokenizer.word_index[word.decode('utf-8')]
+        ids[row] = drop_id if num_words and i >= num_words else i
+
+    config = {
+        'format_version': VOCAB_FORMAT_VERSION,
+        'filters': tokenizer.filters,
+        'lower': bool(tokenizer.lower),
+        'split': tokenizer.split,
+        'char_level': bool(tokenizer.char_level),
+        'num_words': num_words,
+        'oov_token': tokenizer.oov_token,
+        # Id of words missing from the vocabulary (-1: dropped)
+        'unknown_id': drop_id,
+        'vocab_size': len(words)
+    }
+    arrays = {'words': np.frombuffer(b''.join(words), dtype=np.uint8), 'offsets': offsets, 'ids': ids}
+    return config, arrays
+
+
+def export_keras_tokenizer(tokenizer, path):
+    """Write the vocabulary of a fitted Keras Tokenizer to an .npz file"""
+    config, arrays = keras_tokenizer_arrays(tokenizer)
+    np.savez(path, __config__=np.array(json.dumps(config)), **arrays)
+    return config
+
+
+def pad_ragged(ids, offsets, maxlen, padding='post', truncating='post', rows=None, value=0):
+    """Padded int32 matrix of ragged rows (flat ids + row offsets), like pad_sequences
+
+    rows selects (and orders) the rows to pad; all rows by default.
+    """
+    starts = offsets[:-1] if rows is None else offsets[:-1][rows]
+    ends = offsets[1:] if rows is None else offsets[1:][rows]
+    lengths = np.minimum(ends - starts, maxlen)
+    if truncating == 'post':
+        sources = starts
+    else:
+        sources = ends - lengths
+    columns = np.arange(maxlen)
+    first = np.zeros_like(lengths) if padding == 'post' else maxlen - lengths
+
+    relative = columns[None, :] - first[:, None]
+    valid = (relative >= 0) & (relative < lengths[:, None])
+    padded = np.full((len(starts), maxlen), value, dtype=np.int32)
+    padded[valid] = ids[(sources[:, None] + relative)[valid]]
+    return padded
+
+
+class VocabTokenizer:
+    """texts_to_sequences-compatible tokenizer over a file from export_keras_tokenizer"""
+
+    def __init__(self, vocab_path):
+        with np.load(vocab_path, allow_pickle=False) as data:
+            config = json.loads(str(data['__config__']))
+            arrays = {key: data[key] for key in ('words', 'offsets', 'ids')}
+        self._load(config, arrays)
+        self.vocab_path = vocab_path
+
+    @classmethod
+    def from_arrays(cls, config, arrays):
+        """Tokenizer over in-memory (or memory-mapped) arrays from keras_tokenizer_arrays"""
+        tokenizer = cls.__new__(cls)
+        tokenizer._load(config, arrays)
+        tokenizer.vocab_path = None
+        return tokenizer
+
+    @classmethod
+    def from_keras(cls, tokenizer):
+        """Convert a fitted Keras Tokenizer in memory"""
+        return cls.from_arrays(*keras_tokenizer_arrays(tokenizer))
+
+    def _load(self, config, arrays):
+        if config.get('format_version') != VOCAB_FORMAT_VERSION:
+            raise ValueError(f"Unsupported vocabulary format: {config.get('format_version')}")
+        words = arrays['words'].tobytes()
+        offsets = arrays['offsets']
+        ids = arrays['ids']
+
+        self.config = config
+        self.lower = config['lower']
+        self.split = config['split']
+        self.char_level = config['char_level']
+        self.num_words = config['num_words']
+        self.oov_token = config['oov_token']
+        self.unknown_id = int(config['unknown_id'])
+        self.vocab_size = int(config['vocab_size'])
+        self._translate = str.maketrans({c: self.split for c in config['filters']})
+
+        # The only per-word Python objects: one str -> int entry per word
+        starts, ends = offsets[:-1].tolist(), offsets[1:].tolist()
+        self._index = {words[s:e].decode('utf-8'): i for s, e, i in zip(starts, ends, ids.tolist())}
+
+    def _words(self, text):
+        """Same word split as Keras text_to_word_sequence"""
+        if self.lower:
+            text = text.lower()
+        if self.char_level:
+            return text
+        return [word for word in text.translate(self._translate).split(self.split) if word]
+
+    def encode_ragged(self, texts):
+        """Token ids of all texts as one flat int32 array plus row offsets"""
+        lookup = self._index.get
+        unknown = self.unknown_id
+        ids = []
+        offsets = [0]
+        for text in texts:
+            ids.extend(lookup(word, unknown) for word in self._words(text))
+            offsets.append(len(ids))
+
+        ids = np.array(ids, dtype=np.int32)
+        offsets = np.array(offsets, dtype=np.int64)
+        if len(ids) and ids.min() < 0:
+            # Words dropped by Keras (no OOV token): remove and shift the offsets
+            keep = ids >= 0
+            offsets = np.concatenate([[0], np.cumsum(keep)])[offsets]
+            ids = ids[keep]
+        return ids, offsets
+
+    def encode_batch(self, texts, maxlen, padding='post', truncating='post'):
+        """Padded (len(texts), maxlen) int32 matrix, as pad_sequences(texts_to_sequences(texts))"""
+        ids, offsets = self.encode_ragged(texts)
+        return pad_ragged(ids, offsets, maxlen, padding=padding, truncating=truncating)
+
+    def texts_to_sequences(self, texts):
+        """Lists of token ids (Keras Tokenizer API)"""
+        ids, offsets = self.encode_ragged(texts)
+        return [ids[offsets[row]:offsets[row + 1]].tolist() for row in range(len(offsets) - 1)]